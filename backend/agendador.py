@@ -0,0 +1,179 @@
+"""
+Agendador em segundo plano da geração de notificações automáticas.
+
+Cada processo da aplicação roda uma thread que, a cada NOTIFICACOES_INTERVALO segundos
+(com variação aleatória de até NOTIFICACOES_JITTER do intervalo, para que os workers não
+disparem juntos), tenta executar Notificacao.gerar_notificacoes_automaticas. Só um worker
+executa cada rodada:
+
+- um advisory lock do PostgreSQL no escopo da transação impede duas rodadas simultâneas;
+- a rodada só acontece se a última execução registrada em agendador_execucoes (migração
+  0012) for mais antiga que o intervalo menos o jitter. O registro é atualizado na mesma
+  transação da geração, então uma rodada que falha não conta, e o próximo worker tenta de novo.
+
+Com N workers há, portanto, uma varredura por intervalo, e não N. Defina
+NOTIFICACOES_AGENDADOR=0 para desativar o agendador no processo.
+"""
+import logging
+import os
+import random
+import threading
+import time
+
+from database import transaction
+from metricas import DURACAO_JOB_NOTIFICACOES, RODADAS_JOB_NOTIFICACOES
+from models.notificacao import Notificacao
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chave do advisory lock que garante uma única execução simultânea entre os workers
+CHAVE_LOCK_NOTIFICACOES = 7_301_001
+# Linha de agendador_execucoes com a última execução da geração de notificações
+TAREFA_NOTIFICACOES = 'notificacoes_automaticas'
+
+
+class AgendadorNotificacoes:
+    def __init__(self, intervalo=None, jitter=None, atraso_inicial=None):
+        self.intervalo = float(intervalo if intervalo is not None else os.getenv('NOTIFICACOES_INTERVALO', '300'))
+        self.jitter = float(jitter if jitter is not None else os.getenv('NOTIFICACOES_JITTER', '0.1'))
+        self.atraso_inicial = float(atraso_inicial if atraso_inicial is not None
+                                    else os.getenv('NOTIFICACOES_ATRASO_INICIAL', '10'))
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._metricas = {
+            "execucoes": 0,
+            "execucoes_puladas": 0,
+            "falhas": 0,
+            "ultima_execucao": None,
+            "ultima_duracao_s": None,
+            "duracao_max_s": 0.0,
+            "duracao_total_s": 0.0,
+            "ultimas_geradas": 0,
+            "total_geradas": 0,
+        }
+
+    def _proxima_espera(self):
+        return self.intervalo * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _pular(self, motivo):
+        logger.debug(f"Rodada de notificações automáticas pulada: {motivo}.")
+        with self._lock:
+            self._metricas["execucoes_puladas"] += 1
+        RODADAS_JOB_NOTIFICACOES.labels('pulada').inc()
+
+    def executar_uma_vez(self):
+        """
+        Executa uma rodada de geração, se nenhum worker estiver executando nem tiver executado
+        dentro do intervalo.
+
+        Retorna:
+            int: Notificações geradas, ou None se a rodada foi pulada ou falhou.
+        """
+        inicio = time.perf_counter()
+        try:
+            with transaction() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (CHAVE_LOCK_NOTIFICACOES,))
+                if not cursor.fetchone()[0]:
+                    self._pular("já em andamento em outro worker")
+                    return None
+                # Reivindica a rodada; desfeito junto com a geração se ela falhar
+                cursor.execute("""
+                    UPDATE agendador_execucoes
+                    SET ultima_execucao = NOW()
+                    WHERE tarefa = %s AND ultima_execucao <= NOW() - make_interval(secs => %s)
+                """, (TAREFA_NOTIFICACOES, self.intervalo * (1 - self.jitter)))
+                if cursor.rowcount == 0:
+                    self._pular("executada há pouco por outro worker")
+                    return None
+                # Participa da mesma transação; o lock é liberado no commit
+                geradas = Notificacao.gerar_notificacoes_automaticas()
+                cursor.execute(
+                    "UPDATE agendador_execucoes SET ultimas_geradas = %s WHERE tarefa = %s",
+                    (geradas, TAREFA_NOTIFICACOES),
+                )
+        except Exception as e:
+            logger.error(f"Erro na rodada de notificações automáticas: {e}")
+            with self._lock:
+                self._metricas["falhas"] += 1
+            RODADAS_JOB_NOTIFICACOES.labels('falha').inc()
+            return None
+
+        duracao = time.perf_counter() - inicio
+        DURACAO_JOB_NOTIFICACOES.observe(duracao)
+        RODADAS_JOB_NOTIFICACOES.labels('executada').inc()
+        with self._lock:
+            self._metricas["execucoes"] += 1
+            self._metricas["ultima_execucao"] = time.time()
+            self._metricas["ultima_duracao_s"] = duracao
+            self._metricas["duracao_max_s"] = max(self._metricas["duracao_max_s"], duracao)
+            self._metricas["duracao_total_s"] += duracao
+            self._metricas["ultimas_geradas"] = geradas
+            self._metricas["total_geradas"] += geradas
+        logger.info(f"Rodada de notificações automáticas concluída em {duracao * 1000:.1f} ms ({geradas} geradas).")
+        return geradas
+
+    def _executar(self):
+        espera = self.atraso_inicial
+        while not self._parar.wait(espera):
+            try:
+                self.executar_uma_vez()
+            except Exception as e:
+                logger.error(f"Erro inesperado no agendador de notificações: {e}", exc_info=True)
+            espera = self._proxima_espera()
+
+    def iniciar(self):
+        """Inicia a thread do agendador (idempotente)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name='agendador-notificacoes', daemon=True)
+        self._thread.start()
+        logger.info(f"Agendador de notificações iniciado (intervalo {self.intervalo:.0f}s, jitter {self.jitter:.0%}).")
+
+    def parar(self):
+        """Sinaliza a thread para encerrar após a rodada atual."""
+        self._parar.set()
+
+    @staticmethod
+    def ultima_rodada():
+        """
+        Lê a última rodada executada por qualquer worker.
+
+        Retorna:
+            dict: 'ultima_execucao' (datetime, ou None se nunca executou) e 'geradas'.
+        """
+        with transaction() as cursor:
+            cursor.execute("""
+                SELECT NULLIF(ultima_execucao, 'epoch'), ultimas_geradas
+                FROM agendador_execucoes
+                WHERE tarefa = %s
+            """, (TAREFA_NOTIFICACOES,))
+            linha = cursor.fetchone()
+        if linha is None:
+            return {"ultima_execucao": None, "geradas": 0}
+        return {"ultima_execucao": linha[0], "geradas": linha[1]}
+
+    def metricas(self):
+        """
+        Retorna:
+            dict: Contadores e durações das rodadas deste processo.
+        """
+        with self._lock:
+            metricas = dict(self._metricas)
+        metricas["ativo"] = self._thread is not None and self._thread.is_alive()
+        metricas["intervalo_s"] = self.intervalo
+        return metricas
+
+
+agendador_notificacoes = AgendadorNotificacoes()
+
+
+def iniciar_agendador():
+    """Inicia o agendador, salvo se desativado por NOTIFICACOES_AGENDADOR=0."""
+    if os.getenv('NOTIFICACOES_AGENDADOR', '1') == '0':
+        logger.info("Agendador de notificações desativado (NOTIFICACOES_AGENDADOR=0).")
+        return
+    agendador_notificacoes.iniciar()
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify, g
 from flask_cors import CORS
 from routes.locacoes_routes import locacoes_routes
 from routes.clientes_routes import clientes_routes
@@ -7,152 +7,35 @@ from routes.reports_routes import reports_bp
 from routes.itens_locados_routes import itens_locados_routes
 from routes.damages_routes import damages_routes
 from routes.notificacoes_routes import notificacoes_routes
-from routes.auth_routes import auth_routes, requer_autenticacao
-from database import create_tables, close_all_connections
+from routes.auth_routes import auth_routes
+from auth_tokens import CABECALHO_RENOVACAO
+from agendador import iniciar_agendador
+from database import close_all_connections
+from instrumentacao import instrumentar_app
+from metricas import registrar_metricas
+from politica_acesso import registrar_politica_acesso
+from registro_requisicoes import AMBIENTE, configurar_logging, registrar_log_requisicoes
 import logging
 import atexit
 import os
-import subprocess
-import sys
 
-# Criação da aplicação Flask
-app = Flask(__name__)
-
-# Desabilitar redirecionamento de URLs com/sem barra final
-app.url_map.strict_slashes = False
-
-# Configuração do ambiente: "development" ou "production"
-ENVIRONMENT = "development"
-
-# Configuração do logger com base no ambiente
-logging.basicConfig(
-    level=logging.DEBUG if ENVIRONMENT == "development" else logging.INFO,
-    format="%(asctime)s [%(levelname)s]: %(message)s",
-)
+# Logging não bloqueante, com nível conforme o ambiente (APP_ENV: "development" ou "production")
+configurar_logging()
 logger = logging.getLogger(__name__)
 
 # Configuração de CORS - permitir localhost e Vercel
-CORS(app, resources={r"/*": {
+CONFIGURACAO_CORS = {
     "origins": [
-        "http://localhost:3000", 
+        "http://localhost:3000",
         "http://localhost:3001",
         "https://andaimes-pini-project.vercel.app"
-    ], 
-    "supports_credentials": True, 
-    "allow_headers": ["Content-Type", "Authorization"], 
+    ],
+    "supports_credentials": True,
+    "allow_headers": ["Content-Type", "Authorization"],
     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
-}}, expose_headers=["Content-Type", "Authorization"])
+}
 
 
-# Função para inicializar o banco de dados ao iniciar a aplicação
-def inicializar_banco():
-    try:
-        create_tables()
-        logger.info("Tabelas verificadas/criadas com sucesso!")
-    except Exception as e:
-        logger.error(f"Erro ao criar/verificar tabelas: {e}")
-    
-    # Criar admin apenas em produção (Railway)
-    # Railway sempre define RAILWAY_STATIC_URL ou RAILWAY_ENVIRONMENT_NAME
-    if os.getenv('RAILWAY_STATIC_URL') or os.getenv('RAILWAY_ENVIRONMENT_NAME'):
-        try:
-            import subprocess
-            import sys
-            logger.info("Ambiente Railway detectado. Executando script de criação do admin...")
-            result = subprocess.run([sys.executable, "create_admin_simple.py"], 
-                                  capture_output=True, text=True, 
-                                  cwd=os.path.dirname(os.path.abspath(__file__)))
-            if result.stdout:
-                logger.info(result.stdout)
-            if result.stderr:
-                logger.warning(result.stderr)
-            logger.info("Script de admin executado.")
-        except Exception as e:
-            logger.error(f"Erro ao criar admin: {e}")
-
-# Middleware para registrar informações das requisições
-@app.before_request
-def log_request_info():
-    logger.debug(f"Requisição recebida: {request.method} {request.url}")
-    if request.method in ["POST", "PUT", "DELETE"]:
-        data = request.get_json(silent=True)
-        if data:
-            logger.debug(f"Dados recebidos: {data}")
-        else:
-            logger.debug("Nenhum dado recebido.")
-
-# Configuração do after_request para logging e outros processamentos
-@app.after_request
-def after_request(response):
-    # Não adicionamos mais cabeçalhos CORS aqui, pois o Flask-CORS já cuida disso
-    return response
-
-# Rota OPTIONS para lidar com preflight CORS
-@app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
-@app.route('/<path:path>', methods=['OPTIONS'])
-def options_handler(path):
-    return jsonify({}), 200
-
-# Registrar os blueprints para rotas modularizadas
-try:
-    # Registrar rotas de autenticação (não requerem autenticação)
-    app.register_blueprint(auth_routes)
-    
-    # Registrar rotas protegidas (requerem autenticação)
-    app.register_blueprint(locacoes_routes, url_prefix='/locacoes')
-    app.register_blueprint(clientes_routes, url_prefix='/clientes')
-    app.register_blueprint(itens_locados_routes, url_prefix='/itens-locados')
-    app.register_blueprint(inventario_routes, url_prefix='/inventario')
-    app.register_blueprint(reports_bp, url_prefix='/reports')
-    app.register_blueprint(damages_routes, url_prefix='/danos')
-    app.register_blueprint(notificacoes_routes, url_prefix='/notificacoes')
-    logger.info("Rotas registradas com sucesso.")
-except Exception as e:
-    logger.error(f"Erro ao registrar rotas: {e}")
-
-# Middleware para proteção de rotas (exceto rotas de autenticação)
-@app.before_request
-def proteger_rotas():
-    # Lista de rotas que não requerem autenticação
-    rotas_publicas = [
-        '/auth/login',
-        '/auth/verificar',
-        '/clientes',
-        '/inventario',
-        '/inventario/disponiveis',
-        '/locacoes',
-        '/locacoes/',  # Adicionar barra final para garantir
-        '/notificacoes',
-        '/notificacoes/nao-lidas',
-        '/notificacoes/gerar-automaticas',
-        '/reports',
-        '/reports/'
-    ]
-    
-    # Permitir acesso a rotas específicas com IDs sem autenticação (para testes)
-    if request.path.startswith('/locacoes/') and request.method in ['GET', 'DELETE', 'PUT', 'PATCH']:
-        return None
-    
-    # Verificar se é uma requisição OPTIONS (CORS preflight)
-    if request.method == 'OPTIONS':
-        return None
-        
-    # Verificar se a rota atual requer autenticação
-    for rota in rotas_publicas:
-        if request.path.startswith(rota):
-            return None
-            
-    if not request.path.startswith('/static/'):
-        # Aplicar o decorador de autenticação
-        return requer_autenticacao(lambda: None)()
-    return None
-
-# Middleware para tratar erros de requisição
-@app.errorhandler(Exception)
-def handle_exception(e):
-    logger.error(f"Erro durante a requisição: {e}")
-    return jsonify({"error": "Erro interno no servidor, tente novamente mais tarde."}), 500
-
 # Função para fechar o pool de conexões ao encerrar a aplicação
 def fechar_conexoes():
     try:
@@ -161,18 +44,101 @@ def fechar_conexoes():
     except Exception as e:
         logger.error(f"Erro ao fechar o pool de conexões: {e}")
 
-# Configura o fechamento do pool de conexões quando a aplicação for encerrada
-atexit.register(fechar_conexoes)
 
-# Função principal para rodar a aplicação
+def create_app(iniciar_tarefas=True):
+    """
+    Cria e configura a aplicação Flask.
+
+    Não abre conexões com o banco nem executa DDL: o pool é criado na primeira consulta e o
+    schema/admin são preparados uma única vez por deploy com `python inicializar.py`.
+
+    Parâmetros:
+        iniciar_tarefas (bool): Inicia o agendador de notificações neste processo. Com o
+            gunicorn (preload), a aplicação é criada no processo mestre sem tarefas e cada
+            worker as inicia após o fork (ver gunicorn.conf.py).
+
+    Retorna:
+        Flask: A aplicação configurada.
+    """
+    # Criação da aplicação Flask
+    app = Flask(__name__)
+
+    # Desabilitar redirecionamento de URLs com/sem barra final
+    app.url_map.strict_slashes = False
+
+    # Perfil de banco por requisição (Server-Timing e log estruturado); registrado primeiro para
+    # cobrir também as consultas da autenticação
+    instrumentar_app(app)
+
+    # Métricas Prometheus (latência por rota, requisições em andamento, pool e banco) em GET /metrics
+    registrar_metricas(app)
+
+    CORS(app, resources={r"/*": CONFIGURACAO_CORS},
+         expose_headers=["Content-Type", "Authorization", "ETag", "Server-Timing", CABECALHO_RENOVACAO])
+
+    # Middleware para registrar informações das requisições (corpos amostrados, mascarados e truncados)
+    registrar_log_requisicoes(app)
+
+    # Configuração do after_request para logging e outros processamentos
+    @app.after_request
+    def after_request(response):
+        # Não adicionamos mais cabeçalhos CORS aqui, pois o Flask-CORS já cuida disso
+        # Devolve o token renovado quando o atual passou da metade da validade
+        token_renovado = g.get('token_renovado')
+        if token_renovado:
+            response.headers[CABECALHO_RENOVACAO] = token_renovado
+        return response
+
+    # Rota OPTIONS para lidar com preflight CORS
+    @app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
+    @app.route('/<path:path>', methods=['OPTIONS'])
+    def options_handler(path):
+        return jsonify({}), 200
+
+    # Registrar os blueprints para rotas modularizadas
+    try:
+        # Registrar rotas de autenticação (não requerem autenticação)
+        app.register_blueprint(auth_routes)
+
+        # Registrar rotas protegidas (requerem autenticação)
+        app.register_blueprint(locacoes_routes, url_prefix='/locacoes')
+        app.register_blueprint(clientes_routes, url_prefix='/clientes')
+        app.register_blueprint(itens_locados_routes, url_prefix='/itens-locados')
+        app.register_blueprint(inventario_routes, url_prefix='/inventario')
+        app.register_blueprint(reports_bp, url_prefix='/reports')
+        app.register_blueprint(damages_routes, url_prefix='/danos')
+        app.register_blueprint(notificacoes_routes, url_prefix='/notificacoes')
+        logger.info("Rotas registradas com sucesso.")
+    except Exception as e:
+        logger.error(f"Erro ao registrar rotas: {e}")
+
+    # Proteção de rotas: política por blueprint/endpoint compilada uma vez (ver politica_acesso.py)
+    registrar_politica_acesso(app)
+
+    # Middleware para tratar erros de requisição
+    @app.errorhandler(Exception)
+    def handle_exception(e):
+        logger.error(f"Erro durante a requisição: {e}")
+        return jsonify({"error": "Erro interno no servidor, tente novamente mais tarde."}), 500
+
+    # Configura o fechamento do pool de conexões quando a aplicação for encerrada
+    atexit.register(fechar_conexoes)
+
+    # Geração periódica de notificações automáticas (uma execução por vez entre os workers)
+    if iniciar_tarefas:
+        iniciar_agendador()
+
+    return app
+
+
+# Servidor de desenvolvimento; em produção use o gunicorn (gunicorn -c gunicorn.conf.py wsgi:app)
 if __name__ == "__main__":
-    inicializar_banco()
     try:
-        import os
+        app = create_app()
         port = int(os.environ.get("PORT", 5000))
-        logger.info(f"Iniciando a aplicação Flask no ambiente '{ENVIRONMENT}' na porta {port}...")
+        logger.info(f"Iniciando a aplicação Flask no ambiente '{AMBIENTE}' na porta {port}...")
         app.run(
-            debug=(ENVIRONMENT == "development"),
+            debug=(AMBIENTE == "development"),
             host="0.0.0.0",
             port=port,
             use_reloader=False
@@ -0,0 +1,274 @@
+"""
+Tokens de autenticação assinados (sem estado no servidor).
+
+O token carrega os dados públicos do usuário e a data de emissão, assinados com SECRET_KEY
+(HMAC via itsdangerous). Qualquer processo/worker que compartilhe a mesma SECRET_KEY valida o
+token sem consultar o banco. O token expira após AUTH_TOKEN_TTL segundos; passada a metade
+desse prazo, um novo token é emitido e devolvido no cabeçalho X-Auth-Token (expiração
+deslizante).
+
+Cada login abre uma sessão (sid, mantido nas renovações) registrada em sessoes_auth, que serve
+apenas para contar os tokens ativos; a verificação não depende dela. Cada processo emite no
+máximo uma renovação por sessão a cada meia validade: enquanto o cliente não adota o token
+renovado, as requisições seguintes recebem o mesmo, sem nova escrita em sessoes_auth.
+
+Tokens já validados ficam em um cache local (até AUTH_CACHE_MAX tokens, por no máximo
+AUTH_CACHE_TTL segundos), que evita refazer a checagem da assinatura a cada requisição; a
+revogação continua sendo conferida em toda verificação.
+
+O logout revoga a sessão inteira (sid em sessoes_revogadas), o que invalida também os tokens
+renovados dela, além do próprio token (jti em tokens_revogados). Cada processo mantém uma cópia
+local dessas listas e a recarrega no máximo a cada AUTH_REVOGACAO_REFRESH segundos, então a
+verificação em si não faz ida ao banco.
+"""
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2 import pool
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+from database import transaction
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Validade do token e intervalo de recarga da lista de revogados (segundos)
+TOKEN_TTL = int(os.getenv('AUTH_TOKEN_TTL', str(8 * 3600)))
+REVOGACAO_REFRESH = float(os.getenv('AUTH_REVOGACAO_REFRESH', '30'))
+
+# Cache de tokens validados: quantidade máxima e validade (segundos)
+CACHE_MAX = int(os.getenv('AUTH_CACHE_MAX', '1024'))
+CACHE_TTL = float(os.getenv('AUTH_CACHE_TTL', '300'))
+
+# Cabeçalho usado para devolver o token renovado ao cliente
+CABECALHO_RENOVACAO = 'X-Auth-Token'
+
+# Campos do usuário gravados no token
+CAMPOS_USUARIO = ('id', 'nome', 'email', 'cargo')
+
+_secret_key = os.getenv('SECRET_KEY')
+if not _secret_key:
+    _secret_key = secrets.token_hex(32)
+    logger.warning("SECRET_KEY não definida: usando uma chave temporária. Tokens não serão aceitos "
+                   "por outros processos nem após reiniciar a aplicação.")
+
+_serializer = URLSafeTimedSerializer(_secret_key, salt='auth-token')
+
+# Cópia local dos jti e sid revogados e instante da última recarga
+_revogados = set()
+_sessoes_revogadas = set()
+_revogados_carregados_em = 0.0
+_lock_revogados = threading.Lock()
+
+# token -> (dados, emitido_em em segundos, validade da entrada)
+_cache_tokens = OrderedDict()
+_lock_cache = threading.Lock()
+
+# sid -> (token renovado, emitido_em em segundos), a última renovação emitida por este processo
+_renovacoes = OrderedDict()
+_lock_renovacoes = threading.Lock()
+
+
+def _registrar_sessao(sid, usuario_id, nova):
+    """Registra a sessão (ou estende sua validade) em sessoes_auth; falhas não impedem o login."""
+    try:
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO sessoes_auth (sid, usuario_id, expira_em)
+                VALUES (%s, %s, NOW() + %s * INTERVAL '1 second')
+                ON CONFLICT (sid) DO UPDATE SET expira_em = EXCLUDED.expira_em
+            ''', (sid, usuario_id, TOKEN_TTL))
+            if nova:
+                cursor.execute("DELETE FROM sessoes_auth WHERE expira_em <= NOW()")
+    except (psycopg2.Error, pool.PoolError) as e:
+        logger.error(f"Erro ao registrar sessão de autenticação: {e}")
+
+
+def emitir_token(usuario, sessao=None):
+    """
+    Emite um token assinado para o usuário.
+
+    Parâmetros:
+        usuario (dict): Usuário autenticado (ao menos id, nome, email e cargo).
+        sessao (str, optional): Sessão do token renovado; se omitida, abre uma nova sessão (login).
+
+    Retorna:
+        str: Token para o cabeçalho Authorization: Bearer <token>.
+    """
+    dados = {campo: usuario.get(campo) for campo in CAMPOS_USUARIO}
+    dados['jti'] = secrets.token_hex(8)
+    dados['sid'] = sessao or secrets.token_hex(8)
+    _registrar_sessao(dados['sid'], usuario.get('id'), nova=sessao is None)
+    return _serializer.dumps(dados)
+
+
+def contar_tokens_ativos():
+    """
+    Retorna:
+        int: Sessões com token válido (não expirado nem revogado), ou None se a consulta falhar.
+    """
+    try:
+        with transaction() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sessoes_auth WHERE expira_em > NOW()")
+            return cursor.fetchone()[0]
+    except (psycopg2.Error, pool.PoolError) as e:
+        logger.error(f"Erro ao contar tokens ativos: {e}")
+        return None
+
+
+def _carregar_revogados():
+    """Recarrega a lista de tokens revogados se a cópia local estiver vencida."""
+    global _revogados, _sessoes_revogadas, _revogados_carregados_em
+    if time.monotonic() - _revogados_carregados_em < REVOGACAO_REFRESH:
+        return
+    with _lock_revogados:
+        if time.monotonic() - _revogados_carregados_em < REVOGACAO_REFRESH:
+            return
+        try:
+            with transaction() as cursor:
+                cursor.execute("SELECT jti FROM tokens_revogados WHERE expira_em > NOW()")
+                _revogados = {linha[0] for linha in cursor.fetchall()}
+                cursor.execute("SELECT sid FROM sessoes_revogadas WHERE expira_em > NOW()")
+                _sessoes_revogadas = {linha[0] for linha in cursor.fetchall()}
+        except Exception as e:
+            # Mantém a cópia anterior; tenta de novo na próxima janela
+            logger.error(f"Erro ao carregar tokens revogados: {e}")
+        _revogados_carregados_em = time.monotonic()
+
+
+def _decodificar(token):
+    """
+    Valida a assinatura e a validade do token, consultando antes o cache local.
+
+    Retorna:
+        tuple: (dados, emitido_em em segundos) ou (None, None) se o token for inválido ou expirado.
+    """
+    agora = time.time()
+    with _lock_cache:
+        entrada = _cache_tokens.get(token)
+        if entrada is not None:
+            if entrada[2] > agora:
+                _cache_tokens.move_to_end(token)
+                return entrada[0], entrada[1]
+            del _cache_tokens[token]
+
+    try:
+        dados, emitido_em = _serializer.loads(token, max_age=TOKEN_TTL, return_timestamp=True)
+    except SignatureExpired:
+        logger.info("Token de autenticação expirado")
+        return None, None
+    except BadSignature:
+        return None, None
+
+    emitido_em = emitido_em.timestamp()
+    validade = min(agora + CACHE_TTL, emitido_em + TOKEN_TTL)
+    with _lock_cache:
+        _cache_tokens[token] = (dados, emitido_em, validade)
+        while len(_cache_tokens) > CACHE_MAX:
+            _cache_tokens.popitem(last=False)
+    return dados, emitido_em
+
+
+def verificar_token(token):
+    """
+    Valida a assinatura, a validade e a revogação de um token.
+
+    Parâmetros:
+        token (str): Token recebido no cabeçalho Authorization.
+
+    Retorna:
+        tuple: (usuario, token_renovado). usuario é None se o token for inválido, expirado ou
+        revogado; token_renovado é um novo token quando o atual já passou da metade da validade.
+    """
+    dados, emitido_em = _decodificar(token)
+    if dados is None:
+        return None, None
+
+    _carregar_revogados()
+    if dados.get('jti') in _revogados or dados.get('sid') in _sessoes_revogadas:
+        logger.info("Token de autenticação revogado")
+        return None, None
+
+    usuario = {campo: dados.get(campo) for campo in CAMPOS_USUARIO}
+    idade = time.time() - emitido_em
+    token_renovado = _renovar(usuario, dados.get('sid')) if idade > TOKEN_TTL / 2 else None
+    return usuario, token_renovado
+
+
+def _renovar(usuario, sid):
+    """
+    Token renovado da sessão: reaproveita a renovação já emitida por este processo enquanto ela
+    não passar da metade da validade, em vez de emitir (e registrar) um token a cada requisição.
+    """
+    if sid is None:
+        # Token anterior às sessões: cada renovação abre uma sessão nova
+        return emitir_token(usuario)
+    agora = time.time()
+    with _lock_renovacoes:
+        entrada = _renovacoes.get(sid)
+        if entrada is not None and agora - entrada[1] <= TOKEN_TTL / 2:
+            _renovacoes.move_to_end(sid)
+            return entrada[0]
+
+    token = emitir_token(usuario, sessao=sid)
+    with _lock_renovacoes:
+        _renovacoes[sid] = (token, agora)
+        while len(_renovacoes) > CACHE_MAX:
+            _renovacoes.popitem(last=False)
+    return token
+
+
+def revogar_token(token):
+    """
+    Revoga um token e a sua sessão (logout): os tokens renovados da mesma sessão também deixam
+    de ser aceitos.
+
+    Parâmetros:
+        token (str): Token a revogar.
+
+    Retorna:
+        bool: True se o token era válido e foi revogado, False caso contrário.
+    """
+    try:
+        dados, emitido_em = _serializer.loads(token, max_age=TOKEN_TTL, return_timestamp=True)
+    except BadSignature:
+        return False
+
+    expira_em = emitido_em.timestamp() + TOKEN_TTL
+    try:
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO tokens_revogados (jti, expira_em)
+                VALUES (%s, TO_TIMESTAMP(%s))
+                ON CONFLICT (jti) DO NOTHING
+            ''', (dados['jti'], expira_em))
+            if dados.get('sid'):
+                # Uma renovação emitida agora ainda valeria por TOKEN_TTL segundos
+                cursor.execute('''
+                    INSERT INTO sessoes_revogadas (sid, expira_em)
+                    VALUES (%s, NOW() + %s * INTERVAL '1 second')
+                    ON CONFLICT (sid) DO UPDATE SET expira_em = EXCLUDED.expira_em
+                ''', (dados['sid'], TOKEN_TTL))
+            # Aproveita a escrita para descartar revogações já vencidas
+            cursor.execute("DELETE FROM tokens_revogados WHERE expira_em <= NOW()")
+            cursor.execute("DELETE FROM sessoes_revogadas WHERE expira_em <= NOW()")
+            cursor.execute("DELETE FROM sessoes_auth WHERE sid = %s", (dados.get('sid'),))
+    except (psycopg2.Error, pool.PoolError) as e:
+        logger.error(f"Erro ao revogar token: {e}")
+        return False
+
+    with _lock_revogados:
+        _revogados.add(dados['jti'])
+        if dados.get('sid'):
+            _sessoes_revogadas.add(dados['sid'])
+    with _lock_cache:
+        _cache_tokens.pop(token, None)
+    with _lock_renovacoes:
+        _renovacoes.pop(dados.get('sid'), None)
+    return True
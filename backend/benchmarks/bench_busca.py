@@ -0,0 +1,67 @@
+"""
+Benchmark da busca do autocomplete (/reports/clients).
+
+Compara o caminho anterior (Cliente.get_all() e filtro em Python a cada tecla) com a busca no
+banco da migração 0006 (Cliente.buscar), à medida que o cadastro de clientes cresce. Também
+confere que a busca ignora acentos e maiúsculas.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_busca [N1 N2 ...]
+"""
+import random
+import sys
+
+from psycopg2.extras import execute_values
+
+from benchmarks import comum
+import database
+from models.cliente import Cliente
+
+PRENOMES = ["João", "José", "Antônio", "Conceição", "Luís", "Márcia", "Sebastião", "Inês", "André", "Fátima",
+            "Ana", "Carlos", "Paulo", "Lúcia", "Raimundo", "Cláudia", "Simão", "Vitória", "Caio", "Débora"]
+SOBRENOMES = ["Conceição", "Gonçalves", "Magalhães", "Araújo", "Simões", "Brandão", "Assunção", "Guimarães",
+              "Silva", "Souza", "Pereira", "Lima", "Frazão", "Loureiro", "Estêvão", "Falcão", "Monção", "Ribeiro"]
+
+# Termos digitados no autocomplete (sem acento, como costumam ser digitados)
+TERMOS = ["jo", "joao", "conceicao", "goncalves", "maria", "sebastiao araujo", "zzz"]
+
+
+def popular_clientes(total, semente=42):
+    rnd = random.Random(semente)
+    comum.limpar_tabelas()
+    conn = database.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            execute_values(cursor, '''
+                INSERT INTO clientes (nome, endereco, telefone, referencia) VALUES %s
+            ''', [(f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}",
+                   f"Rua {i}", f"21{i:08d}", None) for i in range(1, total + 1)], page_size=1000)
+            cursor.execute("ANALYZE clientes")
+        conn.commit()
+    finally:
+        database.release_connection(conn)
+
+
+def busca_em_python(termo):
+    """Reproduz a busca anterior: carrega todos os clientes e filtra em Python."""
+    return [c for c in Cliente.get_all() if termo.lower() in c.get('nome', '').lower()]
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000, 300000]
+    comum.preparar_banco()
+
+    print(f"{'clientes':>10} | {'termo':<18} | {'ms python':>10} | {'ms banco':>9} | {'resultados':>10}")
+    print("-" * 70)
+    for total in tamanhos:
+        popular_clientes(total)
+        assert any(c["nome"].startswith("João") for c in Cliente.buscar("joao")), \
+            "A busca deveria ignorar acentos"
+        for termo in TERMOS:
+            ms_python, _ = comum.medir(lambda: busca_em_python(termo), repeticoes=3)
+            ms_banco, _ = comum.medir(lambda: Cliente.buscar(termo))
+            print(f"{total:>10} | {termo:<18} | {ms_python:>10.1f} | {ms_banco:>9.1f} | {len(Cliente.buscar(termo)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark da criação de locações (POST /locacoes) com pedidos de 1 a 200 linhas.
+
+Compara a implementação anterior, que fazia SELECT + INSERT + UPDATE para cada linha do
+pedido, com Locacao.criar_locacao, que insere os itens e baixa o estoque em lote.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_criacao_locacao [N1 N2 ...]
+"""
+import sys
+from datetime import date, timedelta
+
+from benchmarks import comum
+from database import transaction
+from helpers import atualizar_estoque
+from models.inventario import Inventario
+from models.locacao import Locacao
+
+CLIENTE = ("Cliente 1", "Rua 1, 1", "2100000001")
+
+ESTADO = '''
+    SELECT (SELECT COUNT(*) FROM locacoes),
+           (SELECT COUNT(*) FROM itens_locados),
+           (SELECT SUM(quantidade_disponivel) FROM inventario)
+'''
+
+
+def dados_pedido(total_linhas):
+    hoje = date.today()
+    itens = [{"modelo": f"Item {i}", "quantidade": 1} for i in range(1, total_linhas + 1)]
+    return dict(
+        nome_cliente=CLIENTE[0], endereco_cliente=CLIENTE[1], telefone_cliente=CLIENTE[2],
+        data_inicio=hoje.isoformat(), data_fim=(hoje + timedelta(days=30)).isoformat(),
+        valor_total=100, valor_pago_entrega=0, valor_receber_final=100,
+        numero_nota=None, itens=itens,
+    )
+
+
+def criar_linha_a_linha(dados):
+    """Reproduz a criação antiga: uma consulta, um INSERT e um UPDATE por linha do pedido."""
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO locacoes (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega,
+                                  valor_receber_final, status, numero_nota)
+            VALUES (1, %s, %s, %s, %s, %s, 'ativo', NULL)
+            RETURNING id
+        ''', (dados['data_inicio'], dados['data_fim'], dados['valor_total'],
+              dados['valor_pago_entrega'], dados['valor_receber_final']))
+        locacao_id = cursor.fetchone()[0]
+        for item in dados['itens']:
+            inventario_item = Inventario.get_item_by_modelo(item['modelo'])
+            if item['quantidade'] > inventario_item['quantidade_disponivel']:
+                raise ValueError(f"Estoque insuficiente para o item '{item['modelo']}'.")
+            cursor.execute('''
+                INSERT INTO itens_locados (locacao_id, item_id, quantidade)
+                VALUES (%s, %s, %s)
+            ''', (locacao_id, inventario_item['id'], item['quantidade']))
+            atualizar_estoque(inventario_item['id'], -item['quantidade'], cursor)
+    return locacao_id
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1, 10, 40, 100, 200]
+    comum.preparar_banco()
+    comum.popular(0, total_itens_inventario=max(tamanhos), total_clientes=1)
+
+    print(f"{'linhas':>7} | {'instr. linha a linha':>20} | {'instr. lote':>11} | {'ms linha a linha':>16} | {'ms lote':>9}")
+    print("-" * 77)
+    for total in tamanhos:
+        dados = dados_pedido(total)
+        ms_antigo, instrucoes_antigo = comum.medir(lambda: criar_linha_a_linha(dados))
+        ms_novo, instrucoes_novo = comum.medir(lambda: Locacao.criar_locacao(**dados))
+        print(f"{total:>7} | {instrucoes_antigo:>20} | {instrucoes_novo:>11} | {ms_antigo:>16.1f} | {ms_novo:>9.1f}")
+
+    # Pedido que excede o estoque de um item: nada pode ser gravado
+    dados = dados_pedido(max(tamanhos))
+    dados['itens'][-1]['quantidade'] = 10_000_000
+    with transaction() as cursor:
+        cursor.execute(ESTADO)
+        antes = cursor.fetchone()
+    assert Locacao.criar_locacao(**dados) is None, "Pedido acima do estoque deveria ser rejeitado"
+    with transaction() as cursor:
+        cursor.execute(ESTADO)
+        assert cursor.fetchone() == antes, "Pedido rejeitado alterou locações, itens ou estoque"
+    print("Pedido acima do estoque rejeitado sem alterar itens nem estoque.")
+
+
+if __name__ == "__main__":
+    main()
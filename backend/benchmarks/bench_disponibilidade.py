@@ -0,0 +1,57 @@
+"""
+Benchmark do calendário de disponibilidade (GET /inventario/<id>/disponibilidade).
+
+Compara a varredura de eventos de Disponibilidade.ocupacao_diaria com a contagem ingênua
+(somar, para cada dia, todos os períodos que o cobrem) e mede a consulta completa de um item
+sobre bases com milhares de locações.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_disponibilidade [N1 N2 ...]
+"""
+import sys
+from datetime import date, timedelta
+
+from benchmarks import comum
+from database import transaction
+from models.disponibilidade import Disponibilidade
+
+
+def ocupacao_ingenua(periodos, de, ate):
+    dias = [de + timedelta(days=i) for i in range((ate - de).days + 1)]
+    return [sum(q for inicio, fim, q in periodos if fim >= inicio and inicio <= dia <= fim) for dia in dias]
+
+
+def periodos_item(item_id):
+    """Períodos (inicio, fim, quantidade) de um item, sem agregação, para a comparação."""
+    with transaction() as cursor:
+        cursor.execute('''
+            SELECT COALESCE(il.data_alocacao, l.data_inicio), l.data_fim, il.quantidade
+            FROM itens_locados il
+            JOIN locacoes l ON l.id = il.locacao_id
+            WHERE il.item_id = %s
+        ''', (item_id,))
+        return cursor.fetchall()
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    comum.preparar_banco()
+    de = date.today() - timedelta(days=365)
+    ate = date.today()
+
+    print(f"{'locações':>10} | {'períodos':>9} | {'ms ingênuo':>10} | {'ms varredura':>12} | {'ms endpoint':>11}")
+    print("-" * 65)
+    for total in tamanhos:
+        # Poucos itens no inventário para concentrar muitos períodos em cada um
+        comum.popular(total, total_itens_inventario=5)
+        periodos = periodos_item(1)
+        assert ocupacao_ingenua(periodos, de, ate) == Disponibilidade.ocupacao_diaria(periodos, de, ate), \
+            "As implementações divergem"
+        ms_ingenuo, _ = comum.medir(lambda: ocupacao_ingenua(periodos, de, ate), repeticoes=1)
+        ms_varredura, _ = comum.medir(lambda: Disponibilidade.ocupacao_diaria(periodos, de, ate))
+        ms_endpoint, _ = comum.medir(lambda: Disponibilidade.obter_por_item(1, de, ate))
+        print(f"{total:>10} | {len(periodos):>9} | {ms_ingenuo:>10.1f} | {ms_varredura:>12.1f} | {ms_endpoint:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
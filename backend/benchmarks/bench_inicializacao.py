@@ -0,0 +1,159 @@
+"""
+Benchmark do tempo de inicialização (cold start) de um worker.
+
+Cada rodada é um processo Python novo que importa a aplicação, cria a app (create_app) e
+atende a primeira requisição; mede também o processo inteiro, incluindo o interpretador.
+Para comparar com outro commit (por exemplo, antes da fábrica create_app), --ref monta o
+commit em um git worktree temporário e mede o mesmo roteiro nele; em árvores sem create_app
+usa o `app` do módulo e executa inicializar_banco(), como fazia `python app.py` a cada boot.
+
+A primeira requisição (GET /auth/verificar sem token) passa por todos os middlewares e pela
+política de acesso sem consultar o banco.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_inicializacao [--rodadas 10] [--ref <commit>] [--importtime 15]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Roteiro executado em cada processo filho (no diretório backend da árvore medida)
+ROTEIRO = r'''
+import json, os, sys, time
+inicio = time.perf_counter()
+import app as modulo
+importado = time.perf_counter()
+if hasattr(modulo, "create_app"):
+    aplicacao = modulo.create_app()
+else:
+    aplicacao = modulo.app
+    if hasattr(modulo, "inicializar_banco"):
+        modulo.inicializar_banco()
+criado = time.perf_counter()
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+_, status, _ = run_wsgi_app(aplicacao, EnvironBuilder(path="/auth/verificar").get_environ(), buffered=True)
+respondido = time.perf_counter()
+print("RESULTADO " + json.dumps({
+    "importacao_ms": (importado - inicio) * 1000,
+    "create_app_ms": (criado - importado) * 1000,
+    "primeira_requisicao_ms": (respondido - criado) * 1000,
+    "modulos": len(sys.modules),
+    "status": status,
+}), flush=True)
+os._exit(0)
+'''
+
+ETAPAS = ("importacao_ms", "create_app_ms", "primeira_requisicao_ms", "processo_ms")
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir_rodada(diretorio):
+    """Executa o roteiro em um processo novo e retorna as medidas (ms) da rodada."""
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, "-c", ROTEIRO], cwd=diretorio, capture_output=True, text=True)
+    processo_ms = (time.perf_counter() - inicio) * 1000
+    linhas = [linha for linha in saida.stdout.splitlines() if linha.startswith("RESULTADO ")]
+    if saida.returncode != 0 or not linhas:
+        raise RuntimeError(f"Falha ao iniciar a aplicação em {diretorio}:\n{saida.stderr[-2000:]}")
+    resultado = json.loads(linhas[-1][len("RESULTADO "):])
+    resultado["processo_ms"] = processo_ms
+    return resultado
+
+
+def medir(diretorio, rodadas):
+    """
+    Retorna:
+        dict: {etapa: mediana em ms} e o número de módulos carregados.
+    """
+    medir_rodada(diretorio)  # Aquecimento: bytecode (.pyc) e cache de disco
+    medidas = [medir_rodada(diretorio) for _ in range(rodadas)]
+    resumo = {etapa: statistics.median(m[etapa] for m in medidas) for etapa in ETAPAS}
+    resumo["modulos"] = medidas[-1]["modulos"]
+    return resumo
+
+
+def maiores_importacoes(diretorio, limite):
+    """
+    Usa `python -X importtime` para listar os módulos mais caros importados diretamente por app.
+
+    Retorna:
+        list: (módulo, tempo acumulado em ms), do maior para o menor.
+    """
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                           cwd=diretorio, capture_output=True, text=True)
+    tempos = {}
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        # O recuo indica o nível do import (dois espaços por nível); "app" fica no nível 0
+        nivel = (len(nome) - len(nome.lstrip()) - 1) // 2
+        if nivel == 1:
+            tempos[nome.strip()] = int(acumulado) / 1000
+    return sorted(tempos.items(), key=lambda item: item[1], reverse=True)[:limite]
+
+
+def _raiz_git():
+    return subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=BACKEND,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def criar_worktree(ref):
+    destino = tempfile.mkdtemp(prefix="bench-inicializacao-")
+    subprocess.run(["git", "worktree", "add", "--detach", destino, ref], check=True, capture_output=True)
+    return destino
+
+
+def remover_worktree(destino):
+    subprocess.run(["git", "worktree", "remove", "--force", destino], capture_output=True)
+    shutil.rmtree(destino, ignore_errors=True)
+
+
+def imprimir(resultados):
+    print(f"{'árvore':<14} | {'import ms':>9} | {'create_app ms':>13} | {'1ª req ms':>9} | "
+          f"{'processo ms':>11} | {'módulos':>7}")
+    print("-" * 80)
+    for nome, r in resultados.items():
+        print(f"{nome:<14} | {r['importacao_ms']:>9.1f} | {r['create_app_ms']:>13.1f} | "
+              f"{r['primeira_requisicao_ms']:>9.1f} | {r['processo_ms']:>11.1f} | {r['modulos']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização de um worker (mediana de N processos).")
+    parser.add_argument("--rodadas", type=int, default=10)
+    parser.add_argument("--ref", default=None, help="Commit para comparar (montado em um git worktree)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Lista os N módulos mais caros importados por app")
+    args = parser.parse_args()
+
+    resultados = {"atual": medir(BACKEND, args.rodadas)}
+    worktree = None
+    try:
+        if args.ref:
+            worktree = criar_worktree(args.ref)
+            diretorio_ref = os.path.join(worktree, os.path.relpath(BACKEND, _raiz_git()))
+            resultados[args.ref[:14]] = medir(diretorio_ref, args.rodadas)
+            imprimir(resultados)
+            atual, ref = resultados["atual"]["processo_ms"], resultados[args.ref[:14]]["processo_ms"]
+            print(f"\nProcesso: {ref:.1f} ms -> {atual:.1f} ms ({(atual - ref) / ref * 100:+.1f}%)")
+        else:
+            imprimir(resultados)
+
+        if args.importtime:
+            print("\nMódulos mais caros importados por app (acumulado, árvore atual):")
+            for nome, ms in maiores_importacoes(BACKEND, args.importtime):
+                print(f"  {ms:>8.1f} ms  {nome}")
+    finally:
+        if worktree:
+            remover_worktree(worktree)
+
+
+if __name__ == "__main__":
+    main()
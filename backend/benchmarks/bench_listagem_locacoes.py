@@ -0,0 +1,53 @@
+"""
+Benchmark da listagem detalhada de locações (GET /locacoes).
+
+Compara a implementação anterior, que buscava os itens de cada locação em uma consulta
+separada (N+1), com Locacao.obter_todas_detalhadas, que carrega todos os itens de uma vez.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_listagem_locacoes [N1 N2 ...]
+"""
+import sys
+
+from benchmarks import comum
+from database import get_connection, release_connection
+from models.itens_locados import ItensLocados
+from models.locacao import Locacao
+
+
+def listagem_n_mais_um():
+    """Reproduz a listagem antiga: uma consulta de locações e uma consulta de itens por locação."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT locacoes.id, locacoes.data_inicio, locacoes.data_fim, locacoes.valor_total,
+                   locacoes.valor_pago_entrega, locacoes.valor_receber_final, locacoes.status,
+                   clientes.nome, clientes.endereco, clientes.telefone, locacoes.numero_nota
+            FROM locacoes
+            JOIN clientes ON locacoes.cliente_id = clientes.id
+        ''')
+        return [
+            Locacao._formatar_locacao(locacao, ItensLocados.obter_por_locacao(locacao[0]))
+            for locacao in cursor.fetchall()
+        ]
+    finally:
+        release_connection(conn)
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [100, 500, 1000, 5000]
+    comum.preparar_banco()
+
+    print(f"{'locações':>10} | {'consultas N+1':>13} | {'consultas lote':>14} | {'ms N+1':>9} | {'ms lote':>9}")
+    print("-" * 68)
+    for total in tamanhos:
+        comum.popular(total)
+        assert listagem_n_mais_um() == Locacao.obter_todas_detalhadas(), "As implementações divergem"
+        ms_antigo, consultas_antigo = comum.medir(listagem_n_mais_um, repeticoes=3)
+        ms_novo, consultas_novo = comum.medir(Locacao.obter_todas_detalhadas)
+        print(f"{total:>10} | {consultas_antigo:>13} | {consultas_novo:>14} | {ms_antigo:>9.1f} | {ms_novo:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
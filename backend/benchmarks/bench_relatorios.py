@@ -0,0 +1,62 @@
+"""
+Benchmark dos relatórios de visão geral e de status (/reports/overview e /reports/status).
+
+Compara a agregação direta sobre locacoes/itens_locados (implementação anterior) com a leitura
+das tabelas de resumo da migração 0005, à medida que o histórico cresce, e confere que os dois
+caminhos retornam os mesmos números.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_relatorios [N1 N2 ...]
+"""
+import sys
+
+from benchmarks import comum
+from database import transaction
+from models.report import Relatorios
+
+
+def resumo_direto():
+    """Reproduz a visão geral antiga, agregando as tabelas de origem."""
+    with transaction() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(valor_total), 0), COUNT(DISTINCT cliente_id),
+                   SUM(CASE WHEN status = 'concluido' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status != 'concluido' THEN 1 ELSE 0 END)
+            FROM locacoes
+        """)
+        locacoes = cursor.fetchone()
+        cursor.execute("""
+            SELECT COUNT(DISTINCT il.item_id)
+            FROM itens_locados il
+            JOIN locacoes l ON il.locacao_id = l.id
+        """)
+        itens = cursor.fetchone()
+    return {
+        "total_locacoes": locacoes[0],
+        "receita_total": float(locacoes[1]),
+        "clientes_unicos": locacoes[2],
+        "itens_unicos_alugados": itens[0],
+        "locacoes_concluidas": locacoes[3] or 0,
+        "locacoes_pendentes": locacoes[4] or 0,
+    }
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    comum.preparar_banco()
+
+    print(f"{'locações':>10} | {'ms direto':>10} | {'ms resumo':>10} | {'ms status':>10}")
+    print("-" * 50)
+    for total in tamanhos:
+        comum.popular(total)
+        resumo = Relatorios.obter_dados_resumo_com_filtros()
+        resumo.pop("itens_por_tipo")
+        assert resumo == resumo_direto(), "Resumo divergente das tabelas de origem"
+        ms_direto, _ = comum.medir(resumo_direto)
+        ms_resumo, _ = comum.medir(Relatorios.obter_dados_resumo_com_filtros)
+        ms_status, _ = comum.medir(Relatorios.obter_relatorio_status)
+        print(f"{total:>10} | {ms_direto:>10.1f} | {ms_resumo:>10.1f} | {ms_status:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
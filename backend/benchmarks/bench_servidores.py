@@ -0,0 +1,204 @@
+"""
+Vazão e latência do servidor de desenvolvimento (python app.py) contra o gunicorn
+(gunicorn -c gunicorn.conf.py wsgi:app), com a mesma mistura de operações de benchmarks.carga.
+
+Sobe cada servidor em um processo próprio, sobre o schema de benchmark já populado por
+benchmarks.gerador, aguarda ele responder e dispara a mistura com a mesma concorrência e
+duração. O agendador de notificações fica desligado nos dois, para não concorrer com a carga.
+Imprime, por servidor, p50/p95/p99 e vazão de cada operação e a vazão total; com --saida,
+grava um JSON no formato de benchmarks.carga para cada servidor, que podem ser comparados com
+benchmarks.comparar.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.gerador 100k
+    python -m benchmarks.bench_servidores [--mistura misto] [--concorrencia 32] [--duracao 30]
+                                          [--workers 4] [--threads 4] [--streams 8]
+                                          [--streams-max 2] [--saida resultados/]
+    python -m benchmarks.comparar resultados/dev.json resultados/gunicorn.json
+
+Abas abertas (--streams N): antes da medição, abre N conexões a /notificacoes/stream, que
+ficam abertas até o servidor ser encerrado, como N abas do sistema, e a carga da API roda com
+elas ocupando threads. Cada stream prende uma thread; no gunicorn, os que passam de
+NOTIFICACOES_STREAMS_MAX por worker (--streams-max; padrão: metade das threads) recebem 503,
+e o resultado mostra quantos foram abertos e quantos recusados. Com --streams-max 0 (sem
+limite) e N perto de workers × threads, sobram poucas threads (ou nenhuma) para a API, e a
+vazão do gunicorn cai junto.
+
+    python -m benchmarks.bench_servidores --streams 8 --workers 2 --threads 4 [--streams-max 0]
+
+Leitura: com concorrência acima de 1, o servidor de desenvolvimento atende tudo em um único
+processo (e o GIL limita o trabalho de CPU das rotas e da serialização), enquanto o
+gunicorn distribui entre workers × threads; a vazão total deve crescer com os workers até o
+limite do banco ou das CPUs. Para um resultado representativo, rode com APP_ENV=production
+(nível de log e amostragem de payload iguais aos de produção) e com o banco em outra máquina
+ou, ao menos, com CPUs sobrando para ele.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from benchmarks import carga, comum
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def comandos(workers, threads, streams_max=None):
+    """Comando e variáveis de ambiente de cada servidor."""
+    gunicorn = {"WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads)}
+    if streams_max is not None:
+        gunicorn["NOTIFICACOES_STREAMS_MAX"] = str(streams_max)
+    return {
+        "dev": ([sys.executable, "app.py"], {}),
+        "gunicorn": ([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"], gunicorn),
+    }
+
+
+def aguardar(base, limite=60):
+    """Espera o servidor responder (qualquer status HTTP) por até `limite` segundos."""
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            with urllib.request.urlopen(f"{base}/auth/verificar", timeout=2):
+                return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"O servidor em {base} não respondeu em {limite}s.")
+
+
+def abrir_streams(base, total, limite=30):
+    """
+    Abre `total` conexões ao stream de notificações, cada uma em uma thread que lê os eventos
+    até o servidor encerrar a conexão, e espera até `limite` segundos pelas respostas.
+
+    Retorna:
+        dict: Streams abertos, recusados pelo servidor (status HTTP de erro) e sem conexão.
+    """
+    situacao = {"abertos": 0, "recusados": 0, "falhas": 0}
+    lock = threading.Lock()
+    respondidos = threading.Semaphore(0)
+    cabecalhos = {"Authorization": comum.cabecalhos_http()["Authorization"]}
+
+    def assistir():
+        try:
+            requisicao = urllib.request.Request(f"{base}/notificacoes/stream", headers=cabecalhos)
+            resposta = urllib.request.urlopen(requisicao)
+        except urllib.error.HTTPError as erro:
+            erro.read()
+            chave = "recusados"
+        except OSError:
+            chave = "falhas"
+        else:
+            chave = "abertos"
+        with lock:
+            situacao[chave] += 1
+        respondidos.release()
+        if chave != "abertos":
+            return
+        try:
+            while resposta.readline():
+                pass
+        except OSError:
+            pass
+        finally:
+            resposta.close()
+
+    for _ in range(total):
+        threading.Thread(target=assistir, name="stream-benchmark", daemon=True).start()
+    fim = time.monotonic() + limite
+    for _ in range(total):
+        if not respondidos.acquire(timeout=max(0, fim - time.monotonic())):
+            break
+    with lock:
+        return dict(situacao)
+
+
+def medir_servidor(comando, ambiente, porta, ctx, args):
+    variaveis = {**os.environ, **ambiente, "PORT": str(porta), "NOTIFICACOES_AGENDADOR": "0"}
+    processo = subprocess.Popen(comando, cwd=BACKEND, env=variaveis,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{porta}"
+    streams = None
+    try:
+        aguardar(base)
+        # Os streams ficam abertos durante o aquecimento e a medição; terminam com o servidor
+        if args.streams:
+            streams = abrir_streams(base, args.streams)
+        if args.aquecimento:
+            carga.executar(base, ctx, args.mistura, args.concorrencia, total=args.aquecimento,
+                           semente=args.semente + 1)
+        latencias, erros, segundos = carga.executar(base, ctx, args.mistura, args.concorrencia,
+                                                    duracao=args.duracao, semente=args.semente)
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+    return carga.resumir(latencias, erros, segundos), segundos, streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de desenvolvimento x gunicorn sob a mesma carga.")
+    parser.add_argument("--mistura", choices=sorted(carga.MISTURAS), default="misto")
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=30)
+    parser.add_argument("--aquecimento", type=int, default=50, help="Operações descartadas antes da medição")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--streams", type=int, default=0,
+                        help="Streams SSE mantidos abertos durante a medição (abas abertas)")
+    parser.add_argument("--streams-max", type=int, default=None,
+                        help="NOTIFICACOES_STREAMS_MAX do gunicorn (0 = sem limite; padrão: metade das threads)")
+    parser.add_argument("--porta", type=int, default=5100, help="Porta do primeiro servidor (a seguinte para o outro)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default=None, help="Diretório para dev.json e gunicorn.json")
+    args = parser.parse_args()
+
+    comum.preparar_banco()
+    ctx = carga.Contexto(args.semente)
+    commit = carga.commit_atual()
+
+    totais = {}
+    servidores = comandos(args.workers, args.threads, args.streams_max)
+    for deslocamento, (nome, (comando, ambiente)) in enumerate(servidores.items()):
+        resumo, segundos, streams = medir_servidor(comando, ambiente, args.porta + deslocamento, ctx, args)
+        totais[nome] = sum(r["n"] for r in resumo.values()) / segundos if segundos else 0.0
+        print(f"\n{nome}: {comando[-1]} {' '.join(f'{k}={v}' for k, v in ambiente.items())}")
+        if streams is not None:
+            print(f"Streams SSE: {streams['abertos']} abertos, {streams['recusados']} recusados, "
+                  f"{streams['falhas']} sem conexão (de {args.streams})")
+        carga.imprimir(resumo)
+        if args.saida:
+            os.makedirs(args.saida, exist_ok=True)
+            caminho = os.path.join(args.saida, f"{nome}.json")
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                json.dump({
+                    "commit": commit,
+                    "data": datetime.now().isoformat(timespec="seconds"),
+                    "schema": comum.SCHEMA,
+                    "locacoes": ctx.total_locacoes,
+                    "mistura": args.mistura,
+                    "concorrencia": args.concorrencia,
+                    "streams": streams,
+                    "segundos": round(segundos, 2),
+                    "url": nome,
+                    "operacoes": resumo,
+                }, arquivo, ensure_ascii=False, indent=2)
+            print(f"Resultado gravado em {caminho}")
+
+    dev, gunicorn = totais["dev"], totais["gunicorn"]
+    razao = f" ({gunicorn / dev:.1f}x)" if dev else ""
+    print(f"\nVazão total: dev {dev:.1f} ops/s, gunicorn {gunicorn:.1f} ops/s{razao}")
+
+
+if __name__ == "__main__":
+    main()
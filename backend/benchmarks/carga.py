@@ -0,0 +1,302 @@
+"""
+Teste de carga HTTP com misturas de operações e relatório de percentis.
+
+Executa uma mistura ponderada de operações contra a API (por padrão a própria aplicação,
+iniciada em um servidor local com threads sobre o schema de benchmark, já populado por
+benchmarks.gerador) e mede a latência de cada uma:
+
+    dashboard   - o que a tela inicial carrega: resumo, notificações não lidas, primeira
+                  página de locações e inventário
+    criacao     - POST /locacoes com itens do inventário
+    devolucao   - confirmação de devolução de locações ativas
+    relatorios  - relatórios por período/status e busca de clientes
+    misto       - 60% dashboard, 15% criação, 10% devolução, 15% relatórios
+
+Ao final imprime p50/p95/p99, média, erros e vazão por operação e grava um JSON com o commit
+atual, o tamanho da base e os parâmetros, para comparar execuções com benchmarks.comparar.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.gerador 100k
+    python -m benchmarks.carga [--mistura misto] [--concorrencia 8] [--duracao 30] [--saida res.json]
+    python -m benchmarks.carga --url http://localhost:5000 --mistura dashboard
+
+As rotas de escrita exigem autenticação: as requisições levam um token emitido localmente, que
+um servidor externo (--url) só aceita se usar a mesma SECRET_KEY.
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from benchmarks import comum
+from database import transaction
+
+# Peso de cada operação em cada mistura
+MISTURAS = {
+    "dashboard": {"dashboard": 1},
+    "criacao": {"criacao": 1},
+    "devolucao": {"devolucao": 1},
+    "relatorios": {"relatorios": 1},
+    "misto": {"dashboard": 60, "criacao": 15, "devolucao": 10, "relatorios": 15},
+}
+
+TERMOS_BUSCA = ["jo", "conceicao", "silva", "construtora", "mar", "goncalves"]
+
+
+class Contexto:
+    """Dados da base usados para montar as requisições (modelos, clientes e locações ativas)."""
+
+    def __init__(self, semente):
+        with transaction() as cursor:
+            cursor.execute("SELECT nome_item FROM inventario ORDER BY quantidade_disponivel DESC LIMIT 200")
+            self.modelos = [linha[0] for linha in cursor.fetchall()]
+            cursor.execute("SELECT nome, endereco, telefone FROM clientes ORDER BY id LIMIT 500")
+            self.clientes = cursor.fetchall()
+            cursor.execute("SELECT id FROM locacoes WHERE status = 'ativo' ORDER BY id DESC LIMIT 20000")
+            self.ativas = [linha[0] for linha in cursor.fetchall()]
+            cursor.execute("SELECT COUNT(*) FROM locacoes")
+            self.total_locacoes = cursor.fetchone()[0]
+        if not self.modelos or not self.clientes:
+            raise SystemExit("Base vazia: rode antes 'python -m benchmarks.gerador'.")
+        self.rnd = random.Random(semente)
+        self.lock = threading.Lock()
+        self.sequencia = 0
+
+    def proxima_ativa(self):
+        with self.lock:
+            return self.ativas.pop() if self.ativas else None
+
+    def proximo_numero(self):
+        with self.lock:
+            self.sequencia += 1
+            return self.sequencia
+
+
+def _requisitar(url, metodo="GET", corpo=None):
+    """Faz a requisição e retorna o status HTTP (0 em falha de conexão)."""
+    dados = json.dumps(corpo).encode() if corpo is not None else None
+    requisicao = urllib.request.Request(url, data=dados, method=metodo,
+                                        headers=comum.cabecalhos_http())
+    try:
+        with urllib.request.urlopen(requisicao, timeout=120) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as erro:
+        erro.read()
+        return erro.code
+    except OSError:
+        return 0
+
+
+def op_dashboard(base, ctx, rnd):
+    return [
+        _requisitar(f"{base}/reports/overview"),
+        _requisitar(f"{base}/notificacoes/nao-lidas"),
+        _requisitar(f"{base}/locacoes?limite=50"),
+        _requisitar(f"{base}/inventario"),
+    ]
+
+
+def op_criacao(base, ctx, rnd):
+    hoje = date.today()
+    nome, endereco, telefone = rnd.choice(ctx.clientes)
+    itens = [{"modelo": modelo, "quantidade": rnd.randint(1, 5)}
+             for modelo in rnd.sample(ctx.modelos, k=min(len(ctx.modelos), rnd.randint(1, 4)))]
+    return [_requisitar(f"{base}/locacoes", "POST", {
+        "nome_cliente": nome, "endereco_cliente": endereco, "telefone_cliente": telefone,
+        "data_inicio": hoje.isoformat(), "data_fim": (hoje + timedelta(days=rnd.randint(7, 60))).isoformat(),
+        "valor_total": 500, "valor_pago_entrega": 0, "valor_receber_final": 500,
+        "numero_nota": f"CARGA-{ctx.proximo_numero()}-{time.time_ns()}",
+        "itens": itens,
+    })]
+
+
+def op_devolucao(base, ctx, rnd):
+    locacao_id = ctx.proxima_ativa()
+    if locacao_id is None:
+        return []
+    return [_requisitar(f"{base}/locacoes/{locacao_id}/confirmar-devolucao", "POST", {})]
+
+
+def op_relatorios(base, ctx, rnd):
+    fim = date.today() - timedelta(days=rnd.randint(0, 365))
+    inicio = fim - timedelta(days=rnd.choice([30, 90, 365]))
+    periodo = f"start_date={inicio.isoformat()}&end_date={fim.isoformat()}"
+    return [
+        _requisitar(f"{base}/reports/overview?{periodo}"),
+        _requisitar(f"{base}/reports/status?{periodo}"),
+        _requisitar(f"{base}/reports/clients?search={rnd.choice(TERMOS_BUSCA)}"),
+    ]
+
+
+OPERACOES = {
+    "dashboard": op_dashboard,
+    "criacao": op_criacao,
+    "devolucao": op_devolucao,
+    "relatorios": op_relatorios,
+}
+
+
+def percentil(valores, p):
+    """Percentil por interpolação linear (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    abaixo = int(posicao)
+    acima = min(abaixo + 1, len(valores) - 1)
+    return valores[abaixo] + (valores[acima] - valores[abaixo]) * (posicao - abaixo)
+
+
+def executar(base, ctx, mistura, concorrencia, duracao=None, total=None, semente=42):
+    """
+    Dispara a mistura com `concorrencia` clientes até completar `total` operações ou `duracao`
+    segundos.
+
+    Retorna:
+        tuple: ({operacao: [latências em ms]}, {operacao: erros}, segundos decorridos)
+    """
+    nomes = list(MISTURAS[mistura])
+    pesos = [MISTURAS[mistura][nome] for nome in nomes]
+    latencias = defaultdict(list)
+    erros = defaultdict(int)
+    lock = threading.Lock()
+    restantes = [total]
+    limite = time.perf_counter() + duracao if duracao else None
+
+    def continuar():
+        if limite is not None and time.perf_counter() >= limite:
+            return False
+        if restantes[0] is None:
+            return True
+        with lock:
+            if restantes[0] <= 0:
+                return False
+            restantes[0] -= 1
+            return True
+
+    def cliente(numero):
+        rnd = random.Random(semente * 1000 + numero)
+        while continuar():
+            nome = rnd.choices(nomes, weights=pesos)[0]
+            inicio = time.perf_counter()
+            status = OPERACOES[nome](base, ctx, rnd)
+            decorrido_ms = (time.perf_counter() - inicio) * 1000
+            if not status:
+                continue
+            with lock:
+                latencias[nome].append(decorrido_ms)
+                if any(codigo == 0 or codigo >= 500 or codigo in (401, 403) for codigo in status):
+                    erros[nome] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(cliente, range(concorrencia)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def resumir(latencias, erros, segundos):
+    resumo = {}
+    for nome in sorted(latencias):
+        valores = sorted(latencias[nome])
+        resumo[nome] = {
+            "n": len(valores),
+            "erros": erros.get(nome, 0),
+            "p50_ms": round(percentil(valores, 50), 2),
+            "p95_ms": round(percentil(valores, 95), 2),
+            "p99_ms": round(percentil(valores, 99), 2),
+            "media_ms": round(statistics.fmean(valores), 2),
+            "max_ms": round(valores[-1], 2),
+            "ops_s": round(len(valores) / segundos, 2) if segundos else 0.0,
+        }
+    return resumo
+
+
+def commit_atual():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        sujo = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+        return saida.stdout.strip() + ("-sujo" if sujo else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resumo):
+    print(f"{'operação':<12} | {'n':>7} | {'erros':>5} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | "
+          f"{'média ms':>8} | {'ops/s':>7}")
+    print("-" * 84)
+    for nome, r in resumo.items():
+        print(f"{nome:<12} | {r['n']:>7} | {r['erros']:>5} | {r['p50_ms']:>8.1f} | {r['p95_ms']:>8.1f} | "
+              f"{r['p99_ms']:>8.1f} | {r['media_ms']:>8.1f} | {r['ops_s']:>7.1f}")
+
+
+def iniciar_servidor():
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    servidor = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com percentis por operação.")
+    parser.add_argument("--mistura", choices=sorted(MISTURAS), default="misto")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=30, help="Segundos de medição (ignorado com --requisicoes)")
+    parser.add_argument("--requisicoes", type=int, default=None, help="Número fixo de operações")
+    parser.add_argument("--aquecimento", type=int, default=20, help="Operações descartadas antes da medição")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--url", default=None, help="API já em execução (padrão: sobe a aplicação localmente)")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    comum.preparar_banco()
+    ctx = Contexto(args.semente)
+    servidor = None
+    base = args.url.rstrip("/") if args.url else None
+    if base is None:
+        servidor, base = iniciar_servidor()
+
+    try:
+        if args.aquecimento:
+            executar(base, ctx, args.mistura, args.concorrencia, total=args.aquecimento, semente=args.semente + 1)
+        latencias, erros, segundos = executar(
+            base, ctx, args.mistura, args.concorrencia,
+            duracao=None if args.requisicoes else args.duracao, total=args.requisicoes, semente=args.semente,
+        )
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+
+    resumo = resumir(latencias, erros, segundos)
+    resultado = {
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "schema": comum.SCHEMA,
+        "locacoes": ctx.total_locacoes,
+        "mistura": args.mistura,
+        "concorrencia": args.concorrencia,
+        "segundos": round(segundos, 2),
+        "url": args.url or "local",
+        "operacoes": resumo,
+    }
+    print(f"commit={resultado['commit']} locacoes={ctx.total_locacoes} mistura={args.mistura} "
+          f"concorrencia={args.concorrencia} segundos={resultado['segundos']}")
+    imprimir(resumo)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"Resultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
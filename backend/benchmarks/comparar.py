@@ -0,0 +1,74 @@
+"""
+Compara dois resultados de benchmarks.carga (por exemplo, antes e depois de um commit).
+
+Mostra, por operação, p50/p95/p99 e vazão de cada execução e a variação percentual, e marca
+as regressões acima do limite. Sai com código 1 se houver regressão, para uso em scripts.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.comparar base.json novo.json [--limite 10]
+"""
+import argparse
+import json
+import sys
+
+METRICAS = ("p50_ms", "p95_ms", "p99_ms", "ops_s")
+
+
+def variacao(antes, depois):
+    if not antes:
+        return 0.0
+    return (depois - antes) / antes * 100
+
+
+def comparar(base, novo, limite):
+    """
+    Retorna:
+        list: (operacao, metrica, antes, depois, variação %, regressão?) para cada métrica.
+    """
+    linhas = []
+    for operacao in sorted(set(base["operacoes"]) | set(novo["operacoes"])):
+        antes = base["operacoes"].get(operacao)
+        depois = novo["operacoes"].get(operacao)
+        if not antes or not depois:
+            continue
+        for metrica in METRICAS:
+            delta = variacao(antes[metrica], depois[metrica])
+            # Latência maior ou vazão menor é pior
+            pior = delta < -limite if metrica == "ops_s" else delta > limite
+            linhas.append((operacao, metrica, antes[metrica], depois[metrica], delta, pior))
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmarks.carga.")
+    parser.add_argument("base")
+    parser.add_argument("novo")
+    parser.add_argument("--limite", type=float, default=10, help="Variação (%%) considerada regressão")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(args.novo, encoding="utf-8") as arquivo:
+        novo = json.load(arquivo)
+
+    print(f"base: commit={base['commit']} locacoes={base['locacoes']} mistura={base['mistura']} "
+          f"concorrencia={base['concorrencia']}")
+    print(f"novo: commit={novo['commit']} locacoes={novo['locacoes']} mistura={novo['mistura']} "
+          f"concorrencia={novo['concorrencia']}")
+    for campo in ("locacoes", "mistura", "concorrencia"):
+        if base[campo] != novo[campo]:
+            print(f"Atenção: '{campo}' difere entre as execuções; a comparação pode não ser válida.")
+
+    linhas = comparar(base, novo, args.limite)
+    print(f"\n{'operação':<12} | {'métrica':<7} | {'base':>9} | {'novo':>9} | {'variação':>9}")
+    print("-" * 60)
+    for operacao, metrica, antes, depois, delta, pior in linhas:
+        marca = "  <- regressão" if pior else ""
+        print(f"{operacao:<12} | {metrica:<7} | {antes:>9.1f} | {depois:>9.1f} | {delta:>+8.1f}%{marca}")
+
+    if any(pior for *_, pior in linhas):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
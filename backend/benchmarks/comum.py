@@ -0,0 +1,155 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os benchmarks rodam em um schema PostgreSQL próprio (padrão: 'benchmark', configurável por
+BENCH_SCHEMA) para não tocar nos dados reais. Este módulo precisa ser importado antes de
+'database', pois define o search_path das conexões via PGOPTIONS.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.bench_listagem_locacoes
+"""
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+SCHEMA = os.getenv('BENCH_SCHEMA', 'benchmark')
+os.environ['PGOPTIONS'] = f"-c search_path={SCHEMA}"
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+import database
+from instrumentacao import CursorInstrumentado
+
+
+class CursorContador(CursorInstrumentado):
+    """Cursor que conta quantas instruções foram enviadas ao banco (mantendo a instrumentação)."""
+    total = 0
+
+    def execute(self, query, vars=None):
+        CursorContador.total += 1
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        CursorContador.total += 1
+        return super().executemany(query, vars_list)
+
+
+def preparar_banco():
+    """Cria o schema de benchmark, as tabelas e instala o cursor contador no pool."""
+    conn = psycopg2.connect(**database.DB_CONFIG)
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    finally:
+        conn.close()
+
+    database.close_all_connections()
+    database.DB_CONFIG['cursor_factory'] = CursorContador
+    database.initialize_connection_pool()
+    database.create_tables()
+
+
+def limpar_tabelas():
+    """Remove todos os dados das tabelas do schema de benchmark."""
+    conn = database.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                TRUNCATE notificacoes, registro_danos, itens_locados, locacoes, inventario, clientes,
+                         relatorio_locacoes_diario, relatorio_clientes_diario, relatorio_itens_diario
+                RESTART IDENTITY CASCADE
+            ''')
+        conn.commit()
+    finally:
+        database.release_connection(conn)
+
+
+def popular(total_locacoes, itens_por_locacao=3, total_itens_inventario=50, total_clientes=None, semente=42):
+    """
+    Popula o schema de benchmark com dados sintéticos.
+
+    Parâmetros:
+        total_locacoes (int): Número de locações a criar.
+        itens_por_locacao (int): Número de linhas em itens_locados por locação.
+        total_itens_inventario (int): Número de itens distintos no inventário.
+        total_clientes (int, optional): Número de clientes. Padrão: um cliente a cada 5 locações.
+        semente (int): Semente do gerador aleatório, para resultados reprodutíveis.
+    """
+    rnd = random.Random(semente)
+    total_clientes = total_clientes or max(1, total_locacoes // 5)
+    limpar_tabelas()
+
+    conn = database.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            execute_values(cursor, '''
+                INSERT INTO clientes (nome, endereco, telefone, referencia) VALUES %s
+            ''', [(f"Cliente {i}", f"Rua {i}, {i % 300}", f"21{i:08d}", None) for i in range(1, total_clientes + 1)])
+
+            execute_values(cursor, '''
+                INSERT INTO inventario (nome_item, quantidade, quantidade_disponivel, tipo_item) VALUES %s
+            ''', [(f"Item {i}", 1_000_000, 1_000_000, rnd.choice(['andaimes', 'escoras', 'sapatas']))
+                  for i in range(1, total_itens_inventario + 1)])
+
+            hoje = date.today()
+            locacoes = []
+            for _ in range(total_locacoes):
+                inicio = hoje - timedelta(days=rnd.randint(0, 720))
+                fim = inicio + timedelta(days=rnd.randint(1, 60))
+                valor = round(rnd.uniform(100, 5000), 2)
+                status = 'concluido' if fim < hoje and rnd.random() < 0.8 else 'ativo'
+                locacoes.append((rnd.randint(1, total_clientes), inicio, fim, valor, 0, valor, status, None))
+            execute_values(cursor, '''
+                INSERT INTO locacoes (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega,
+                                      valor_receber_final, status, numero_nota)
+                VALUES %s
+            ''', locacoes, page_size=1000)
+
+            itens = [
+                (locacao_id, rnd.randint(1, total_itens_inventario), rnd.randint(1, 50), locacoes[locacao_id - 1][1])
+                for locacao_id in range(1, total_locacoes + 1)
+                for _ in range(itens_por_locacao)
+            ]
+            execute_values(cursor, '''
+                INSERT INTO itens_locados (locacao_id, item_id, quantidade, data_alocacao) VALUES %s
+            ''', itens, page_size=1000)
+            cursor.execute("ANALYZE")
+        conn.commit()
+    finally:
+        database.release_connection(conn)
+
+
+def medir(funcao, repeticoes=5):
+    """
+    Executa a função várias vezes e mede tempo e número de instruções SQL.
+
+    Retorna:
+        tuple: (mediana em ms, instruções SQL por execução)
+    """
+    tempos = []
+    consultas = 0
+    for _ in range(repeticoes):
+        inicio_contador = CursorContador.total
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = CursorContador.total - inicio_contador
+    return statistics.median(tempos), consultas
+
+
+# Usuário fictício dos testes HTTP; o token só é aceito por servidores com a mesma SECRET_KEY
+USUARIO_BENCHMARK = {"id": 0, "nome": "Benchmark", "email": "benchmark@local", "cargo": "admin"}
+_cabecalhos = None
+
+
+def cabecalhos_http():
+    """Cabeçalhos JSON com um token válido, para as rotas que exigem autenticação."""
+    global _cabecalhos
+    if _cabecalhos is None:
+        from auth_tokens import emitir_token
+        _cabecalhos = {"Content-Type": "application/json",
+                       "Authorization": f"Bearer {emitir_token(USUARIO_BENCHMARK)}"}
+    return _cabecalhos
@@ -0,0 +1,259 @@
+"""
+Gerador de dados sintéticos para benchmarks e testes de carga (substitui o antigo
+database/seed.py, que ainda gravava em sqlite3).
+
+Preenche clientes, inventário, locações, itens locados, registro de danos e notificações em
+escala configurável (de 1 mil a 1 milhão de locações), de forma reprodutível pela semente:
+    - nomes de clientes e itens em português, com acentos;
+    - locações espalhadas nos últimos 3 anos: concluídas (com data de devolução), ativas no
+      prazo e ativas atrasadas;
+    - o estoque de cada item é o total locado em aberto mais uma folga, de modo que
+      quantidade_disponivel seja coerente com as locações ativas;
+    - danos em parte das locações concluídas, notificações lidas antigas e as automáticas
+      geradas por Notificacao.gerar_notificacoes_automaticas.
+
+Os dados são carregados com COPY, com os triggers de usuário desligados durante a carga; em
+seguida os resumos dos relatórios são reconstruídos (relatorio_reconstruir).
+
+Uso (a partir do diretório backend; o schema vem de BENCH_SCHEMA, padrão 'benchmark'):
+    python -m benchmarks.gerador [LOCACOES] [--semente N]
+    python -m benchmarks.gerador 100k
+    BENCH_SCHEMA=public python -m benchmarks.gerador 10k --forcar   # dados de desenvolvimento
+"""
+import argparse
+import csv
+import io
+import itertools
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from psycopg2.extras import execute_values
+
+from benchmarks import comum
+import database
+
+# Linhas enviadas por COPY de cada vez
+LOTE_COPY = 50_000
+
+PRENOMES = ["João", "José", "Antônio", "Francisco", "Conceição", "Luís", "Márcia", "Sebastião", "Inês",
+            "André", "Fátima", "Ana", "Carlos", "Paulo", "Lúcia", "Raimundo", "Cláudia", "Simão",
+            "Vitória", "Débora", "Mônica", "Sérgio", "Rogério", "Letícia", "Valéria"]
+SOBRENOMES = ["Conceição", "Gonçalves", "Magalhães", "Araújo", "Simões", "Brandão", "Assunção",
+              "Guimarães", "Silva", "Souza", "Pereira", "Lima", "Frazão", "Loureiro", "Estêvão",
+              "Falcão", "Ribeiro", "Carvalho", "Nogueira", "Antunes"]
+EMPRESAS = ["Construtora", "Engenharia", "Reformas", "Obras", "Empreiteira"]
+BAIRROS = ["Centro", "Tijuca", "Méier", "Madureira", "Jacarepaguá", "Campo Grande", "Bangu",
+           "Niterói", "São Gonçalo", "Duque de Caxias", "Nova Iguaçu", "Penha"]
+
+TIPOS_ITEM = {
+    "andaimes": ["Andaime tubular {}m", "Andaime fachadeiro {}m", "Plataforma de andaime {}m"],
+    "escoras": ["Escora metálica {}m", "Escora de laje {}m"],
+    "sapatas": ["Sapata ajustável {}cm", "Sapata fixa {}cm"],
+    "acessorios": ["Rodízio {}pol", "Guarda-corpo {}m", "Travessa {}m", "Diagonal {}m"],
+}
+MEDIDAS = ["1,0", "1,5", "2,0", "2,5", "3,0", "4,0", "5,0", "6,0"]
+
+PROBLEMAS = ["Peça amassada", "Trava quebrada", "Ferrugem excessiva", "Rosca danificada", "Solda trincada"]
+
+# Escalas nomeadas aceitas na linha de comando
+ESCALAS = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def _copiar(cursor, tabela, colunas, linhas):
+    """Envia as linhas por COPY em lotes de LOTE_COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pendentes = 0
+
+    def enviar():
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for linha in linhas:
+        writer.writerow(["" if valor is None else valor for valor in linha])
+        pendentes += 1
+        if pendentes >= LOTE_COPY:
+            enviar()
+            pendentes = 0
+    if pendentes:
+        enviar()
+
+
+def _nomes_itens(total):
+    nomes = []
+    for tipo, modelos in TIPOS_ITEM.items():
+        for modelo in modelos:
+            for medida in MEDIDAS:
+                nomes.append((modelo.format(medida), tipo))
+    # Completa com variações numeradas se a escala pedir mais itens que o catálogo
+    i = 1
+    while len(nomes) < total:
+        base, tipo = nomes[i % len(nomes)]
+        nomes.append((f"{base} lote {i}", tipo))
+        i += 1
+    return nomes[:total]
+
+
+def gerar(total_locacoes, semente=42, total_clientes=None, total_itens=None):
+    """
+    Limpa as tabelas do schema e gera o conjunto de dados.
+
+    Parâmetros:
+        total_locacoes (int): Número de locações.
+        semente (int): Semente do gerador aleatório.
+        total_clientes (int, optional): Padrão: uma a cada 8 locações (mínimo 50).
+        total_itens (int, optional): Padrão: o catálogo (cerca de 100 itens), crescendo com a escala.
+
+    Retorna:
+        dict: Quantidade de linhas geradas por tabela e tempo de carga.
+    """
+    rnd = random.Random(semente)
+    total_clientes = total_clientes or max(50, total_locacoes // 8)
+    total_itens = total_itens or max(80, min(2000, total_locacoes // 500))
+    hoje = date.today()
+    inicio_carga = time.perf_counter()
+
+    comum.limpar_tabelas()
+    conn = database.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for tabela in ("locacoes", "itens_locados", "notificacoes"):
+                cursor.execute(f"ALTER TABLE {tabela} DISABLE TRIGGER USER")
+
+            _copiar(cursor, "clientes", ["nome", "endereco", "telefone", "referencia"], (
+                (f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+                 if rnd.random() < 0.8 else f"{rnd.choice(EMPRESAS)} {rnd.choice(SOBRENOMES)} {i}",
+                 f"Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 2000)} - {rnd.choice(BAIRROS)}",
+                 f"21{rnd.randint(900000000, 999999999)}",
+                 None)
+                for i in range(1, total_clientes + 1)
+            ))
+
+            itens = _nomes_itens(total_itens)
+            _copiar(cursor, "inventario", ["nome_item", "quantidade", "quantidade_disponivel", "tipo_item"],
+                    ((nome, 0, 0, tipo) for nome, tipo in itens))
+
+            # Popularidade desigual dos itens (alguns modelos saem muito mais)
+            ids_itens = range(1, total_itens + 1)
+            pesos_acumulados = list(itertools.accumulate(1 / posicao ** 0.8 for posicao in ids_itens))
+            em_aberto = defaultdict(int)
+            contagem = {"itens_locados": 0, "registro_danos": 0, "notificacoes": 0}
+            danos = []
+            notificacoes = []
+
+            # Locações e seus itens são gerados e enviados em lotes, para não manter tudo em memória
+            for primeiro in range(1, total_locacoes + 1, LOTE_COPY):
+                lote_locacoes = []
+                lote_itens = []
+                for locacao_id in range(primeiro, min(primeiro + LOTE_COPY, total_locacoes + 1)):
+                    inicio = hoje - timedelta(days=rnd.randint(0, 3 * 365))
+                    fim = inicio + timedelta(days=rnd.randint(7, 90))
+                    valor = round(rnd.uniform(150, 12000), 2)
+                    pago = round(valor * rnd.choice([0, 0, 0.3, 0.5, 1]), 2)
+                    if fim < hoje and rnd.random() < 0.93:
+                        status, devolucao = 'concluido', fim + timedelta(days=rnd.randint(-3, 5))
+                    else:
+                        status, devolucao = 'ativo', None
+                    lote_locacoes.append((locacao_id, rnd.randint(1, total_clientes), inicio, fim, valor, pago,
+                                          round(valor - pago, 2), status, devolucao, f"NF-{locacao_id:07d}"))
+
+                    linhas_itens = []
+                    for item_id in set(rnd.choices(ids_itens, cum_weights=pesos_acumulados, k=rnd.randint(1, 6))):
+                        quantidade = rnd.randint(1, 80)
+                        linhas_itens.append((item_id, quantidade))
+                        lote_itens.append((locacao_id, item_id, quantidade, inicio, devolucao))
+                        if status == 'ativo':
+                            em_aberto[item_id] += quantidade
+                    if status == 'concluido' and rnd.random() < 0.02:
+                        item_id, quantidade = rnd.choice(linhas_itens)
+                        danos.append((item_id, locacao_id, rnd.randint(1, quantidade),
+                                      rnd.choice(PROBLEMAS), devolucao))
+                    if status == 'concluido' and devolucao > fim and rnd.random() < 0.3:
+                        notificacoes.append(('devolucao_atrasada', f"Devolução Atrasada: locação {locacao_id}",
+                                             f"A devolução da locação {locacao_id} está atrasada.",
+                                             locacao_id, True, fim + timedelta(days=1)))
+
+                _copiar(cursor, "locacoes", ["id", "cliente_id", "data_inicio", "data_fim", "valor_total",
+                                             "valor_pago_entrega", "valor_receber_final", "status",
+                                             "data_devolucao_efetiva", "numero_nota"], lote_locacoes)
+                _copiar(cursor, "itens_locados",
+                        ["locacao_id", "item_id", "quantidade", "data_alocacao", "data_devolucao"], lote_itens)
+                contagem["itens_locados"] += len(lote_itens)
+            cursor.execute("SELECT setval(pg_get_serial_sequence('locacoes', 'id'), %s)", (max(total_locacoes, 1),))
+
+            _copiar(cursor, "registro_danos",
+                    ["item_id", "locacao_id", "quantidade_danificada", "descricao_problema", "data_registro"], danos)
+            _copiar(cursor, "notificacoes",
+                    ["tipo", "titulo", "mensagem", "relacionado_id", "lida", "data_criacao"], notificacoes)
+            contagem["registro_danos"] = len(danos)
+            contagem["notificacoes"] = len(notificacoes)
+
+            # Estoque = o que está locado em aberto + folga; alguns itens ficam quase esgotados
+            estoque = []
+            for item_id in range(1, total_itens + 1):
+                locado = em_aberto.get(item_id, 0)
+                folga = rnd.randint(0, max(1, locado // 20)) if rnd.random() < 0.05 else rnd.randint(200, 5000)
+                estoque.append((item_id, locado + folga, folga))
+            execute_values(cursor, '''
+                UPDATE inventario AS inv
+                SET quantidade = v.quantidade, quantidade_disponivel = v.disponivel
+                FROM (VALUES %s) AS v(id, quantidade, disponivel)
+                WHERE inv.id = v.id
+            ''', estoque, page_size=1000)
+
+            for tabela in ("locacoes", "itens_locados", "notificacoes"):
+                cursor.execute(f"ALTER TABLE {tabela} ENABLE TRIGGER USER")
+            cursor.execute("SELECT relatorio_reconstruir()")
+            cursor.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        database.release_connection(conn)
+
+    from models.notificacao import Notificacao
+    contagem["notificacoes"] += Notificacao.gerar_notificacoes_automaticas() or 0
+
+    return {
+        "clientes": total_clientes,
+        "inventario": total_itens,
+        "locacoes": total_locacoes,
+        **contagem,
+        "segundos": round(time.perf_counter() - inicio_carga, 1),
+    }
+
+
+def interpretar_escala(valor):
+    """Aceita um número ou uma escala nomeada (1k, 10k, 100k, 1m)."""
+    valor = valor.lower().replace("_", "")
+    if valor in ESCALAS:
+        return ESCALAS[valor]
+    return int(valor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no schema de benchmark.")
+    parser.add_argument("locacoes", nargs="?", default="10k", help="Número de locações ou 1k/10k/100k/1m")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--clientes", type=int, default=None)
+    parser.add_argument("--itens", type=int, default=None)
+    parser.add_argument("--forcar", action="store_true", help="Permite apagar e gerar dados no schema public")
+    args = parser.parse_args()
+
+    if comum.SCHEMA == 'public' and not args.forcar:
+        sys.exit("O schema public contém os dados reais; use --forcar para apagá-los e gerar dados sintéticos.")
+
+    comum.preparar_banco()
+    resumo = gerar(interpretar_escala(args.locacoes), semente=args.semente,
+                   total_clientes=args.clientes, total_itens=args.itens)
+    print(f"Schema '{comum.SCHEMA}': " + ", ".join(f"{chave}={valor}" for chave, valor in resumo.items()))
+
+
+if __name__ == "__main__":
+    main()
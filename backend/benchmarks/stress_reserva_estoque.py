@@ -0,0 +1,105 @@
+"""
+Teste de estresse da reserva de estoque: N requisições POST /locacoes simultâneas disputando
+o mesmo item.
+
+Sobe a aplicação em um servidor local com threads (schema de benchmark), coloca ESTOQUE
+unidades de um único item no inventário e dispara N pedidos paralelos de QUANTIDADE unidades.
+Ao final verifica que:
+    - exatamente ESTOQUE // QUANTIDADE pedidos foram aceitos (201) e os demais recusados (409)
+    - quantidade_disponivel nunca ficou negativa e bate com o que foi locado
+    - nenhuma requisição falhou com erro de banco (deadlock, CHECK constraint etc.)
+
+Uso (a partir do diretório backend):
+    python -m benchmarks.stress_reserva_estoque [N] [ESTOQUE] [QUANTIDADE]
+"""
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks import comum
+from database import transaction
+
+
+def preparar_item(estoque):
+    comum.popular(0, total_itens_inventario=1, total_clientes=1)
+    with transaction() as cursor:
+        cursor.execute('''
+            UPDATE inventario SET quantidade = %s, quantidade_disponivel = %s WHERE id = 1
+        ''', (estoque, estoque))
+
+
+def iniciar_servidor():
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    servidor = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def criar_locacao(url, numero, quantidade, barreira):
+    hoje = date.today()
+    corpo = json.dumps({
+        "nome_cliente": "Cliente 1", "endereco_cliente": "Rua 1, 1", "telefone_cliente": "2100000001",
+        "data_inicio": hoje.isoformat(), "data_fim": (hoje + timedelta(days=30)).isoformat(),
+        "valor_total": 100, "valor_pago_entrega": 0, "valor_receber_final": 100,
+        "numero_nota": f"STRESS-{numero}",
+        "itens": [{"modelo": "Item 1", "quantidade": quantidade}],
+    }).encode()
+    requisicao = urllib.request.Request(f"{url}/locacoes", data=corpo, method="POST",
+                                        headers=comum.cabecalhos_http())
+    barreira.wait()
+    try:
+        with urllib.request.urlopen(requisicao, timeout=60) as resposta:
+            return resposta.status
+    except urllib.error.HTTPError as erro:
+        return erro.code
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    estoque = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    quantidade = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    comum.preparar_banco()
+    preparar_item(estoque)
+    servidor, url = iniciar_servidor()
+
+    barreira = threading.Barrier(total)
+    inicio = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=total) as executor:
+            respostas = list(executor.map(lambda n: criar_locacao(url, n, quantidade, barreira), range(total)))
+    finally:
+        servidor.shutdown()
+    duracao = time.perf_counter() - inicio
+
+    with transaction() as cursor:
+        cursor.execute('''
+            SELECT inv.quantidade_disponivel, COALESCE(SUM(il.quantidade), 0)
+            FROM inventario inv
+            LEFT JOIN itens_locados il ON il.item_id = inv.id
+            WHERE inv.id = 1
+            GROUP BY inv.quantidade_disponivel
+        ''')
+        disponivel, locado = cursor.fetchone()
+
+    contagem = Counter(respostas)
+    esperado = min(total, estoque // quantidade)
+    print(f"{total} requisições em {duracao:.2f}s: {dict(contagem)}")
+    print(f"estoque inicial={estoque} locado={locado} disponivel={disponivel}")
+
+    assert contagem[201] == esperado, f"Esperava {esperado} locações aceitas, obteve {contagem[201]}"
+    assert contagem[409] == total - esperado, f"Esperava {total - esperado} recusas 409, obteve {contagem[409]}"
+    assert disponivel >= 0 and disponivel + locado == estoque, "Estoque inconsistente após a disputa"
+    print("OK: nenhuma venda acima do estoque e nenhuma falha de banco.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Cache de respostas das rotas de leitura quase estáticas (inventário, clientes e as buscas
+de /reports/clients e /reports/items).
+
+Cada resposta 200 é guardada por CACHE_TTL segundos, com no máximo CACHE_MAX_ENTRADAS
+entradas (a menos usada sai primeiro), e leva um ETag calculado do conteúdo: requisições com
+If-None-Match igual recebem 304 sem corpo. As entradas pertencem a grupos ('inventario',
+'clientes'); os métodos de escrita dos modelos chamam invalidar(grupo), que só vale após o
+commit da transação.
+
+As entradas ficam na memória de cada processo, mas a versão de cada grupo fica no banco
+(tabela cache_versoes, migração 0010): invalidar() a incrementa após o commit e cada
+requisição lê as versões dos seus grupos (uma consulta pela chave primária) antes de usar
+uma entrada. Assim uma escrita feita em qualquer worker invalida o cache de todos. Se a
+versão não puder ser lida, a rota é executada sem cache. Defina CACHE_TTL=0 para desativar.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import psycopg2
+from flask import request, make_response
+from psycopg2 import pool
+
+from database import ao_confirmar, transaction
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CABECALHO_CACHE = 'X-Cache'
+
+
+class CacheRespostas:
+    def __init__(self, ttl=None, max_entradas=None):
+        self.ttl = float(ttl if ttl is not None else os.getenv('CACHE_TTL', '60'))
+        self.max_entradas = int(max_entradas if max_entradas is not None
+                                else os.getenv('CACHE_MAX_ENTRADAS', '256'))
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._metricas = {
+            "acertos": 0,
+            "falhas": 0,
+            "nao_modificados": 0,
+            "invalidacoes": 0,
+            "expiradas": 0,
+            "despejadas": 0,
+        }
+
+    @staticmethod
+    def _versoes_atuais(grupos):
+        """
+        Lê no banco a versão atual de cada grupo; uma entrada só vale se foi gerada nessas versões.
+
+        Retorna:
+            tuple: Versões na ordem dos grupos.
+        """
+        with transaction() as cursor:
+            cursor.execute("SELECT grupo, versao FROM cache_versoes WHERE grupo = ANY(%s)", (list(grupos),))
+            versoes = dict(cursor.fetchall())
+        return tuple(versoes.get(grupo, 0) for grupo in grupos)
+
+    def _obter(self, chave, versoes):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._metricas["falhas"] += 1
+                return None
+            if entrada["expira_em"] <= time.monotonic() or entrada["versoes"] != versoes:
+                del self._entradas[chave]
+                self._metricas["expiradas"] += 1
+                self._metricas["falhas"] += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self._metricas["acertos"] += 1
+            return entrada
+
+    def _guardar(self, chave, grupos, versoes, resposta):
+        corpo = resposta.get_data()
+        entrada = {
+            "corpo": corpo,
+            "mimetype": resposta.mimetype,
+            "etag": hashlib.sha1(corpo).hexdigest(),
+            "grupos": frozenset(grupos),
+            "versoes": versoes,
+            "expira_em": time.monotonic() + self.ttl,
+        }
+        # Uma escrita confirmada durante a consulta incrementa a versão do grupo, e a entrada
+        # (marcada com as versões lidas antes da consulta) é recusada na próxima leitura
+        with self._lock:
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._metricas["despejadas"] += 1
+        return entrada
+
+    def _responder(self, entrada, situacao):
+        if request.if_none_match.contains_weak(entrada["etag"]):
+            with self._lock:
+                self._metricas["nao_modificados"] += 1
+            resposta = make_response("", 304)
+        else:
+            resposta = make_response(entrada["corpo"], 200)
+            resposta.mimetype = entrada["mimetype"]
+        resposta.set_etag(entrada["etag"])
+        # Permite guardar no navegador, mas exige revalidação (respondida com 304 se nada mudou)
+        resposta.headers["Cache-Control"] = "private, no-cache"
+        resposta.headers[CABECALHO_CACHE] = situacao
+        return resposta
+
+    def em_cache(self, *grupos):
+        """
+        Decorador de rotas GET cujas respostas dependem apenas da URL e dos grupos informados.
+
+        Parâmetros:
+            grupos (str): Grupos de dados lidos pela rota ('inventario', 'clientes').
+        """
+        def decorador(funcao):
+            @wraps(funcao)
+            def rota_em_cache(*args, **kwargs):
+                if self.ttl <= 0 or request.method != 'GET':
+                    return funcao(*args, **kwargs)
+
+                try:
+                    versoes = self._versoes_atuais(grupos)
+                except (psycopg2.Error, pool.PoolError) as e:
+                    logger.warning(f"Versões do cache indisponíveis; respondendo sem cache: {e}")
+                    return funcao(*args, **kwargs)
+
+                chave = (request.path, tuple(sorted(request.args.items(multi=True))))
+                entrada = self._obter(chave, versoes)
+                if entrada is not None:
+                    return self._responder(entrada, 'HIT')
+
+                resposta = make_response(funcao(*args, **kwargs))
+                if resposta.status_code != 200 or resposta.is_streamed:
+                    return resposta
+                entrada = self._guardar(chave, grupos, versoes, resposta)
+                return self._responder(entrada, 'MISS')
+            return rota_em_cache
+        return decorador
+
+    def _descartar(self, grupos):
+        try:
+            with transaction() as cursor:
+                cursor.execute(
+                    "UPDATE cache_versoes SET versao = versao + 1 WHERE grupo = ANY(%s)", (list(grupos),)
+                )
+        except (psycopg2.Error, pool.PoolError) as e:
+            # A escrita já foi confirmada; os outros workers só a verão quando as entradas expirarem
+            logger.error(f"Erro ao incrementar a versão do cache ({', '.join(grupos)}): {e}")
+        with self._lock:
+            self._metricas["invalidacoes"] += 1
+            # As entradas obsoletas já seriam recusadas pela versão; removê-las libera memória
+            obsoletas = [chave for chave, entrada in self._entradas.items()
+                         if not entrada["grupos"].isdisjoint(grupos)]
+            for chave in obsoletas:
+                del self._entradas[chave]
+        logger.debug(f"Cache de respostas invalidado: {', '.join(grupos)} ({len(obsoletas)} entradas).")
+
+    def invalidar(self, *grupos):
+        """
+        Descarta as respostas dos grupos informados, em todos os workers, após o commit da
+        transação em andamento (ou na hora, se não houver transação).
+        """
+        ao_confirmar(lambda: self._descartar(grupos))
+
+    def limpar(self):
+        """Remove todas as entradas."""
+        with self._lock:
+            self._entradas.clear()
+
+    def metricas(self):
+        """
+        Retorna:
+            dict: Contadores de uso do cache deste processo e a taxa de acerto.
+        """
+        with self._lock:
+            metricas = dict(self._metricas)
+            metricas["entradas"] = len(self._entradas)
+        consultas = metricas["acertos"] + metricas["falhas"]
+        metricas["taxa_acerto"] = round(metricas["acertos"] / consultas, 4) if consultas else None
+        metricas["ttl_s"] = self.ttl
+        metricas["max_entradas"] = self.max_entradas
+        return metricas
+
+
+cache_respostas = CacheRespostas()
@@ -0,0 +1,164 @@
+"""
+Canal de notificações em tempo real (PostgreSQL LISTEN/NOTIFY -> Server-Sent Events).
+
+O trigger trg_notificacoes_notify (migração 0003) publica no canal 'notificacoes' cada
+inserção, alteração ou exclusão. Cada processo mantém uma única conexão dedicada em LISTEN,
+aberta apenas enquanto houver clientes conectados ao stream, e repassa os eventos para a fila
+de cada cliente. Assim o custo no banco é uma conexão e uma consulta por evento por processo,
+independente do número de abas abertas.
+
+Cada cliente conectado ocupa uma thread do servidor enquanto o stream durar. Com
+NOTIFICACOES_STREAMS_MAX > 0, o processo aceita no máximo essa quantidade de streams
+simultâneos e assinar() levanta CanalLotado para os seguintes, de modo que as threads
+restantes continuem atendendo a API (o gunicorn.conf.py define o limite a partir de
+GUNICORN_THREADS). Com 0, não há limite.
+"""
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from database import DB_CONFIG
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CANAL = 'notificacoes'
+
+
+class CanalLotado(Exception):
+    """O processo já atende o número máximo de streams simultâneos."""
+
+
+class CanalNotificacoes:
+    # Eventos pendentes por cliente; um cliente que não consome é desconectado
+    TAMANHO_FILA = 100
+    # Intervalo máximo de espera no select, para perceber quando não há mais clientes
+    INTERVALO_ESPERA = 5
+    # Espera antes de reconectar após falha na conexão de escuta
+    ESPERA_RECONEXAO = 5
+
+    def __init__(self, max_assinantes=None):
+        self.max_assinantes = int(max_assinantes if max_assinantes is not None
+                                  else os.getenv('NOTIFICACOES_STREAMS_MAX') or 0)
+        self._assinantes = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def assinar(self):
+        """
+        Registra um novo cliente e garante que a escuta esteja ativa.
+
+        Retorna:
+            queue.Queue: Fila que recebe os eventos (dicionários) destinados ao cliente.
+
+        Levanta:
+            CanalLotado: Se o processo já tiver max_assinantes clientes conectados.
+        """
+        fila = queue.Queue(maxsize=self.TAMANHO_FILA)
+        with self._lock:
+            if self.max_assinantes and len(self._assinantes) >= self.max_assinantes:
+                raise CanalLotado(f"Limite de {self.max_assinantes} streams simultâneos atingido.")
+            self._assinantes.add(fila)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._escutar, name='canal-notificacoes', daemon=True)
+                self._thread.start()
+        return fila
+
+    def reiniciar_apos_fork(self):
+        """Esquece os clientes e a thread de escuta herdados do processo pai (chamar no filho)."""
+        self._assinantes = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def cancelar(self, fila):
+        """Remove um cliente do canal."""
+        with self._lock:
+            self._assinantes.discard(fila)
+
+    def total_assinantes(self):
+        with self._lock:
+            return len(self._assinantes)
+
+    def _publicar(self, evento):
+        with self._lock:
+            assinantes = list(self._assinantes)
+        for fila in assinantes:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                # Cliente parado: encerra o stream dele em vez de acumular eventos
+                logger.warning("Fila de notificações cheia; desconectando cliente lento.")
+                self.cancelar(fila)
+                try:
+                    fila.get_nowait()
+                    fila.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    @staticmethod
+    def _carregar_evento(cursor, payload):
+        """Converte o payload do NOTIFY no evento enviado aos clientes."""
+        dados = json.loads(payload)
+        evento = {"operacao": dados["operacao"], "id": dados["id"], "notificacao": None}
+        if dados["operacao"] != 'DELETE':
+            cursor.execute("""
+                SELECT id, tipo, titulo, mensagem, data_criacao, lida, relacionado_id
+                FROM notificacoes
+                WHERE id = %s
+            """, (dados["id"],))
+            notificacao = cursor.fetchone()
+            if notificacao:
+                evento["notificacao"] = {
+                    "id": notificacao[0],
+                    "tipo": notificacao[1],
+                    "titulo": notificacao[2],
+                    "mensagem": notificacao[3],
+                    "data_criacao": notificacao[4],
+                    "lida": bool(notificacao[5]),
+                    "relacionado_id": notificacao[6]
+                }
+        return evento
+
+    def _sem_assinantes(self):
+        """Encerra a thread de escuta se não houver mais clientes (checado sob o lock)."""
+        with self._lock:
+            if not self._assinantes:
+                self._thread = None
+                return True
+            return False
+
+    def _escutar(self):
+        while not self._sem_assinantes():
+            conn = None
+            try:
+                conn = psycopg2.connect(**DB_CONFIG)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CANAL}")
+                logger.info("Escutando o canal de notificações.")
+
+                while not self._sem_assinantes():
+                    if select.select([conn], [], [], self.INTERVALO_ESPERA) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notificacao = conn.notifies.pop(0)
+                        self._publicar(self._carregar_evento(cursor, notificacao.payload))
+                return
+            except Exception as e:
+                logger.error(f"Erro no canal de notificações: {e}; reconectando em {self.ESPERA_RECONEXAO}s.")
+                time.sleep(self.ESPERA_RECONEXAO)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+canal_notificacoes = CanalNotificacoes()
@@ -1,23 +1,8 @@
 import sys
-import hashlib
-import secrets
-import string
 from database import get_connection, release_connection
+from senhas import gerar_hash
 import psycopg2
 
-# Função para criar hash de senha
-def hash_senha(senha, salt=None):
-    if salt is None:
-        # Gerar um salt aleatório
-        caracteres = string.ascii_letters + string.digits
-        salt = ''.join(secrets.choice(caracteres) for _ in range(16))
-    
-    # Combinar senha e salt, e criar o hash
-    senha_salgada = (senha + salt).encode('utf-8')
-    hash_senha = hashlib.sha256(senha_salgada).hexdigest()
-    
-    return hash_senha, salt
-
 def criar_admin(nome, email, senha):
     """
     Cria um usuário administrador no PostgreSQL.
@@ -40,13 +25,13 @@ def criar_admin(nome, email, senha):
             return False
         
         # Hash da senha
-        hash_senha_valor, salt = hash_senha(senha)
+        hash_senha_valor = gerar_hash(senha)
         
         # Inserir o usuário administrador
         cursor.execute('''
             INSERT INTO usuarios (nome, email, hash_senha, salt, cargo)
-            VALUES (%s, %s, %s, %s, %s)
-        ''', (nome, email, hash_senha_valor, salt, 'admin'))
+            VALUES (%s, %s, %s, '', %s)
+        ''', (nome, email, hash_senha_valor, 'admin'))
         
         # Commit das alterações
         conn.commit()
@@ -1,8 +1,16 @@
 import psycopg2
+import psycopg2.extensions
 from psycopg2 import pool
 import logging
 import os
+import threading
+import time
+import contextvars
+import itertools
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from instrumentacao import CursorInstrumentado, registrar_espera_pool
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -18,43 +26,268 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME', 'andaimes_pini'),
     'user': os.getenv('DB_USER', 'postgres'),
     'password': os.getenv('DB_PASSWORD', ''),
+    # Mede cada consulta para o perfil por requisição e o log de consultas lentas (instrumentacao.py)
+    'cursor_factory': CursorInstrumentado,
 }
 
-# Pool de conexões
+# Diretório com as migrações versionadas do schema (arquivos NNNN_descricao.sql)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Configurações do pool de conexões (tempos em segundos)
+POOL_CONFIG = {
+    'minconn': int(os.getenv('DB_POOL_MIN', '1')),
+    'maxconn': int(os.getenv('DB_POOL_MAX', '20')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    'ping_after': float(os.getenv('DB_POOL_PING_AFTER', '30')),
+}
+
+class PoolConexoes:
+    """
+    Pool de conexões PostgreSQL seguro para uso entre threads.
+
+    - getconn bloqueia até haver conexão livre, respeitando um tempo máximo de espera;
+    - conexões fechadas, com transação pendente ou em estado desconhecido são descartadas;
+    - conexões ociosas há mais de ping_after segundos passam por um SELECT 1 antes de serem entregues;
+    - conexões são recicladas ao ultrapassar max_lifetime (idade) ou max_idle (tempo ociosa);
+    - metricas() expõe contadores de uso e tempo de espera.
+    """
+
+    def __init__(self, minconn, maxconn, timeout=10, max_lifetime=3600, max_idle=300, ping_after=30, **kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Configuração de pool inválida: é preciso 0 <= minconn <= maxconn e maxconn >= 1.")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self._kwargs = kwargs
+        self._cond = threading.Condition()
+        self._ociosas = deque()   # (conexão, criada_em, devolvida_em), mais recente à direita
+        self._em_uso = {}         # id(conexão) -> criada_em
+        self._total = 0           # conexões abertas ou sendo abertas
+        self._aguardando = 0
+        self._fechado = False
+        self._estatisticas = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'conexoes_criadas': 0,
+            'conexoes_descartadas': 0,
+            'espera_total_s': 0.0,
+            'espera_max_s': 0.0,
+        }
+        for _ in range(minconn):
+            with self._cond:
+                self._total += 1
+            conn = self._conectar()
+            with self._cond:
+                self._ociosas.append((conn, time.monotonic(), time.monotonic()))
+
+    def _conectar(self):
+        """Abre uma nova conexão; em caso de erro, libera a vaga reservada."""
+        try:
+            conn = psycopg2.connect(**self._kwargs)
+        except psycopg2.Error:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._estatisticas['conexoes_criadas'] += 1
+        return conn
+
+    def _descartar(self, conn):
+        """Fecha a conexão e libera sua vaga no pool."""
+        try:
+            if not conn.closed:
+                conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._estatisticas['conexoes_descartadas'] += 1
+            self._cond.notify()
+
+    def _expirada(self, criada_em, agora):
+        return self.max_lifetime and agora - criada_em > self.max_lifetime
+
+    def _esta_viva(self, conn, devolvida_em, agora):
+        """Verifica se a conexão pode ser entregue; faz um ping se ela ficou ociosa por muito tempo."""
+        if conn.closed or conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if agora - devolvida_em < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _remover_ociosas_vencidas(self, agora):
+        """Retira (sob o lock) as conexões ociosas mais antigas que max_idle, preservando minconn."""
+        vencidas = []
+        while (self._ociosas and self.max_idle and self._total - len(vencidas) > self.minconn
+               and agora - self._ociosas[0][2] > self.max_idle):
+            vencidas.append(self._ociosas.popleft()[0])
+        return vencidas
+
+    def getconn(self, timeout=None):
+        """
+        Obtém uma conexão do pool, aguardando até `timeout` segundos por uma vaga.
+
+        Levanta:
+            psycopg2.pool.PoolError: Se o pool estiver fechado ou o tempo de espera se esgotar.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        limite = inicio + timeout
+        while True:
+            with self._cond:
+                if self._fechado:
+                    raise pool.PoolError("O pool de conexões está fechado.")
+                vencidas = self._remover_ociosas_vencidas(time.monotonic())
+                candidata = None
+                criar = False
+                if self._ociosas:
+                    candidata = self._ociosas.pop()
+                elif self._total - len(vencidas) < self.maxconn:
+                    self._total += 1
+                    criar = True
+                elif not vencidas:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._estatisticas['timeouts'] += 1
+                        raise pool.PoolError(f"Nenhuma conexão livre após {timeout:.1f}s (máximo {self.maxconn}).")
+                    self._aguardando += 1
+                    try:
+                        self._cond.wait(restante)
+                    finally:
+                        self._aguardando -= 1
+                    continue
+            for conn in vencidas:
+                self._descartar(conn)
+            if candidata is None and not criar:
+                continue
+
+            agora = time.monotonic()
+            if criar:
+                conn, criada_em = self._conectar(), agora
+            else:
+                conn, criada_em, devolvida_em = candidata
+                if self._expirada(criada_em, agora) or not self._esta_viva(conn, devolvida_em, agora):
+                    self._descartar(conn)
+                    continue
+
+            espera = time.monotonic() - inicio
+            with self._cond:
+                self._em_uso[id(conn)] = criada_em
+                self._estatisticas['checkouts'] += 1
+                self._estatisticas['espera_total_s'] += espera
+                self._estatisticas['espera_max_s'] = max(self._estatisticas['espera_max_s'], espera)
+            registrar_espera_pool(espera)
+            return conn
+
+    def putconn(self, conn, close=False):
+        """Devolve a conexão ao pool, desfazendo transações pendentes e descartando conexões inválidas."""
+        with self._cond:
+            criada_em = self._em_uso.pop(id(conn), None)
+        if criada_em is None:
+            raise pool.PoolError("Conexão não pertence a este pool.")
+
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        if close or conn.closed or self._fechado or self._expirada(criada_em, time.monotonic()):
+            self._descartar(conn)
+            return
+        with self._cond:
+            self._ociosas.append((conn, criada_em, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Fecha as conexões ociosas e impede novos empréstimos; conexões em uso são fechadas ao serem devolvidas."""
+        with self._cond:
+            self._fechado = True
+            ociosas = [item[0] for item in self._ociosas]
+            self._ociosas.clear()
+            self._cond.notify_all()
+        for conn in ociosas:
+            self._descartar(conn)
+
+    def metricas(self):
+        """
+        Retorna um retrato do estado do pool.
+
+        Retorna:
+            dict: tamanho, em_uso, ociosas, aguardando, maximo e os contadores acumulados
+                  (checkouts, timeouts, conexoes_criadas, conexoes_descartadas, espera_total_s, espera_max_s).
+        """
+        with self._cond:
+            return {
+                'tamanho': self._total,
+                'em_uso': len(self._em_uso),
+                'ociosas': len(self._ociosas),
+                'aguardando': self._aguardando,
+                'maximo': self.maxconn,
+                **self._estatisticas,
+            }
+
+# Pool de conexões, criado na primeira conexão pedida (importar este módulo não abre conexões)
 connection_pool = None
+_lock_inicializacao = threading.Lock()
 
 def initialize_connection_pool():
     """Inicializa o pool de conexões PostgreSQL."""
     global connection_pool
     try:
-        if connection_pool is None:
-            connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=20,
-                **DB_CONFIG
+        with _lock_inicializacao:
+            if connection_pool is not None:
+                return
+            connection_pool = PoolConexoes(**POOL_CONFIG, **DB_CONFIG)
+            logger.info(
+                f"Pool de conexões PostgreSQL criado com sucesso. Database: {DB_CONFIG['database']} "
+                f"(mín. {POOL_CONFIG['minconn']}, máx. {POOL_CONFIG['maxconn']})"
             )
-            logger.info(f"Pool de conexões PostgreSQL criado com sucesso. Database: {DB_CONFIG['database']}")
     except psycopg2.Error as e:
         logger.error(f"Erro ao criar pool de conexões PostgreSQL: {e}", exc_info=True)
         connection_pool = None
 
-# Inicializar o pool ao carregar o módulo
-initialize_connection_pool()
+def reiniciar_pool_apos_fork():
+    """
+    Descarta o pool herdado do processo pai e cria um novo para este processo.
+
+    Deve ser chamada no processo filho logo após o fork (por exemplo, no post_fork do gunicorn):
+    uma conexão não pode ser usada por dois processos, e fechar as herdadas encerraria também
+    as do pai, por isso elas são apenas abandonadas.
+    """
+    global connection_pool, _lock_inicializacao
+    connection_pool = None
+    _lock_inicializacao = threading.Lock()
+    initialize_connection_pool()
 
-def get_connection():
-    """Obtém uma conexão do pool."""
+def get_connection(timeout=None):
+    """
+    Obtém uma conexão do pool, aguardando até `timeout` segundos (padrão: DB_POOL_TIMEOUT)
+    caso todas estejam em uso.
+    """
     global connection_pool
     try:
         if connection_pool is None:
             initialize_connection_pool()
         
         if connection_pool:
-            conn = connection_pool.getconn()
-            if conn:
-                return conn
-            else:
-                logger.error("Não foi possível obter conexão do pool.")
-                return None
+            return connection_pool.getconn(timeout)
         else:
             logger.error("Pool de conexões não inicializado.")
             return None
@@ -71,6 +304,87 @@ def release_connection(conn):
     except psycopg2.Error as e:
         logger.error(f"Erro ao liberar conexão: {e}", exc_info=True)
 
+# Cursor da transação em andamento no contexto atual (thread ou requisição)
+_transacao_atual = contextvars.ContextVar('transacao_atual', default=None)
+# Funções agendadas para depois do commit da transação em andamento
+_apos_commit = contextvars.ContextVar('apos_commit', default=None)
+# Nomes dos savepoints das transações aninhadas
+_savepoints = itertools.count(1)
+
+@contextmanager
+def transaction():
+    """
+    Abre uma unidade de trabalho e fornece um cursor:
+
+        with transaction() as cursor:
+            cursor.execute(...)
+
+    Ao sair do bloco, a transação é confirmada (commit) ou, se houver exceção, desfeita (rollback),
+    e só então a conexão volta ao pool. Chamadas aninhadas (por exemplo, um método de modelo que
+    chama outro) reutilizam o cursor da transação externa em vez de tomar outra conexão do pool;
+    o commit fica a cargo do bloco mais externo. Cada bloco aninhado roda em um SAVEPOINT: se
+    ele terminar com exceção, só o que fez é desfeito e a exceção segue adiante, de modo que um
+    método interno que a trate (e retorne False) não deixa a transação externa abortada.
+
+    Levanta:
+        psycopg2.pool.PoolError: Se não for possível obter uma conexão.
+    """
+    cursor_atual = _transacao_atual.get()
+    if cursor_atual is not None:
+        savepoint = f"sp_{next(_savepoints)}"
+        pendentes_externos = _apos_commit.get()
+        pendentes = []
+        token_pendentes = _apos_commit.set(pendentes)
+        cursor_atual.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield cursor_atual
+        except BaseException:
+            cursor_atual.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            raise
+        finally:
+            _apos_commit.reset(token_pendentes)
+        cursor_atual.execute(f"RELEASE SAVEPOINT {savepoint}")
+        # As ações pós-commit do bloco só valem se a transação externa for confirmada
+        pendentes_externos.extend(pendentes)
+        return
+
+    conn = get_connection()
+    if conn is None:
+        raise pool.PoolError("Não foi possível obter conexão com o banco de dados.")
+    cursor = conn.cursor()
+    pendentes = []
+    token = _transacao_atual.set(cursor)
+    token_pendentes = _apos_commit.set(pendentes)
+    try:
+        yield cursor
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _apos_commit.reset(token_pendentes)
+        _transacao_atual.reset(token)
+        cursor.close()
+        release_connection(conn)
+    for funcao in pendentes:
+        funcao()
+
+def ao_confirmar(funcao):
+    """
+    Agenda uma função para depois do commit da transação em andamento (por exemplo, invalidar
+    um cache). Fora de transaction(), a função é executada na hora; se a transação for
+    desfeita, a função é descartada.
+    """
+    pendentes = _apos_commit.get()
+    if pendentes is None:
+        funcao()
+    else:
+        pendentes.append(funcao)
+
+def obter_metricas_pool():
+    """Retorna as métricas do pool de conexões, ou um dicionário vazio se o pool não existir."""
+    return connection_pool.metricas() if connection_pool else {}
+
 def close_all_connections():
     """Fecha todas as conexões do pool."""
     global connection_pool
@@ -84,121 +398,21 @@ def close_all_connections():
 
 # Função para criar as tabelas necessárias
 def create_tables():
-    """Cria todas as tabelas necessárias no banco de dados."""
-    conn = get_connection()
-    if conn is not None:
-        try:
-            cursor = conn.cursor()
-            
-            # Tabela de Usuários
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS usuarios (
-                    id SERIAL PRIMARY KEY,
-                    nome VARCHAR(255) NOT NULL,
-                    email VARCHAR(255) NOT NULL UNIQUE,
-                    hash_senha VARCHAR(255) NOT NULL,
-                    salt VARCHAR(255) NOT NULL,
-                    cargo VARCHAR(50) NOT NULL DEFAULT 'operador'
-                )
-            ''')
-
-            # Tabela de Clientes
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS clientes (
-                    id SERIAL PRIMARY KEY,
-                    nome VARCHAR(255) NOT NULL,
-                    endereco TEXT,
-                    telefone VARCHAR(50) NOT NULL,
-                    referencia TEXT,
-                    email VARCHAR(255)
-                )
-            ''')
-
-            # Tabela de Itens/Inventário
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS inventario (
-                    id SERIAL PRIMARY KEY,
-                    nome_item VARCHAR(255) NOT NULL UNIQUE,
-                    quantidade INTEGER NOT NULL CHECK (quantidade >= 0),
-                    quantidade_disponivel INTEGER NOT NULL CHECK (quantidade_disponivel >= 0),
-                    tipo_item VARCHAR(100) NOT NULL
-                )
-            ''')
-
-            # Tabela de Locações
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS locacoes (
-                    id SERIAL PRIMARY KEY,
-                    cliente_id INTEGER NOT NULL,
-                    data_inicio DATE NOT NULL,
-                    data_fim DATE NOT NULL,
-                    data_fim_original DATE,
-                    valor_total DECIMAL(10,2) NOT NULL CHECK (valor_total >= 0),
-                    valor_pago_entrega DECIMAL(10,2) CHECK (valor_pago_entrega >= 0),
-                    valor_receber_final DECIMAL(10,2) CHECK (valor_receber_final >= 0),
-                    novo_valor_total DECIMAL(10,2) CHECK (novo_valor_total >= 0),
-                    abatimento DECIMAL(10,2) CHECK (abatimento >= 0),
-                    data_devolucao_efetiva DATE,
-                    motivo_ajuste_valor TEXT,
-                    data_prorrogacao DATE,
-                    status VARCHAR(50) DEFAULT 'ativo',
-                    numero_nota VARCHAR(100),
-                    FOREIGN KEY (cliente_id) REFERENCES clientes (id) ON DELETE CASCADE
-                )
-            ''')
-
-            # Tabela de Itens Locados
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS itens_locados (
-                    id SERIAL PRIMARY KEY,
-                    locacao_id INTEGER NOT NULL,
-                    item_id INTEGER NOT NULL,
-                    quantidade INTEGER NOT NULL CHECK (quantidade > 0),
-                    unidade VARCHAR(50) DEFAULT 'peças',
-                    data_alocacao DATE,
-                    data_devolucao DATE,
-                    FOREIGN KEY (locacao_id) REFERENCES locacoes (id) ON DELETE CASCADE,
-                    FOREIGN KEY (item_id) REFERENCES inventario (id) ON DELETE CASCADE
-                )
-            ''')
-
-            # Tabela para Registro de Danos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS registro_danos (
-                    id SERIAL PRIMARY KEY,
-                    item_id INTEGER NOT NULL,
-                    locacao_id INTEGER NOT NULL,
-                    quantidade_danificada INTEGER NOT NULL DEFAULT 0,
-                    descricao_problema TEXT,
-                    data_registro DATE NOT NULL DEFAULT CURRENT_DATE,
-                    FOREIGN KEY (locacao_id) REFERENCES locacoes (id) ON DELETE CASCADE,
-                    FOREIGN KEY (item_id) REFERENCES inventario (id) ON DELETE CASCADE
-                )
-            ''')
-
-            # Tabela de Notificações
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notificacoes (
-                    id SERIAL PRIMARY KEY,
-                    tipo VARCHAR(50) NOT NULL,
-                    titulo VARCHAR(255) NOT NULL,
-                    mensagem TEXT NOT NULL,
-                    relacionado_id INTEGER,
-                    lida BOOLEAN DEFAULT FALSE,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            conn.commit()
-            logger.info("Tabelas PostgreSQL criadas ou atualizadas com sucesso!")
-        except psycopg2.Error as e:
-            logger.error(f"Erro ao criar as tabelas: {e}", exc_info=True)
-            conn.rollback()
-        finally:
-            cursor.close()
-            release_connection(conn)
-    else:
-        logger.error("Erro! Não foi possível estabelecer a conexão com o banco de dados.")
+    """
+    Garante que o schema está atualizado, aplicando as migrações pendentes de MIGRATIONS_DIR
+    (ver migracoes.py). Com o schema em dia, custa uma única consulta e nenhuma DDL.
+
+    Retorna:
+        list: Versões aplicadas nesta execução.
+    """
+    from migracoes import MigracaoAlterada, verificar_e_aplicar
+    try:
+        return verificar_e_aplicar()
+    except MigracaoAlterada as e:
+        logger.error(f"Migrações não aplicadas: {e}")
+    except psycopg2.Error as e:
+        logger.error(f"Erro ao aplicar migrações: {e}", exc_info=True)
+    return []
 
 # Função para executar uma consulta (fetch)
 def execute_query(query, params=None):
@@ -0,0 +1,126 @@
+"""
+Configuração do gunicorn, o servidor de produção:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Dimensionamento: cada worker é um processo com GUNICORN_THREADS threads (worker gthread) e o
+seu próprio pool de conexões, que precisa de uma conexão por thread mais uma para o agendador
+de notificações; sem DB_POOL_MAX definido, o pool é ajustado para isso. Cada worker abre ainda
+uma conexão fora do pool para escutar o canal de notificações (stream SSE). Se o total não
+couber em DB_MAX_CONEXOES menos DB_CONEXOES_RESERVADAS (migrações, psql, outras aplicações),
+o número de workers é reduzido.
+
+Streams SSE: cada stream aberto (uma aba do sistema) ocupa uma thread do worker enquanto
+durar. Sem NOTIFICACOES_STREAMS_MAX definido, cada worker aceita no máximo metade das suas
+threads em streams (ao menos um) e responde 503 com Retry-After aos seguintes; o navegador
+tenta de novo, possivelmente em outro worker, e as demais threads seguem atendendo a API.
+
+Preload: a aplicação é importada uma vez no processo mestre e os workers nascem por fork
+(sobem mais rápido e compartilham a memória do código). Nada que não sobreviva a um fork é
+criado antes dele: no post_fork cada worker cria o seu pool, recria a thread de escrita dos
+logs, zera o canal de notificações e inicia o agendador.
+
+Reload gracioso (sinais para o processo mestre):
+    kill -HUP <mestre>    relê a configuração e troca os workers; os antigos terminam as
+                          requisições em andamento (até GUNICORN_GRACEFUL_TIMEOUT segundos).
+                          Durante a troca, antigos e novos convivem: a reserva de conexões
+                          deve comportar isso. Com preload, o HUP não recarrega o código:
+    kill -USR2 <mestre>   sobe um novo mestre com o código atual e, quando estiver pronto,
+    kill -QUIT <antigo>   encerra o mestre antigo de forma graciosa.
+"""
+import glob
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# Mesmo .env lido por database.py, para que WEB_CONCURRENCY, DB_POOL_MAX etc. valham aqui também
+load_dotenv()
+
+PORTA = os.getenv('PORT', '5000')
+DB_MAX_CONEXOES = int(os.getenv('DB_MAX_CONEXOES', '100'))
+DB_CONEXOES_RESERVADAS = int(os.getenv('DB_CONEXOES_RESERVADAS', '10'))
+
+bind = f"0.0.0.0:{PORTA}"
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+workers = int(os.getenv('WEB_CONCURRENCY') or max(2, os.cpu_count() or 1))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+# O log das requisições é feito pela aplicação (registro_requisicoes.py)
+accesslog = None
+errorlog = '-'
+
+# Pool por worker: uma conexão por thread e uma para o agendador. Definido antes de a aplicação
+# ser importada, pois database.py lê DB_POOL_MAX na importação.
+if not os.getenv('DB_POOL_MAX'):
+    os.environ['DB_POOL_MAX'] = str(threads + 1)
+pool_por_worker = int(os.environ['DB_POOL_MAX'])
+conexoes_por_worker = pool_por_worker + 1  # + escuta do canal de notificações
+
+# Streams SSE simultâneos por worker (lido por canal_notificacoes.py na importação)
+if not os.getenv('NOTIFICACOES_STREAMS_MAX'):
+    os.environ['NOTIFICACOES_STREAMS_MAX'] = str(max(1, threads // 2))
+streams_por_worker = int(os.environ['NOTIFICACOES_STREAMS_MAX'])
+
+avisos = []
+if streams_por_worker <= 0 or streams_por_worker >= threads:
+    avisos.append(f"NOTIFICACOES_STREAMS_MAX={streams_por_worker} não deixa threads livres entre as "
+                  f"GUNICORN_THREADS={threads}: streams SSE abertos podem bloquear a API.")
+if pool_por_worker < threads:
+    avisos.append(f"DB_POOL_MAX={pool_por_worker} é menor que GUNICORN_THREADS={threads}: "
+                  f"requisições vão esperar por conexão (até DB_POOL_TIMEOUT).")
+limite_workers = max(1, (DB_MAX_CONEXOES - DB_CONEXOES_RESERVADAS) // conexoes_por_worker)
+if workers > limite_workers:
+    avisos.append(f"{workers} workers × {conexoes_por_worker} conexões excedem "
+                  f"DB_MAX_CONEXOES={DB_MAX_CONEXOES} - {DB_CONEXOES_RESERVADAS} reservadas; "
+                  f"usando {limite_workers} workers.")
+    workers = limite_workers
+
+# Métricas Prometheus agregadas entre os workers (ver metricas.py)
+if workers > 1 and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'andaimes-metricas')
+DIRETORIO_METRICAS = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if DIRETORIO_METRICAS:
+    os.makedirs(DIRETORIO_METRICAS, exist_ok=True)
+
+
+def on_starting(server):
+    if DIRETORIO_METRICAS:
+        # Descarta os arquivos de métricas de execuções anteriores (só na partida, não no HUP)
+        for arquivo in glob.glob(os.path.join(DIRETORIO_METRICAS, '*.db')):
+            os.remove(arquivo)
+    for aviso in avisos:
+        server.log.warning(aviso)
+    server.log.info(f"{workers} workers × {threads} threads, pool de {pool_por_worker} conexões por worker "
+                    f"(até {workers * conexoes_por_worker} conexões), até {streams_por_worker} streams SSE "
+                    f"por worker, preload={preload_app}.")
+
+
+def post_fork(server, worker):
+    # Threads e conexões do mestre não existem (ou não podem ser usadas) no processo filho
+    from registro_requisicoes import configurar_logging
+    from database import reiniciar_pool_apos_fork
+    from canal_notificacoes import canal_notificacoes
+    from agendador import iniciar_agendador
+
+    configurar_logging()
+    reiniciar_pool_apos_fork()
+    canal_notificacoes.reiniciar_apos_fork()
+    iniciar_agendador()
+
+
+def worker_exit(server, worker):
+    from agendador import agendador_notificacoes
+    from database import close_all_connections
+
+    agendador_notificacoes.parar()
+    close_all_connections()
+
+
+def child_exit(server, worker):
+    from metricas import processo_encerrado
+
+    processo_encerrado(worker.pid)
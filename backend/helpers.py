@@ -24,25 +24,22 @@ def atualizar_estoque(item_id, quantidade, cursor=None):
             # Use existing cursor/transaction
             cursor.execute("""
                 UPDATE inventario 
-                SET quantidade_disponivel = quantidade_disponivel + ?
-                WHERE id = ?
+                SET quantidade_disponivel = quantidade_disponivel + %s
+                WHERE id = %s
             """, (quantidade, item_id))
             logger.info(f"Estoque do item {item_id} ajustado em {quantidade} unidades (transação existente).")
         else:
-            # Create new connection for standalone operation
-            from database import get_connection, release_connection
-            conn = get_connection()
-            try:
-                cursor = conn.cursor()
+            # Abre (ou participa de) uma transação para a operação avulsa
+            from database import transaction
+            with transaction() as cursor:
                 cursor.execute("""
                     UPDATE inventario 
-                    SET quantidade_disponivel = quantidade_disponivel + ?
-                    WHERE id = ?
+                    SET quantidade_disponivel = quantidade_disponivel + %s
+                    WHERE id = %s
                 """, (quantidade, item_id))
-                conn.commit()
-                logger.info(f"Estoque do item {item_id} ajustado em {quantidade} unidades.")
-            finally:
-                release_connection(conn)
+            logger.info(f"Estoque do item {item_id} ajustado em {quantidade} unidades.")
+        from cache_respostas import cache_respostas
+        cache_respostas.invalidar('inventario')
         return True
     except Exception as e:
         logger.error(f"Erro ao atualizar estoque para o item {item_id}: {e}")
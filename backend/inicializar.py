@@ -0,0 +1,67 @@
+"""
+Preparação do banco, executada uma vez por deploy (antes de subir a aplicação).
+
+- aplica as migrações pendentes (ver migracoes.py);
+- cria o usuário administrador, se ainda não existir.
+
+A aplicação (create_app) não faz nada disso ao iniciar: assim cada worker sobe sem DDL nem
+subprocessos, o que importa quando o número de instâncias varia com a carga.
+
+Os dados do administrador podem ser definidos por ADMIN_NOME, ADMIN_EMAIL e ADMIN_SENHA.
+
+Uso (a partir do diretório backend):
+    python inicializar.py
+"""
+import logging
+import os
+import sys
+
+import psycopg2
+
+from database import transaction
+from migracoes import MigracaoAlterada, verificar_e_aplicar
+from senhas import gerar_hash
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ADMIN_NOME = os.getenv('ADMIN_NOME', 'Admin')
+ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'admin@andaimespini.com')
+ADMIN_SENHA = os.getenv('ADMIN_SENHA', 'Admin@2026')
+
+
+def criar_admin(nome=ADMIN_NOME, email=ADMIN_EMAIL, senha=ADMIN_SENHA):
+    """
+    Cria o usuário administrador, se ainda não existir um com o mesmo e-mail.
+
+    Retorna:
+        bool: True se o usuário foi criado, False se já existia.
+    """
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO usuarios (nome, email, hash_senha, salt, cargo)
+            VALUES (%s, %s, %s, '', 'admin')
+            ON CONFLICT (email) DO NOTHING
+        ''', (nome, email, gerar_hash(senha)))
+        return cursor.rowcount == 1
+
+
+def main():
+    try:
+        aplicadas = verificar_e_aplicar()
+        if aplicadas:
+            logger.info(f"Migrações aplicadas: {', '.join(aplicadas)}")
+
+        if criar_admin():
+            logger.info(f"Usuário admin '{ADMIN_EMAIL}' criado. Altere a senha após o primeiro login!")
+        else:
+            logger.info(f"Usuário admin '{ADMIN_EMAIL}' já existe.")
+    except (MigracaoAlterada, psycopg2.Error) as e:
+        logger.error(f"Erro ao inicializar o banco: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Instrumentação das consultas ao banco e perfil por requisição.
+
+Todas as conexões do pool (e as abertas com DB_CONFIG) usam CursorInstrumentado, que mede cada
+execute/executemany. Durante uma requisição Flask, os números são somados no perfil da
+requisição: quantidade de consultas, tempo total no banco, espera por conexão no pool e a
+consulta mais lenta. Ao final, o perfil vai no cabeçalho Server-Timing (visível no DevTools do
+navegador) e em uma linha de log com campos estruturados (atributo `perfil` do registro).
+
+Consultas acima de DB_CONSULTA_LENTA_MS milissegundos são registradas com o ponto do código
+que as executou (arquivo:linha:função), dentro ou fora de requisições.
+Defina PERFIL_REQUISICOES=0 para desligar o cabeçalho e o log por requisição.
+"""
+import contextvars
+import logging
+import os
+import sys
+import sysconfig
+import time
+
+import psycopg2.extensions
+
+from metricas import DURACAO_CONSULTA, POOL_ESPERA
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LIMITE_CONSULTA_LENTA_MS = float(os.getenv('DB_CONSULTA_LENTA_MS', '200'))
+PERFIL_ATIVO = os.getenv('PERFIL_REQUISICOES', '1') != '0'
+
+# Tamanho máximo do texto da consulta nos logs e no cabeçalho
+TAMANHO_MAXIMO_SQL = 300
+
+# Arquivos e diretórios ignorados ao procurar o ponto de chamada de uma consulta
+_ARQUIVOS_INTERNOS = (os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database.py'))
+_DIRETORIOS_EXTERNOS = tuple({os.path.abspath(sysconfig.get_paths()[chave]) for chave in ('stdlib', 'purelib', 'platlib')})
+
+# Perfil da requisição em andamento no contexto atual
+_perfil_atual = contextvars.ContextVar('perfil_requisicao', default=None)
+
+
+class PerfilRequisicao:
+    """Acumula os números de banco de uma requisição."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_db_s = 0.0
+        self.espera_pool_s = 0.0
+        self.conexoes = 0
+        self.mais_lenta_s = 0.0
+        self.mais_lenta_sql = None
+
+    def como_dict(self):
+        return {
+            "duracao_ms": round((time.perf_counter() - self.inicio) * 1000, 2),
+            "consultas": self.consultas,
+            "tempo_db_ms": round(self.tempo_db_s * 1000, 2),
+            "espera_pool_ms": round(self.espera_pool_s * 1000, 2),
+            "conexoes": self.conexoes,
+            "consulta_mais_lenta_ms": round(self.mais_lenta_s * 1000, 2),
+            "consulta_mais_lenta": self.mais_lenta_sql,
+        }
+
+    def server_timing(self):
+        """Valor do cabeçalho Server-Timing."""
+        total_ms = (time.perf_counter() - self.inicio) * 1000
+        return ", ".join([
+            f'db;dur={self.tempo_db_s * 1000:.2f};desc="{self.consultas} consultas"',
+            f'pool;dur={self.espera_pool_s * 1000:.2f};desc="{self.conexoes} conexoes"',
+            f'db-max;dur={self.mais_lenta_s * 1000:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+
+
+def _resumir_sql(query):
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', errors='replace')
+    elif not isinstance(query, str):
+        query = repr(query)
+    query = " ".join(query.split())
+    return query if len(query) <= TAMANHO_MAXIMO_SQL else query[:TAMANHO_MAXIMO_SQL] + "..."
+
+
+def _ponto_de_chamada():
+    """Primeiro quadro da pilha fora deste módulo, de database.py e das bibliotecas instaladas."""
+    quadro = sys._getframe(2)
+    while quadro is not None:
+        arquivo = os.path.abspath(quadro.f_code.co_filename)
+        if arquivo not in _ARQUIVOS_INTERNOS and not arquivo.startswith(_DIRETORIOS_EXTERNOS):
+            return f"{os.path.relpath(arquivo)}:{quadro.f_lineno}:{quadro.f_code.co_name}"
+        quadro = quadro.f_back
+    return "desconhecido"
+
+
+def registrar_consulta(query, duracao):
+    """Soma uma consulta ao perfil da requisição e registra as que passam do limite."""
+    DURACAO_CONSULTA.observe(duracao)
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        perfil.consultas += 1
+        perfil.tempo_db_s += duracao
+        if duracao > perfil.mais_lenta_s:
+            perfil.mais_lenta_s = duracao
+            perfil.mais_lenta_sql = _resumir_sql(query)
+
+    duracao_ms = duracao * 1000
+    if duracao_ms >= LIMITE_CONSULTA_LENTA_MS:
+        ponto = _ponto_de_chamada()
+        sql = _resumir_sql(query)
+        logger.warning(
+            f"Consulta lenta ({duracao_ms:.1f} ms) em {ponto}: {sql}",
+            extra={"consulta_lenta": {"duracao_ms": round(duracao_ms, 2), "ponto": ponto, "sql": sql}},
+        )
+
+
+def registrar_espera_pool(espera):
+    """Soma ao perfil da requisição o tempo de espera por uma conexão do pool."""
+    POOL_ESPERA.observe(espera)
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        perfil.conexoes += 1
+        perfil.espera_pool_s += espera
+
+
+class CursorInstrumentado(psycopg2.extensions.cursor):
+    """Cursor que mede o tempo de cada instrução enviada ao banco."""
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
+    def executemany(self, query, vars_list):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio)
+
+
+def instrumentar_app(app):
+    """Registra na aplicação Flask o perfil por requisição (Server-Timing e log estruturado)."""
+    if not PERFIL_ATIVO:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def iniciar_perfil():
+        perfil = PerfilRequisicao()
+        g.perfil = perfil
+        _perfil_atual.set(perfil)
+
+    @app.after_request
+    def registrar_perfil(response):
+        perfil = g.get('perfil')
+        if perfil is None:
+            return response
+        response.headers['Server-Timing'] = perfil.server_timing()
+        dados = perfil.como_dict()
+        logger.info(
+            f"{request.method} {request.path} {response.status_code} {dados['duracao_ms']:.1f} ms | "
+            f"consultas={dados['consultas']} db={dados['tempo_db_ms']:.1f} ms "
+            f"pool={dados['espera_pool_ms']:.1f} ms mais_lenta={dados['consulta_mais_lenta_ms']:.1f} ms",
+            extra={"perfil": {
+                "metodo": request.method,
+                "rota": request.url_rule.rule if request.url_rule else request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                **dados,
+            }},
+        )
+        return response
+
+    @app.teardown_request
+    def encerrar_perfil(exc):
+        _perfil_atual.set(None)
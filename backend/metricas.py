@@ -0,0 +1,179 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus (GET /metrics).
+
+- http_request_duration_seconds: latência por blueprint, rota (regra do Flask) e método;
+- http_requests_total: requisições por blueprint, rota, método e status;
+- http_requests_in_flight: requisições em andamento;
+- db_pool_*: tamanho, conexões em uso, ociosas e threads aguardando no pool de cada processo;
+- db_pool_wait_seconds e db_query_duration_seconds: espera por conexão e latência das consultas;
+- notificacoes_job_duration_seconds e notificacoes_job_runs_total: rodadas do agendador;
+- auth_active_tokens: sessões com token válido (consultado no banco no máximo a cada
+  METRICAS_TOKENS_ATIVOS_TTL segundos).
+
+Com vários workers (gunicorn), defina PROMETHEUS_MULTIPROC_DIR com um diretório vazio antes de
+iniciar o servidor: cada processo grava seus valores em arquivos nesse diretório e o /metrics de
+qualquer worker agrega todos. O servidor deve chamar processo_encerrado(pid) quando um worker
+sair. Se METRICAS_TOKEN estiver definido, o /metrics exige Authorization: Bearer <token>.
+"""
+import hmac
+import logging
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MULTIPROCESSO = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')
+# Intervalo mínimo (segundos) entre consultas da contagem de tokens ativos
+TOKENS_ATIVOS_TTL = float(os.getenv('METRICAS_TOKENS_ATIVOS_TTL', '60'))
+
+# Rótulo usado para requisições que não casaram com nenhuma rota (evita uma série por URL)
+ROTA_DESCONHECIDA = '<desconhecida>'
+
+DURACAO_REQUISICAO = Histogram(
+    'http_request_duration_seconds', 'Latência das requisições HTTP',
+    ['blueprint', 'rota', 'metodo'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUISICOES = Counter(
+    'http_requests_total', 'Requisições HTTP atendidas', ['blueprint', 'rota', 'metodo', 'status'],
+)
+EM_ANDAMENTO = Gauge(
+    'http_requests_in_flight', 'Requisições HTTP em andamento', multiprocess_mode='livesum',
+)
+
+POOL_TAMANHO = Gauge('db_pool_size', 'Conexões abertas no pool', multiprocess_mode='livesum')
+POOL_EM_USO = Gauge('db_pool_in_use', 'Conexões do pool emprestadas', multiprocess_mode='livesum')
+POOL_OCIOSAS = Gauge('db_pool_idle', 'Conexões ociosas no pool', multiprocess_mode='livesum')
+POOL_AGUARDANDO = Gauge('db_pool_waiting', 'Threads aguardando conexão do pool', multiprocess_mode='livesum')
+POOL_MAXIMO = Gauge('db_pool_max', 'Tamanho máximo do pool', multiprocess_mode='livesum')
+POOL_ESPERA = Histogram(
+    'db_pool_wait_seconds', 'Tempo de espera por uma conexão do pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+DURACAO_CONSULTA = Histogram(
+    'db_query_duration_seconds', 'Latência das instruções enviadas ao banco',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+DURACAO_JOB_NOTIFICACOES = Histogram(
+    'notificacoes_job_duration_seconds', 'Duração das rodadas de notificações automáticas',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RODADAS_JOB_NOTIFICACOES = Counter(
+    'notificacoes_job_runs_total', 'Rodadas do agendador de notificações', ['resultado'],
+)
+
+
+class ColetorTokensAtivos:
+    """
+    Conta as sessões com token válido (compartilhadas entre os processos). O valor é guardado
+    por TOKENS_ATIVOS_TTL segundos, para que cada coleta não faça uma consulta ao banco.
+    """
+
+    NOME = 'auth_active_tokens'
+    DESCRICAO = 'Sessões com token de autenticação válido'
+
+    # Compartilhados entre instâncias: no modo multiprocesso, cada coleta cria um coletor novo
+    _valor = None
+    _consultado_em = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _total(cls):
+        from auth_tokens import contar_tokens_ativos
+        with cls._lock:
+            agora = time.monotonic()
+            if cls._consultado_em is None or agora - cls._consultado_em >= TOKENS_ATIVOS_TTL:
+                total = contar_tokens_ativos()
+                cls._consultado_em = agora
+                if total is not None:
+                    cls._valor = total
+            return cls._valor
+
+    def describe(self):
+        # Evita que o registro chame collect() (e consulte o banco) ao registrar o coletor
+        return [GaugeMetricFamily(self.NOME, self.DESCRICAO)]
+
+    def collect(self):
+        total = self._total()
+        if total is not None:
+            yield GaugeMetricFamily(self.NOME, self.DESCRICAO, value=total)
+
+
+if not MULTIPROCESSO:
+    REGISTRY.register(ColetorTokensAtivos())
+
+
+def _atualizar_pool():
+    from database import obter_metricas_pool
+    metricas = obter_metricas_pool()
+    if not metricas:
+        return
+    POOL_TAMANHO.set(metricas['tamanho'])
+    POOL_EM_USO.set(metricas['em_uso'])
+    POOL_OCIOSAS.set(metricas['ociosas'])
+    POOL_AGUARDANDO.set(metricas['aguardando'])
+    POOL_MAXIMO.set(metricas['maximo'])
+
+
+def _registro_coleta():
+    """Registro lido pelo /metrics: o agregado dos arquivos dos workers ou o registro do processo."""
+    if not MULTIPROCESSO:
+        return REGISTRY
+    from prometheus_client import multiprocess
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    registro.register(ColetorTokensAtivos())
+    return registro
+
+
+def processo_encerrado(pid):
+    """Descarta os arquivos de métricas ao vivo (gauges 'live*') de um worker que saiu."""
+    if MULTIPROCESSO:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+
+
+def registrar_metricas(app):
+    """Registra na aplicação Flask a medição das requisições e a rota GET /metrics."""
+    from flask import Response, g, jsonify, request
+
+    @app.before_request
+    def iniciar_medicao():
+        g.metricas_inicio = time.perf_counter()
+        EM_ANDAMENTO.inc()
+
+    @app.after_request
+    def registrar_medicao(response):
+        inicio = g.get('metricas_inicio')
+        if inicio is not None:
+            rota = request.url_rule.rule if request.url_rule else ROTA_DESCONHECIDA
+            blueprint = request.blueprint or ''
+            DURACAO_REQUISICAO.labels(blueprint, rota, request.method).observe(time.perf_counter() - inicio)
+            REQUISICOES.labels(blueprint, rota, request.method, str(response.status_code)).inc()
+        _atualizar_pool()
+        return response
+
+    @app.teardown_request
+    def encerrar_medicao(exc):
+        if g.pop('metricas_inicio', None) is not None:
+            EM_ANDAMENTO.dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Métricas no formato de exposição do Prometheus."""
+        if METRICAS_TOKEN:
+            esperado = f"Bearer {METRICAS_TOKEN}".encode()
+            if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), esperado):
+                return jsonify({"error": "Não autorizado."}), 401
+        _atualizar_pool()
+        return Response(generate_latest(_registro_coleta()), mimetype=CONTENT_TYPE_LATEST)
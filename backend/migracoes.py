@@ -0,0 +1,291 @@
+"""
+Migrações versionadas do schema (migrations/NNNN_descricao.sql).
+
+Cada arquivo é aplicado uma única vez, em ordem de nome, e registrado em schema_migrations com
+o checksum (SHA-256) do conteúdo. Um arquivo já aplicado que tenha sido alterado impede novas
+migrações (MigracaoAlterada): crie uma migração nova em vez de editar as antigas.
+
+- Concorrência: a aplicação das migrações é serializada por um advisory lock do PostgreSQL, então
+  deploys simultâneos (vários workers ou réplicas) não aplicam a mesma migração duas vezes.
+- Transações: cada arquivo roda em uma transação, junto com o seu registro em schema_migrations;
+  se qualquer instrução falhar, nada do arquivo fica aplicado. MIGRACOES_LOCK_TIMEOUT limita a
+  espera por locks das tabelas (para não enfileirar a aplicação atrás de uma DDL bloqueada).
+- Índices online: arquivos com a linha "-- migracao: sem-transacao" rodam fora de transação,
+  uma instrução por vez, o que permite CREATE INDEX CONCURRENTLY. Como uma falha pode deixar um
+  índice inválido para trás, comece com DROP INDEX CONCURRENTLY IF EXISTS do mesmo índice.
+- Inicialização: verificar_e_aplicar() lê schema_migrations em uma única consulta e, se todas as
+  migrações já estiverem aplicadas com o mesmo checksum, não executa nenhuma DDL.
+
+Uso (a partir do diretório backend):
+    python -m migracoes             # aplica as pendentes
+    python -m migracoes status      # lista aplicadas e pendentes
+"""
+import glob
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+
+import psycopg2
+
+from database import DB_CONFIG, MIGRATIONS_DIR
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chave do advisory lock das migrações (qualquer bigint fixo, igual em todos os processos)
+CHAVE_LOCK = 727_100_023
+LOCK_TIMEOUT = os.getenv('MIGRACOES_LOCK_TIMEOUT', '30s')
+
+MARCADOR_SEM_TRANSACAO = re.compile(r'^--\s*migracao:\s*sem-transacao\s*$', re.MULTILINE | re.IGNORECASE)
+
+
+class MigracaoAlterada(Exception):
+    """Uma migração já aplicada foi modificada depois de aplicada."""
+
+
+class Migracao:
+    """Arquivo de migração: versão (nome sem extensão), SQL e checksum."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.versao = os.path.splitext(os.path.basename(caminho))[0]
+        with open(caminho, encoding='utf-8') as arquivo:
+            # Normaliza as quebras de linha para o checksum não depender do checkout (CRLF/LF)
+            self.sql = arquivo.read().replace('\r\n', '\n')
+        self.checksum = hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+        self.transacional = not MARCADOR_SEM_TRANSACAO.search(self.sql)
+
+
+def carregar_migracoes():
+    """
+    Retorna:
+        list: Migracao de cada arquivo de MIGRATIONS_DIR, em ordem de versão.
+    """
+    return [Migracao(caminho) for caminho in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql')))]
+
+
+def dividir_instrucoes(sql):
+    """
+    Divide um script em instruções, respeitando strings, identificadores entre aspas, blocos
+    $$ ... $$ e comentários.
+    """
+    instrucoes = []
+    atual = []
+    i = 0
+    tamanho = len(sql)
+    while i < tamanho:
+        caractere = sql[i]
+        if sql.startswith('--', i):
+            fim = sql.find('\n', i)
+            fim = tamanho if fim == -1 else fim
+            atual.append(sql[i:fim])
+            i = fim
+        elif sql.startswith('/*', i):
+            fim = sql.find('*/', i + 2)
+            fim = tamanho if fim == -1 else fim + 2
+            atual.append(sql[i:fim])
+            i = fim
+        elif caractere in ("'", '"'):
+            fim = i + 1
+            while fim < tamanho:
+                if sql[fim] == caractere:
+                    if fim + 1 < tamanho and sql[fim + 1] == caractere:
+                        fim += 2
+                        continue
+                    break
+                fim += 1
+            atual.append(sql[i:fim + 1])
+            i = fim + 1
+        elif caractere == '$' and (marcador := re.match(r'\$[A-Za-z_]*\$', sql[i:])):
+            delimitador = marcador.group(0)
+            fim = sql.find(delimitador, i + len(delimitador))
+            fim = tamanho if fim == -1 else fim + len(delimitador)
+            atual.append(sql[i:fim])
+            i = fim
+        elif caractere == ';':
+            instrucoes.append(''.join(atual))
+            atual = []
+            i += 1
+        else:
+            atual.append(caractere)
+            i += 1
+    instrucoes.append(''.join(atual))
+
+    def tem_codigo(instrucao):
+        sem_comentarios = re.sub(r'--[^\n]*', '', instrucao)
+        return sem_comentarios.strip() != ''
+
+    return [instrucao.strip() for instrucao in instrucoes if tem_codigo(instrucao)]
+
+
+def _conectar():
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    return conn
+
+
+def _ler_aplicadas(cursor):
+    """
+    Retorna:
+        dict: {versao: checksum} das migrações registradas, ou None se schema_migrations não existe.
+    """
+    cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return None
+    cursor.execute("SELECT versao, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def _conferir_checksums(migracoes, aplicadas):
+    for migracao in migracoes:
+        registrado = aplicadas.get(migracao.versao)
+        if registrado and registrado != migracao.checksum:
+            raise MigracaoAlterada(
+                f"A migração {migracao.versao} foi alterada depois de aplicada "
+                f"(checksum {registrado[:12]} no banco, {migracao.checksum[:12]} no arquivo)."
+            )
+
+
+def _preparar_tabela(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao VARCHAR(255) PRIMARY KEY,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Registros anteriores à verificação por checksum e duração de cada migração
+    cursor.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS checksum CHAR(64)")
+    cursor.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS duracao_ms INTEGER")
+
+
+def _aplicar(conn, migracao):
+    inicio = time.perf_counter()
+    with conn.cursor() as cursor:
+        if migracao.transacional:
+            conn.autocommit = False
+            try:
+                cursor.execute("SELECT set_config('lock_timeout', %s, true)", (LOCK_TIMEOUT,))
+                cursor.execute(migracao.sql)
+                cursor.execute('''
+                    INSERT INTO schema_migrations (versao, checksum, duracao_ms) VALUES (%s, %s, %s)
+                ''', (migracao.versao, migracao.checksum, int((time.perf_counter() - inicio) * 1000)))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+        else:
+            for instrucao in dividir_instrucoes(migracao.sql):
+                cursor.execute(instrucao)
+            cursor.execute('''
+                INSERT INTO schema_migrations (versao, checksum, duracao_ms) VALUES (%s, %s, %s)
+            ''', (migracao.versao, migracao.checksum, int((time.perf_counter() - inicio) * 1000)))
+    logger.info(f"Migração {migracao.versao} aplicada em {(time.perf_counter() - inicio) * 1000:.0f} ms.")
+
+
+def aplicar_pendentes(conn, migracoes):
+    """
+    Aplica as migrações pendentes sob o advisory lock.
+
+    Retorna:
+        list: Versões aplicadas nesta execução.
+
+    Levanta:
+        MigracaoAlterada: Se o checksum de uma migração aplicada não confere com o arquivo.
+        psycopg2.Error: Se uma migração falhar (ela não fica registrada).
+    """
+    aplicadas_agora = []
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (CHAVE_LOCK,))
+        try:
+            _preparar_tabela(cursor)
+            # Relê depois de obter o lock: outro processo pode ter aplicado nesse meio-tempo
+            aplicadas = _ler_aplicadas(cursor)
+            _conferir_checksums(migracoes, aplicadas)
+
+            # Registros antigos, sem checksum: adota o do arquivo atual
+            for migracao in migracoes:
+                if migracao.versao in aplicadas and aplicadas[migracao.versao] is None:
+                    cursor.execute("UPDATE schema_migrations SET checksum = %s WHERE versao = %s",
+                                   (migracao.checksum, migracao.versao))
+
+            for migracao in migracoes:
+                if migracao.versao not in aplicadas:
+                    _aplicar(conn, migracao)
+                    aplicadas_agora.append(migracao.versao)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (CHAVE_LOCK,))
+    return aplicadas_agora
+
+
+def verificar_e_aplicar():
+    """
+    Confere o schema e aplica as migrações pendentes, se houver.
+
+    Quando todas já estão aplicadas (com checksum registrado e igual ao do arquivo), custa uma
+    única consulta, sem lock nem DDL.
+
+    Retorna:
+        list: Versões aplicadas nesta execução.
+
+    Levanta:
+        MigracaoAlterada, psycopg2.Error
+    """
+    migracoes = carregar_migracoes()
+    conn = _conectar()
+    try:
+        with conn.cursor() as cursor:
+            aplicadas = _ler_aplicadas(cursor)
+        if aplicadas is not None:
+            _conferir_checksums(migracoes, aplicadas)
+            if all(aplicadas.get(migracao.versao) for migracao in migracoes):
+                logger.info(f"Schema atualizado ({len(migracoes)} migrações aplicadas); nada a fazer.")
+                return []
+        return aplicar_pendentes(conn, migracoes)
+    finally:
+        conn.close()
+
+
+def status():
+    """
+    Retorna:
+        list: (versao, situação) de cada migração: 'aplicada', 'pendente' ou 'alterada'.
+    """
+    conn = _conectar()
+    try:
+        with conn.cursor() as cursor:
+            aplicadas = _ler_aplicadas(cursor) or {}
+    finally:
+        conn.close()
+    situacoes = []
+    for migracao in carregar_migracoes():
+        registrado = aplicadas.get(migracao.versao, False)
+        if registrado is False:
+            situacao = 'pendente'
+        elif registrado and registrado != migracao.checksum:
+            situacao = 'alterada'
+        else:
+            situacao = 'aplicada'
+        situacoes.append((migracao.versao, situacao))
+    return situacoes
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else 'aplicar'
+    try:
+        if comando == 'status':
+            for versao, situacao in status():
+                print(f"{situacao:<9} {versao}")
+        elif comando == 'aplicar':
+            aplicadas = verificar_e_aplicar()
+            print(f"{len(aplicadas)} migração(ões) aplicada(s)." if aplicadas else "Nenhuma migração pendente.")
+        else:
+            sys.exit(f"Comando desconhecido: {comando} (use 'aplicar' ou 'status')")
+    except (MigracaoAlterada, psycopg2.Error) as e:
+        logger.error(f"Erro nas migrações: {e}")
+        sys.exit(1)
@@ -0,0 +1,93 @@
+-- Schema base da aplicação (antes criado por database.create_tables a cada inicialização e
+-- completado pelos scripts add_column_*.py e add_notifications_table.py). Idempotente: em bancos
+-- já existentes só acrescenta as colunas que faltarem.
+
+-- Tabela de Usuários
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    hash_senha VARCHAR(255) NOT NULL,
+    salt VARCHAR(255) NOT NULL,
+    cargo VARCHAR(50) NOT NULL DEFAULT 'operador'
+);
+
+-- Tabela de Clientes
+CREATE TABLE IF NOT EXISTS clientes (
+    id SERIAL PRIMARY KEY,
+    nome VARCHAR(255) NOT NULL,
+    endereco TEXT,
+    telefone VARCHAR(50) NOT NULL,
+    referencia TEXT,
+    email VARCHAR(255)
+);
+
+-- Tabela de Itens/Inventário
+CREATE TABLE IF NOT EXISTS inventario (
+    id SERIAL PRIMARY KEY,
+    nome_item VARCHAR(255) NOT NULL UNIQUE,
+    quantidade INTEGER NOT NULL CHECK (quantidade >= 0),
+    quantidade_disponivel INTEGER NOT NULL CHECK (quantidade_disponivel >= 0),
+    tipo_item VARCHAR(100) NOT NULL
+);
+
+-- Tabela de Locações
+CREATE TABLE IF NOT EXISTS locacoes (
+    id SERIAL PRIMARY KEY,
+    cliente_id INTEGER NOT NULL,
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    data_fim_original DATE,
+    valor_total DECIMAL(10,2) NOT NULL CHECK (valor_total >= 0),
+    valor_pago_entrega DECIMAL(10,2) CHECK (valor_pago_entrega >= 0),
+    valor_receber_final DECIMAL(10,2) CHECK (valor_receber_final >= 0),
+    novo_valor_total DECIMAL(10,2) CHECK (novo_valor_total >= 0),
+    abatimento DECIMAL(10,2) CHECK (abatimento >= 0),
+    data_devolucao_efetiva DATE,
+    motivo_ajuste_valor TEXT,
+    data_prorrogacao DATE,
+    status VARCHAR(50) DEFAULT 'ativo',
+    numero_nota VARCHAR(100),
+    FOREIGN KEY (cliente_id) REFERENCES clientes (id) ON DELETE CASCADE
+);
+
+-- Tabela de Itens Locados
+CREATE TABLE IF NOT EXISTS itens_locados (
+    id SERIAL PRIMARY KEY,
+    locacao_id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL CHECK (quantidade > 0),
+    unidade VARCHAR(50) DEFAULT 'peças',
+    data_alocacao DATE,
+    data_devolucao DATE,
+    FOREIGN KEY (locacao_id) REFERENCES locacoes (id) ON DELETE CASCADE,
+    FOREIGN KEY (item_id) REFERENCES inventario (id) ON DELETE CASCADE
+);
+
+-- Tabela para Registro de Danos
+CREATE TABLE IF NOT EXISTS registro_danos (
+    id SERIAL PRIMARY KEY,
+    item_id INTEGER NOT NULL,
+    locacao_id INTEGER NOT NULL,
+    quantidade_danificada INTEGER NOT NULL DEFAULT 0,
+    descricao_problema TEXT,
+    data_registro DATE NOT NULL DEFAULT CURRENT_DATE,
+    FOREIGN KEY (locacao_id) REFERENCES locacoes (id) ON DELETE CASCADE,
+    FOREIGN KEY (item_id) REFERENCES inventario (id) ON DELETE CASCADE
+);
+
+-- Tabela de Notificações
+CREATE TABLE IF NOT EXISTS notificacoes (
+    id SERIAL PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    titulo VARCHAR(255) NOT NULL,
+    mensagem TEXT NOT NULL,
+    relacionado_id INTEGER,
+    lida BOOLEAN DEFAULT FALSE,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Colunas acrescentadas depois da criação das tabelas (antigos add_column_*.py)
+ALTER TABLE locacoes ADD COLUMN IF NOT EXISTS status VARCHAR(50) DEFAULT 'ativo';
+ALTER TABLE locacoes ADD COLUMN IF NOT EXISTS numero_nota VARCHAR(100);
+ALTER TABLE itens_locados ADD COLUMN IF NOT EXISTS data_alocacao DATE;
@@ -0,0 +1,25 @@
+-- Índices para as colunas consultadas nos caminhos mais frequentes da aplicação.
+
+-- Itens de uma locação (listagens, devolução, obter_por_locacao/obter_por_locacoes)
+CREATE INDEX IF NOT EXISTS idx_itens_locados_locacao_id ON itens_locados (locacao_id);
+
+-- Uso de um item do inventário (relatórios por item, chave estrangeira)
+CREATE INDEX IF NOT EXISTS idx_itens_locados_item_id ON itens_locados (item_id);
+
+-- Pedidos de um cliente (obter_pedidos_por_cliente, relatório por cliente, filtro cliente_id)
+CREATE INDEX IF NOT EXISTS idx_locacoes_cliente_id ON locacoes (cliente_id);
+
+-- Locações atrasadas: status = 'ativo' AND data_fim < hoje
+CREATE INDEX IF NOT EXISTS idx_locacoes_status_data_fim ON locacoes (status, data_fim);
+
+-- Paginação por data de início em GET /locacoes?ordenar=data_inicio
+CREATE INDEX IF NOT EXISTS idx_locacoes_data_inicio_id ON locacoes (data_inicio DESC, id DESC);
+
+-- Deduplicação em gerar_notificacoes_automaticas
+CREATE INDEX IF NOT EXISTS idx_notificacoes_tipo_relacionado_lida ON notificacoes (tipo, relacionado_id, lida);
+
+-- Danos de uma locação
+CREATE INDEX IF NOT EXISTS idx_registro_danos_locacao_id ON registro_danos (locacao_id);
+
+-- Busca de cliente existente ao criar locação (get_cliente_por_dados)
+CREATE INDEX IF NOT EXISTS idx_clientes_nome_endereco_telefone ON clientes (nome, endereco, telefone);
@@ -0,0 +1,8 @@
+-- Tokens de autenticação revogados por logout (ver auth_tokens.py).
+-- Cada linha só precisa existir até a expiração natural do token.
+CREATE TABLE IF NOT EXISTS tokens_revogados (
+    jti VARCHAR(32) PRIMARY KEY,
+    expira_em TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_tokens_revogados_expira_em ON tokens_revogados (expira_em);
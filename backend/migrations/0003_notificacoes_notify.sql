@@ -0,0 +1,20 @@
+-- Publica no canal 'notificacoes' toda inserção, alteração ou exclusão em notificacoes,
+-- consumido por canal_notificacoes.py para o stream SSE (GET /notificacoes/stream).
+-- O payload leva só a operação e o id, para ficar bem abaixo do limite de 8000 bytes do NOTIFY.
+CREATE OR REPLACE FUNCTION notificar_notificacoes() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'notificacoes',
+        json_build_object(
+            'operacao', TG_OP,
+            'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notificacoes_notify ON notificacoes;
+CREATE TRIGGER trg_notificacoes_notify
+    AFTER INSERT OR UPDATE OR DELETE ON notificacoes
+    FOR EACH ROW EXECUTE FUNCTION notificar_notificacoes();
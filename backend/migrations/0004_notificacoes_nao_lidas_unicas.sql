@@ -0,0 +1,21 @@
+-- No máximo uma notificação automática não lida por (tipo, relacionado_id).
+-- Garante a idempotência de Notificacao.gerar_notificacoes_automaticas mesmo com execuções
+-- concorrentes. Restrito aos tipos gerados automaticamente para não afetar POST /notificacoes.
+
+-- Duplicatas não lidas já existentes: mantém a mais antiga e marca as demais como lidas
+UPDATE notificacoes n
+SET lida = TRUE
+WHERE n.lida = FALSE
+  AND n.tipo IN ('estoque_critico', 'devolucao_atrasada')
+  AND EXISTS (
+      SELECT 1
+      FROM notificacoes o
+      WHERE o.tipo = n.tipo
+        AND o.relacionado_id = n.relacionado_id
+        AND o.lida = FALSE
+        AND o.id < n.id
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_notificacoes_automaticas_nao_lidas
+    ON notificacoes (tipo, relacionado_id)
+    WHERE lida = FALSE AND tipo IN ('estoque_critico', 'devolucao_atrasada');
@@ -0,0 +1,174 @@
+-- Tabelas de resumo para os relatórios (/reports/overview e /reports/status).
+--
+-- Os relatórios filtram locações por data_inicio >= X e data_fim <= Y, então os resumos são
+-- agrupados por (data_inicio, data_fim): qualquer filtro continua exato e a consulta lê no
+-- máximo uma linha por combinação de datas, em vez de todas as locações e itens do histórico.
+-- Os resumos são mantidos de forma incremental por triggers em locacoes e itens_locados.
+
+CREATE TABLE IF NOT EXISTS relatorio_locacoes_diario (
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    total_locacoes INTEGER NOT NULL DEFAULT 0,
+    receita_total NUMERIC(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (data_inicio, data_fim, status)
+);
+
+CREATE TABLE IF NOT EXISTS relatorio_clientes_diario (
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    total_locacoes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (data_inicio, data_fim, cliente_id)
+);
+
+CREATE TABLE IF NOT EXISTS relatorio_itens_diario (
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    item_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (data_inicio, data_fim, item_id)
+);
+
+-- Soma (p_sinal = 1) ou subtrai (p_sinal = -1) uma locação dos resumos
+CREATE OR REPLACE FUNCTION relatorio_ajustar_locacao(
+    p_inicio DATE, p_fim DATE, p_status VARCHAR, p_cliente_id INTEGER, p_valor NUMERIC, p_sinal INTEGER
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO relatorio_locacoes_diario AS r (data_inicio, data_fim, status, total_locacoes, receita_total)
+    VALUES (p_inicio, p_fim, COALESCE(p_status, ''), p_sinal, p_sinal * COALESCE(p_valor, 0))
+    ON CONFLICT (data_inicio, data_fim, status) DO UPDATE
+        SET total_locacoes = r.total_locacoes + EXCLUDED.total_locacoes,
+            receita_total = r.receita_total + EXCLUDED.receita_total;
+    DELETE FROM relatorio_locacoes_diario
+    WHERE data_inicio = p_inicio AND data_fim = p_fim AND status = COALESCE(p_status, '') AND total_locacoes = 0;
+
+    INSERT INTO relatorio_clientes_diario AS r (data_inicio, data_fim, cliente_id, total_locacoes)
+    VALUES (p_inicio, p_fim, p_cliente_id, p_sinal)
+    ON CONFLICT (data_inicio, data_fim, cliente_id) DO UPDATE
+        SET total_locacoes = r.total_locacoes + EXCLUDED.total_locacoes;
+    DELETE FROM relatorio_clientes_diario
+    WHERE data_inicio = p_inicio AND data_fim = p_fim AND cliente_id = p_cliente_id AND total_locacoes = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Soma ou subtrai quantidade locada de um item nos resumos
+CREATE OR REPLACE FUNCTION relatorio_ajustar_item(
+    p_inicio DATE, p_fim DATE, p_item_id INTEGER, p_quantidade INTEGER
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO relatorio_itens_diario AS r (data_inicio, data_fim, item_id, quantidade)
+    VALUES (p_inicio, p_fim, p_item_id, p_quantidade)
+    ON CONFLICT (data_inicio, data_fim, item_id) DO UPDATE
+        SET quantidade = r.quantidade + EXCLUDED.quantidade;
+    DELETE FROM relatorio_itens_diario
+    WHERE data_inicio = p_inicio AND data_fim = p_fim AND item_id = p_item_id AND quantidade = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move os itens de uma locação entre combinações de datas (p_sinal = -1 retira, 1 adiciona)
+CREATE OR REPLACE FUNCTION relatorio_ajustar_itens_da_locacao(
+    p_locacao_id INTEGER, p_inicio DATE, p_fim DATE, p_sinal INTEGER
+) RETURNS void AS $$
+DECLARE
+    v_item RECORD;
+BEGIN
+    FOR v_item IN
+        SELECT item_id, SUM(quantidade) AS quantidade
+        FROM itens_locados
+        WHERE locacao_id = p_locacao_id
+        GROUP BY item_id
+        ORDER BY item_id
+    LOOP
+        PERFORM relatorio_ajustar_item(p_inicio, p_fim, v_item.item_id, p_sinal * v_item.quantidade::INTEGER);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION relatorio_trigger_locacoes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM relatorio_ajustar_locacao(NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total, 1);
+        RETURN NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        -- Trigger BEFORE: os itens ainda existem (a exclusão em cascata vem depois)
+        PERFORM relatorio_ajustar_locacao(OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total, -1);
+        PERFORM relatorio_ajustar_itens_da_locacao(OLD.id, OLD.data_inicio, OLD.data_fim, -1);
+        RETURN OLD;
+    END IF;
+
+    IF (OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total)
+       IS DISTINCT FROM (NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total) THEN
+        PERFORM relatorio_ajustar_locacao(OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total, -1);
+        PERFORM relatorio_ajustar_locacao(NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total, 1);
+    END IF;
+    IF (OLD.data_inicio, OLD.data_fim) IS DISTINCT FROM (NEW.data_inicio, NEW.data_fim) THEN
+        PERFORM relatorio_ajustar_itens_da_locacao(NEW.id, OLD.data_inicio, OLD.data_fim, -1);
+        PERFORM relatorio_ajustar_itens_da_locacao(NEW.id, NEW.data_inicio, NEW.data_fim, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION relatorio_trigger_itens_locados() RETURNS trigger AS $$
+DECLARE
+    v_inicio DATE;
+    v_fim DATE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Em exclusões em cascata a locação já não existe e o trigger da locação já ajustou os itens
+        SELECT data_inicio, data_fim INTO v_inicio, v_fim FROM locacoes WHERE id = OLD.locacao_id;
+        IF FOUND THEN
+            PERFORM relatorio_ajustar_item(v_inicio, v_fim, OLD.item_id, -OLD.quantidade);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT data_inicio, data_fim INTO v_inicio, v_fim FROM locacoes WHERE id = NEW.locacao_id;
+        IF FOUND THEN
+            PERFORM relatorio_ajustar_item(v_inicio, v_fim, NEW.item_id, NEW.quantidade);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_relatorio_locacoes ON locacoes;
+CREATE TRIGGER trg_relatorio_locacoes
+    AFTER INSERT OR UPDATE ON locacoes
+    FOR EACH ROW EXECUTE FUNCTION relatorio_trigger_locacoes();
+
+DROP TRIGGER IF EXISTS trg_relatorio_locacoes_exclusao ON locacoes;
+CREATE TRIGGER trg_relatorio_locacoes_exclusao
+    BEFORE DELETE ON locacoes
+    FOR EACH ROW EXECUTE FUNCTION relatorio_trigger_locacoes();
+
+DROP TRIGGER IF EXISTS trg_relatorio_itens_locados ON itens_locados;
+CREATE TRIGGER trg_relatorio_itens_locados
+    AFTER INSERT OR UPDATE OR DELETE ON itens_locados
+    FOR EACH ROW EXECUTE FUNCTION relatorio_trigger_itens_locados();
+
+-- Reconstrói os resumos a partir das tabelas de origem (carga inicial ou correção manual)
+CREATE OR REPLACE FUNCTION relatorio_reconstruir() RETURNS void AS $$
+BEGIN
+    LOCK TABLE locacoes, itens_locados IN SHARE MODE;
+    TRUNCATE relatorio_locacoes_diario, relatorio_clientes_diario, relatorio_itens_diario;
+
+    INSERT INTO relatorio_locacoes_diario (data_inicio, data_fim, status, total_locacoes, receita_total)
+    SELECT data_inicio, data_fim, COALESCE(status, ''), COUNT(*), COALESCE(SUM(valor_total), 0)
+    FROM locacoes
+    GROUP BY data_inicio, data_fim, COALESCE(status, '');
+
+    INSERT INTO relatorio_clientes_diario (data_inicio, data_fim, cliente_id, total_locacoes)
+    SELECT data_inicio, data_fim, cliente_id, COUNT(*)
+    FROM locacoes
+    GROUP BY data_inicio, data_fim, cliente_id;
+
+    INSERT INTO relatorio_itens_diario (data_inicio, data_fim, item_id, quantidade)
+    SELECT l.data_inicio, l.data_fim, il.item_id, SUM(il.quantidade)
+    FROM itens_locados il
+    JOIN locacoes l ON l.id = il.locacao_id
+    GROUP BY l.data_inicio, l.data_fim, il.item_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT relatorio_reconstruir();
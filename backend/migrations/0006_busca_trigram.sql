@@ -0,0 +1,20 @@
+-- Busca de clientes e itens (autocomplete de /reports/clients e /reports/items) no banco.
+--
+-- busca_normalizar() remove acentos e caixa ("João" -> "joao") e é IMMUTABLE para poder ser
+-- usada em índices. Os índices GIN de trigramas sobre o nome normalizado atendem tanto a busca
+-- por trecho (LIKE '%termo%') quanto a busca aproximada (operador <% do pg_trgm).
+-- As extensões ficam no schema public e são referenciadas com o schema explícito, para que a
+-- função funcione com qualquer search_path (inclusive o schema dos benchmarks).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public;
+
+CREATE OR REPLACE FUNCTION busca_normalizar(texto TEXT) RETURNS TEXT AS $$
+    SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto))
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS idx_clientes_nome_busca
+    ON clientes USING gin (busca_normalizar(nome) public.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_inventario_nome_busca
+    ON inventario USING gin (busca_normalizar(nome_item) public.gin_trgm_ops);
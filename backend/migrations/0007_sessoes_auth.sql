@@ -0,0 +1,10 @@
+-- Sessões de login com token válido (ver auth_tokens.py), usadas na contagem de tokens ativos
+-- do /metrics. A sessão nasce no login, tem a validade estendida a cada renovação do token
+-- e é removida no logout; linhas vencidas são descartadas a cada novo login.
+CREATE TABLE IF NOT EXISTS sessoes_auth (
+    sid VARCHAR(32) PRIMARY KEY,
+    usuario_id INTEGER,
+    expira_em TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessoes_auth_expira_em ON sessoes_auth (expira_em);
@@ -0,0 +1,9 @@
+-- Sessões encerradas por logout (ver auth_tokens.py). Revogar a sessão (sid), e não só o token
+-- apresentado, invalida também os tokens renovados da mesma sessão. Cada linha só precisa
+-- existir até a expiração do último token que a sessão pode ter recebido.
+CREATE TABLE IF NOT EXISTS sessoes_revogadas (
+    sid VARCHAR(32) PRIMARY KEY,
+    expira_em TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessoes_revogadas_expira_em ON sessoes_revogadas (expira_em);
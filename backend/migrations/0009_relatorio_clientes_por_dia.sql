@@ -0,0 +1,114 @@
+-- Resumo de clientes (relatorio_clientes_diario) agrupado por (data_inicio, cliente_id).
+--
+-- Na 0005 a tabela era agrupada por (data_inicio, data_fim, cliente_id) e crescia quase uma
+-- linha por locação. Ela só responde "quantos clientes distintos têm alguma locação com
+-- data_inicio >= X e data_fim <= Y"; para isso basta, por dia de início e cliente, a menor
+-- data_fim entre as locações: o cliente entra no filtro se e só se essa menor data_fim <= Y.
+-- A tabela fica limitada a uma linha por cliente por dia em que ele iniciou locações.
+--
+-- A coluna continua se chamando data_fim (agora a menor data_fim do dia), para que o mesmo
+-- filtro das outras tabelas de resumo (Relatorios._filtros_resumo) continue valendo.
+-- Como a menor data_fim não se mantém por soma e subtração, a linha do (dia, cliente)
+-- afetado é recalculada a partir de locacoes, pelo índice criado abaixo.
+
+CREATE INDEX IF NOT EXISTS idx_locacoes_cliente_data_inicio ON locacoes (cliente_id, data_inicio);
+
+DROP TABLE IF EXISTS relatorio_clientes_diario;
+
+CREATE TABLE relatorio_clientes_diario (
+    data_inicio DATE NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    data_fim DATE NOT NULL,
+    total_locacoes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (data_inicio, cliente_id)
+);
+
+-- Recalcula a linha de um (dia, cliente); p_excluir_id ignora a locação que está sendo excluída
+CREATE OR REPLACE FUNCTION relatorio_recalcular_cliente(
+    p_inicio DATE, p_cliente_id INTEGER, p_excluir_id INTEGER
+) RETURNS void AS $$
+BEGIN
+    DELETE FROM relatorio_clientes_diario WHERE data_inicio = p_inicio AND cliente_id = p_cliente_id;
+    INSERT INTO relatorio_clientes_diario (data_inicio, cliente_id, data_fim, total_locacoes)
+    SELECT p_inicio, p_cliente_id, MIN(data_fim), COUNT(*)
+    FROM locacoes
+    WHERE cliente_id = p_cliente_id AND data_inicio = p_inicio
+      AND id IS DISTINCT FROM p_excluir_id
+    HAVING COUNT(*) > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Soma (p_sinal = 1) ou subtrai (p_sinal = -1) uma locação do resumo por status;
+-- o resumo de clientes passa a ser recalculado pelo trigger
+CREATE OR REPLACE FUNCTION relatorio_ajustar_locacao(
+    p_inicio DATE, p_fim DATE, p_status VARCHAR, p_cliente_id INTEGER, p_valor NUMERIC, p_sinal INTEGER
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO relatorio_locacoes_diario AS r (data_inicio, data_fim, status, total_locacoes, receita_total)
+    VALUES (p_inicio, p_fim, COALESCE(p_status, ''), p_sinal, p_sinal * COALESCE(p_valor, 0))
+    ON CONFLICT (data_inicio, data_fim, status) DO UPDATE
+        SET total_locacoes = r.total_locacoes + EXCLUDED.total_locacoes,
+            receita_total = r.receita_total + EXCLUDED.receita_total;
+    DELETE FROM relatorio_locacoes_diario
+    WHERE data_inicio = p_inicio AND data_fim = p_fim AND status = COALESCE(p_status, '') AND total_locacoes = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION relatorio_trigger_locacoes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM relatorio_ajustar_locacao(NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total, 1);
+        PERFORM relatorio_recalcular_cliente(NEW.data_inicio, NEW.cliente_id, NULL);
+        RETURN NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        -- Trigger BEFORE: os itens ainda existem (a exclusão em cascata vem depois)
+        PERFORM relatorio_ajustar_locacao(OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total, -1);
+        PERFORM relatorio_recalcular_cliente(OLD.data_inicio, OLD.cliente_id, OLD.id);
+        PERFORM relatorio_ajustar_itens_da_locacao(OLD.id, OLD.data_inicio, OLD.data_fim, -1);
+        RETURN OLD;
+    END IF;
+
+    IF (OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total)
+       IS DISTINCT FROM (NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total) THEN
+        PERFORM relatorio_ajustar_locacao(OLD.data_inicio, OLD.data_fim, OLD.status, OLD.cliente_id, OLD.valor_total, -1);
+        PERFORM relatorio_ajustar_locacao(NEW.data_inicio, NEW.data_fim, NEW.status, NEW.cliente_id, NEW.valor_total, 1);
+    END IF;
+    IF (OLD.data_inicio, OLD.data_fim, OLD.cliente_id) IS DISTINCT FROM (NEW.data_inicio, NEW.data_fim, NEW.cliente_id) THEN
+        PERFORM relatorio_recalcular_cliente(OLD.data_inicio, OLD.cliente_id, NULL);
+        IF (OLD.data_inicio, OLD.cliente_id) IS DISTINCT FROM (NEW.data_inicio, NEW.cliente_id) THEN
+            PERFORM relatorio_recalcular_cliente(NEW.data_inicio, NEW.cliente_id, NULL);
+        END IF;
+    END IF;
+    IF (OLD.data_inicio, OLD.data_fim) IS DISTINCT FROM (NEW.data_inicio, NEW.data_fim) THEN
+        PERFORM relatorio_ajustar_itens_da_locacao(NEW.id, OLD.data_inicio, OLD.data_fim, -1);
+        PERFORM relatorio_ajustar_itens_da_locacao(NEW.id, NEW.data_inicio, NEW.data_fim, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reconstrói os resumos a partir das tabelas de origem (carga inicial ou correção manual)
+CREATE OR REPLACE FUNCTION relatorio_reconstruir() RETURNS void AS $$
+BEGIN
+    LOCK TABLE locacoes, itens_locados IN SHARE MODE;
+    TRUNCATE relatorio_locacoes_diario, relatorio_clientes_diario, relatorio_itens_diario;
+
+    INSERT INTO relatorio_locacoes_diario (data_inicio, data_fim, status, total_locacoes, receita_total)
+    SELECT data_inicio, data_fim, COALESCE(status, ''), COUNT(*), COALESCE(SUM(valor_total), 0)
+    FROM locacoes
+    GROUP BY data_inicio, data_fim, COALESCE(status, '');
+
+    INSERT INTO relatorio_clientes_diario (data_inicio, cliente_id, data_fim, total_locacoes)
+    SELECT data_inicio, cliente_id, MIN(data_fim), COUNT(*)
+    FROM locacoes
+    GROUP BY data_inicio, cliente_id;
+
+    INSERT INTO relatorio_itens_diario (data_inicio, data_fim, item_id, quantidade)
+    SELECT l.data_inicio, l.data_fim, il.item_id, SUM(il.quantidade)
+    FROM itens_locados il
+    JOIN locacoes l ON l.id = il.locacao_id
+    GROUP BY l.data_inicio, l.data_fim, il.item_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT relatorio_reconstruir();
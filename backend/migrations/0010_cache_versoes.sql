@@ -0,0 +1,10 @@
+-- Versão de cada grupo do cache de respostas (ver cache_respostas.py). Toda escrita confirmada
+-- em um grupo incrementa a versão, e cada worker compara a versão com a das entradas que
+-- guardou antes de servi-las: assim uma escrita feita em um worker invalida o cache de todos.
+CREATE TABLE IF NOT EXISTS cache_versoes (
+    grupo VARCHAR(50) PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO cache_versoes (grupo) VALUES ('inventario'), ('clientes')
+ON CONFLICT (grupo) DO NOTHING;
@@ -0,0 +1,37 @@
+-- Recalculo do resumo de clientes (migração 0009) seguro sob concorrência.
+--
+-- Na 0009 a função apagava a linha do (dia, cliente) e a inseria de novo. Duas transações
+-- que gravam locações do mesmo cliente e dia de início, com data_fim diferentes, não se
+-- esperam na linha de relatorio_locacoes_diario. A segunda falhava com unique_violation, e a
+-- gravação da locação era desfeita junto.
+--
+-- Agora a linha é travada primeiro, com um INSERT ... ON CONFLICT DO UPDATE: a segunda
+-- transação espera a primeira terminar. Só então as locações são contadas, e cada instrução
+-- da função enxerga o que já foi confirmado. O resultado é gravado na mesma linha, e ela só é
+-- apagada quando a contagem zera.
+CREATE OR REPLACE FUNCTION relatorio_recalcular_cliente(
+    p_inicio DATE, p_cliente_id INTEGER, p_excluir_id INTEGER
+) RETURNS void AS $$
+DECLARE
+    v_fim DATE;
+    v_total INTEGER;
+BEGIN
+    INSERT INTO relatorio_clientes_diario AS r (data_inicio, cliente_id, data_fim, total_locacoes)
+    VALUES (p_inicio, p_cliente_id, p_inicio, 0)
+    ON CONFLICT (data_inicio, cliente_id) DO UPDATE
+        SET total_locacoes = r.total_locacoes;
+
+    SELECT MIN(data_fim), COUNT(*) INTO v_fim, v_total
+    FROM locacoes
+    WHERE cliente_id = p_cliente_id AND data_inicio = p_inicio
+      AND id IS DISTINCT FROM p_excluir_id;
+
+    IF v_total = 0 THEN
+        DELETE FROM relatorio_clientes_diario WHERE data_inicio = p_inicio AND cliente_id = p_cliente_id;
+    ELSE
+        UPDATE relatorio_clientes_diario
+        SET data_fim = v_fim, total_locacoes = v_total
+        WHERE data_inicio = p_inicio AND cliente_id = p_cliente_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
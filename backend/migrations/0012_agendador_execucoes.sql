@@ -0,0 +1,11 @@
+-- Última execução de cada tarefa periódica (ver agendador.py). Todos os workers rodam o
+-- agendador, mas só executa a rodada quem encontrar a última execução mais antiga que o
+-- intervalo; os demais pulam. Assim há uma varredura por intervalo, e não uma por worker.
+CREATE TABLE IF NOT EXISTS agendador_execucoes (
+    tarefa VARCHAR(50) PRIMARY KEY,
+    ultima_execucao TIMESTAMP WITH TIME ZONE NOT NULL,
+    ultimas_geradas INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO agendador_execucoes (tarefa, ultima_execucao) VALUES ('notificacoes_automaticas', 'epoch')
+ON CONFLICT (tarefa) DO NOTHING;
@@ -0,0 +1,72 @@
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Busca:
+    """
+    Busca por nome para autocomplete, feita no banco (migração 0006).
+
+    A comparação ignora acentos e caixa (busca_normalizar) e usa os índices de trigramas:
+    encontra o termo em qualquer parte do nome ou, com erros de digitação, por semelhança de
+    palavras (operador <% do pg_trgm). Os resultados vêm ordenados por relevância: nomes que
+    começam com o termo, depois os mais semelhantes, depois em ordem alfabética.
+    """
+
+    LIMITE_PADRAO = 20
+    LIMITE_MAXIMO = 100
+
+    @staticmethod
+    def validar_limite(limite):
+        """
+        Converte e valida o limite de resultados.
+
+        Levanta:
+            ValueError: Se o limite não for um inteiro entre 1 e LIMITE_MAXIMO.
+        """
+        try:
+            limite = Busca.LIMITE_PADRAO if limite is None else int(limite)
+        except (ValueError, TypeError):
+            raise ValueError("O parâmetro 'limite' deve ser um número inteiro.")
+        if not 1 <= limite <= Busca.LIMITE_MAXIMO:
+            raise ValueError(f"O limite deve estar entre 1 e {Busca.LIMITE_MAXIMO}.")
+        return limite
+
+    @staticmethod
+    def montar_consulta(colunas, tabela, coluna_nome, termo, limite):
+        """
+        Monta a consulta de busca por nome.
+
+        Parâmetros:
+            colunas (str): Colunas do SELECT.
+            tabela (str): Tabela consultada.
+            coluna_nome (str): Coluna com o nome pesquisado.
+            termo (str): Termo digitado; vazio lista os primeiros nomes em ordem alfabética.
+            limite (int): Número máximo de resultados (já validado).
+
+        Retorna:
+            tuple: (consulta SQL, parâmetros).
+        """
+        termo = (termo or "").strip()
+        if not termo:
+            return f"""
+                SELECT {colunas}
+                FROM {tabela}
+                ORDER BY {coluna_nome}
+                LIMIT %(limite)s
+            """, {"limite": limite}
+
+        # Curingas digitados pelo usuário são tratados como texto no LIKE
+        termo_like = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"""
+            SELECT {colunas}
+            FROM {tabela}
+            WHERE busca_normalizar({coluna_nome}) LIKE '%%' || busca_normalizar(%(termo_like)s) || '%%'
+               OR busca_normalizar(%(termo)s) OPERATOR(public.<%%) busca_normalizar({coluna_nome})
+            ORDER BY busca_normalizar({coluna_nome}) LIKE busca_normalizar(%(termo_like)s) || '%%' DESC,
+                     public.word_similarity(busca_normalizar(%(termo)s), busca_normalizar({coluna_nome})) DESC,
+                     {coluna_nome}
+            LIMIT %(limite)s
+        """, {"termo": termo, "termo_like": termo_like, "limite": limite}
@@ -1,5 +1,7 @@
 import psycopg2
-from database import get_connection, release_connection
+from database import get_connection, release_connection, transaction
+from cache_respostas import cache_respostas
+from models.busca import Busca
 import logging
 from datetime import datetime
 
@@ -45,6 +47,43 @@ class Cliente:
         finally:
             release_connection(conn)
 
+    @staticmethod
+    def buscar(termo, limite=None):
+        """
+        Busca clientes pelo nome, sem diferenciar acentos e maiúsculas, em ordem de relevância.
+
+        Parâmetros:
+            termo (str): Trecho do nome digitado.
+            limite (int, optional): Número máximo de resultados (1 a Busca.LIMITE_MAXIMO).
+
+        Retorna:
+            list: Lista de dicionários contendo os detalhes dos clientes encontrados.
+
+        Levanta:
+            ValueError: Se o limite for inválido.
+        """
+        limite = Busca.validar_limite(limite)
+        consulta, params = Busca.montar_consulta(
+            "id, nome, endereco, telefone, referencia", "clientes", "nome", termo, limite
+        )
+        try:
+            with transaction() as cursor:
+                cursor.execute(consulta, params)
+                clientes = cursor.fetchall()
+            return [
+                {
+                    "id": cliente[0],
+                    "nome": cliente[1],
+                    "endereco": cliente[2],
+                    "telefone": cliente[3],
+                    "referencia": cliente[4],
+                }
+                for cliente in clientes
+            ]
+        except Exception as e:
+            logger.error(f"Erro ao buscar clientes pelo nome: {e}")
+            return []
+
     @staticmethod
     def criar_cliente(nome, endereco="", telefone=None, referencia=""):
         """
@@ -72,6 +111,7 @@ class Cliente:
                 RETURNING id
             """, (nome, endereco, telefone, referencia))
             conn.commit()
+            cache_respostas.invalidar('clientes')
             cliente_id = cursor.fetchone()[0]
             logger.info(f"Cliente criado com sucesso: ID {cliente_id}")
             return cliente_id
@@ -94,16 +134,15 @@ class Cliente:
         Retorna:
             dict: Dicionário com os detalhes do cliente ou None se não encontrado.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            logger.info("Buscando cliente por nome, endereço e telefone.")
-            cursor.execute("""
-                SELECT id, nome, endereco, telefone, referencia
-                FROM clientes
-                WHERE nome = %s AND endereco = %s AND telefone = %s
-            """, (nome, endereco, telefone))
-            cliente = cursor.fetchone()
+            with transaction() as cursor:
+                logger.info("Buscando cliente por nome, endereço e telefone.")
+                cursor.execute("""
+                    SELECT id, nome, endereco, telefone, referencia
+                    FROM clientes
+                    WHERE nome = %s AND endereco = %s AND telefone = %s
+                """, (nome, endereco, telefone))
+                cliente = cursor.fetchone()
             if cliente:
                 logger.info(f"Cliente encontrado: Nome {nome}, Endereço {endereco}, Telefone {telefone}")
                 return {
@@ -118,8 +157,6 @@ class Cliente:
         except Exception as e:
             logger.error(f"Erro ao buscar cliente por dados: {e}")
             return None
-        finally:
-            release_connection(conn)
 
     @staticmethod
     def obter_cliente_por_id(cliente_id):
@@ -192,6 +229,7 @@ class Cliente:
                 WHERE id = %s
             """, (nome, endereco, telefone, referencia, cliente_id))
             conn.commit()
+            cache_respostas.invalidar('clientes')
             atualizado = cursor.rowcount > 0
             if atualizado:
                 logger.info(f"Cliente ID {cliente_id} atualizado com sucesso.")
@@ -220,6 +258,7 @@ class Cliente:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM clientes WHERE id = %s", (cliente_id,))
             conn.commit()
+            cache_respostas.invalidar('clientes')
             excluido = cursor.rowcount > 0
             if excluido:
                 logger.info(f"Cliente ID {cliente_id} excluído com sucesso.")
@@ -0,0 +1,173 @@
+import psycopg2
+from database import transaction
+from datetime import date, datetime, timedelta
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Disponibilidade:
+    """
+    Calendário de disponibilidade dos itens do inventário.
+
+    Cada linha de itens_locados ocupa sua quantidade de data_alocacao (ou início da locação)
+    até a devolução: data_devolucao do item, data_devolucao_efetiva da locação ou, se ainda não
+    devolvida, data_fim (estendida até hoje para locações ativas em atraso). A ocupação diária é
+    obtida por varredura (sweep-line) sobre os eventos de entrada/saída, em O(R + D) para R
+    períodos e D dias, sem percorrer as locações dia a dia.
+    """
+
+    # Horizonte padrão e máximo, em dias, do intervalo consultado
+    HORIZONTE_PADRAO = 30
+    HORIZONTE_MAXIMO = 366
+
+    @staticmethod
+    def _converter_data(valor, nome):
+        if isinstance(valor, date):
+            return valor
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise ValueError(f"Parâmetro '{nome}' deve estar no formato AAAA-MM-DD.")
+
+    @staticmethod
+    def validar_intervalo(de=None, ate=None):
+        """
+        Normaliza o intervalo consultado.
+
+        Parâmetros:
+            de (str | date, optional): Primeiro dia. Padrão: hoje.
+            ate (str | date, optional): Último dia (inclusive). Padrão: de + HORIZONTE_PADRAO.
+
+        Retorna:
+            tuple: (de, ate) como objetos date.
+
+        Levanta:
+            ValueError: Se as datas forem inválidas, invertidas ou excederem o horizonte máximo.
+        """
+        de = Disponibilidade._converter_data(de, 'de') if de else date.today()
+        ate = Disponibilidade._converter_data(ate, 'ate') if ate else de + timedelta(days=Disponibilidade.HORIZONTE_PADRAO)
+        if ate < de:
+            raise ValueError("A data 'ate' deve ser igual ou posterior à data 'de'.")
+        if (ate - de).days + 1 > Disponibilidade.HORIZONTE_MAXIMO:
+            raise ValueError(f"O intervalo consultado não pode exceder {Disponibilidade.HORIZONTE_MAXIMO} dias.")
+        return de, ate
+
+    @staticmethod
+    def ocupacao_diaria(periodos, de, ate):
+        """
+        Calcula a quantidade ocupada em cada dia de [de, ate] por varredura de eventos.
+
+        Parâmetros:
+            periodos (iterable): Tuplas (inicio, fim, quantidade), datas inclusive.
+            de (date): Primeiro dia.
+            ate (date): Último dia (inclusive).
+
+        Retorna:
+            list: Quantidade ocupada por dia, um elemento para cada dia do intervalo.
+        """
+        total_dias = (ate - de).days + 1
+        # variacao[i] é o quanto a ocupação muda ao entrar no dia de + i
+        variacao = [0] * (total_dias + 1)
+        for inicio, fim, quantidade in periodos:
+            if fim < inicio or fim < de or inicio > ate:
+                continue
+            variacao[max((inicio - de).days, 0)] += quantidade
+            variacao[min((fim - de).days, total_dias - 1) + 1] -= quantidade
+
+        ocupacao = []
+        acumulado = 0
+        for dia in range(total_dias):
+            acumulado += variacao[dia]
+            ocupacao.append(acumulado)
+        return ocupacao
+
+    @staticmethod
+    def obter_calendario(item_ids, de=None, ate=None):
+        """
+        Obtém a disponibilidade diária de um ou mais itens do inventário.
+
+        Parâmetros:
+            item_ids (list): IDs dos itens.
+            de (str | date, optional): Primeiro dia. Padrão: hoje.
+            ate (str | date, optional): Último dia (inclusive). Padrão: de + HORIZONTE_PADRAO.
+
+        Retorna:
+            dict: {item_id: calendário} apenas para os itens existentes. Cada calendário tem
+            'item_id', 'nome_item', 'quantidade_total', 'de', 'ate', 'minimo_disponivel' e
+            'dias' (lista de {'data', 'ocupado', 'disponivel'}).
+
+        Levanta:
+            ValueError: Se o intervalo for inválido.
+        """
+        de, ate = Disponibilidade.validar_intervalo(de, ate)
+        try:
+            with transaction() as cursor:
+                cursor.execute('''
+                    SELECT id, nome_item, quantidade
+                    FROM inventario
+                    WHERE id = ANY(%s)
+                ''', (list(item_ids),))
+                itens = cursor.fetchall()
+                if not itens:
+                    return {}
+
+                # Períodos iguais são agregados no banco, reduzindo os eventos da varredura
+                cursor.execute('''
+                    SELECT item_id, inicio, fim, SUM(quantidade)
+                    FROM (
+                        SELECT il.item_id,
+                               COALESCE(il.data_alocacao, l.data_inicio) AS inicio,
+                               COALESCE(il.data_devolucao, l.data_devolucao_efetiva,
+                                        CASE WHEN l.status = 'ativo' THEN GREATEST(l.data_fim, CURRENT_DATE)
+                                             ELSE l.data_fim END) AS fim,
+                               il.quantidade
+                        FROM itens_locados il
+                        JOIN locacoes l ON l.id = il.locacao_id
+                        WHERE il.item_id = ANY(%s)
+                          AND COALESCE(il.data_alocacao, l.data_inicio) <= %s
+                    ) periodos
+                    WHERE fim >= %s
+                    GROUP BY item_id, inicio, fim
+                ''', ([item[0] for item in itens], ate, de))
+                periodos_por_item = {}
+                for item_id, inicio, fim, quantidade in cursor.fetchall():
+                    periodos_por_item.setdefault(item_id, []).append((inicio, fim, quantidade))
+
+            calendarios = {}
+            for item_id, nome_item, quantidade_total in itens:
+                ocupacao = Disponibilidade.ocupacao_diaria(periodos_por_item.get(item_id, []), de, ate)
+                dias = [
+                    {
+                        "data": (de + timedelta(days=indice)).strftime('%Y-%m-%d'),
+                        "ocupado": ocupado,
+                        "disponivel": max(quantidade_total - ocupado, 0),
+                    }
+                    for indice, ocupado in enumerate(ocupacao)
+                ]
+                calendarios[item_id] = {
+                    "item_id": item_id,
+                    "nome_item": nome_item,
+                    "quantidade_total": quantidade_total,
+                    "de": de.strftime('%Y-%m-%d'),
+                    "ate": ate.strftime('%Y-%m-%d'),
+                    "minimo_disponivel": min(dia["disponivel"] for dia in dias),
+                    "dias": dias,
+                }
+            logger.info(f"Disponibilidade calculada para {len(calendarios)} item(ns) de {de} a {ate}.")
+            return calendarios
+        except psycopg2.Error as e:
+            logger.error(f"Erro ao calcular disponibilidade: {e}")
+            raise
+
+    @staticmethod
+    def obter_por_item(item_id, de=None, ate=None):
+        """
+        Obtém a disponibilidade diária de um item.
+
+        Retorna:
+            dict: Calendário do item (ver obter_calendario) ou None se o item não existir.
+        """
+        return Disponibilidade.obter_calendario([item_id], de, ate).get(item_id)
@@ -0,0 +1,248 @@
+from database import get_connection, release_connection
+from datetime import datetime
+import csv
+import io
+import itertools
+import logging
+import os
+import tempfile
+import uuid
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Exportacao:
+    """
+    Exportação de relatórios direto do banco, em CSV ou XLSX, com memória constante.
+
+    As linhas são lidas por um cursor nomeado (server-side), LINHAS_POR_LOTE por vez, e
+    convertidas em pedaços do arquivo à medida que a resposta é enviada. O XLSX é montado pelo
+    modo write-only do openpyxl em um arquivo temporário, enviado em blocos e removido em seguida.
+    """
+
+    LINHAS_POR_LOTE = 2000
+    TAMANHO_BLOCO = 64 * 1024
+
+    # Conjunto de dados exportáveis: colunas do arquivo, consulta base e filtros aceitos
+    # (parâmetro -> expressão SQL comparada com o valor recebido).
+    CONJUNTOS = {
+        "locacoes": {
+            "colunas": ["ID", "Cliente", "Telefone", "Data Início", "Data Fim", "Status",
+                        "Valor Total", "Valor Pago na Entrega", "Valor a Receber", "Número da Nota"],
+            "consulta": """
+                SELECT l.id, c.nome, c.telefone, l.data_inicio, l.data_fim, l.status,
+                       l.valor_total, l.valor_pago_entrega, l.valor_receber_final, l.numero_nota
+                FROM locacoes l
+                JOIN clientes c ON c.id = l.cliente_id
+                WHERE 1=1
+            """,
+            "filtros": {
+                "start_date": "l.data_inicio >= %s",
+                "end_date": "l.data_fim <= %s",
+                "cliente_id": "l.cliente_id = %s",
+                "status": "l.status = %s",
+            },
+            "ordem": "l.id",
+        },
+        "itens_locados": {
+            "colunas": ["Locação", "Cliente", "Item", "Tipo", "Quantidade", "Data Início", "Data Fim",
+                        "Status", "Data Devolução"],
+            "consulta": """
+                SELECT l.id, c.nome, i.nome_item, i.tipo_item, il.quantidade, l.data_inicio, l.data_fim,
+                       l.status, il.data_devolucao
+                FROM itens_locados il
+                JOIN locacoes l ON l.id = il.locacao_id
+                JOIN clientes c ON c.id = l.cliente_id
+                JOIN inventario i ON i.id = il.item_id
+                WHERE 1=1
+            """,
+            "filtros": {
+                "start_date": "l.data_inicio >= %s",
+                "end_date": "l.data_fim <= %s",
+                "cliente_id": "l.cliente_id = %s",
+                "item_id": "il.item_id = %s",
+                "status": "l.status = %s",
+            },
+            "ordem": "l.id, il.id",
+        },
+        "status": {
+            "colunas": ["Status", "Total de Locações", "Receita Total"],
+            "consulta": """
+                SELECT NULLIF(status, ''), SUM(total_locacoes), SUM(receita_total)
+                FROM relatorio_locacoes_diario
+                WHERE 1=1
+            """,
+            "filtros": {
+                "start_date": "data_inicio >= %s",
+                "end_date": "data_fim <= %s",
+            },
+            "agrupamento": "status",
+            "ordem": "status",
+        },
+    }
+
+    FORMATOS = {
+        "csv": "text/csv; charset=utf-8",
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    }
+
+    @staticmethod
+    def montar_consulta(conjunto, filtros):
+        """
+        Monta a consulta de um conjunto de dados com os filtros informados.
+
+        Parâmetros:
+            conjunto (str): Nome do conjunto (chave de CONJUNTOS).
+            filtros (dict): Valores dos filtros (start_date, end_date, cliente_id, ...).
+
+        Retorna:
+            tuple: (colunas, consulta SQL, parâmetros).
+
+        Levanta:
+            ValueError: Se o conjunto não existir ou alguma data for inválida.
+        """
+        definicao = Exportacao.CONJUNTOS.get(conjunto)
+        if definicao is None:
+            raise ValueError(f"Conjunto de exportação inválido: '{conjunto}'. "
+                             f"Use um de: {', '.join(Exportacao.CONJUNTOS)}.")
+
+        consulta = definicao["consulta"]
+        params = []
+        for nome, condicao in definicao["filtros"].items():
+            valor = filtros.get(nome)
+            if not valor:
+                continue
+            if nome in ("start_date", "end_date"):
+                try:
+                    datetime.strptime(valor, '%Y-%m-%d')
+                except ValueError:
+                    raise ValueError(f"Formato de data inválido para '{nome}'.")
+            consulta += f" AND {condicao}"
+            params.append(valor)
+        if definicao.get("agrupamento"):
+            consulta += f" GROUP BY {definicao['agrupamento']}"
+        consulta += f" ORDER BY {definicao['ordem']}"
+        return definicao["colunas"], consulta, params
+
+    @staticmethod
+    def linhas(consulta, params):
+        """
+        Gera as linhas da consulta em lotes, por um cursor nomeado no servidor.
+        A conexão fica reservada até o gerador terminar ou ser fechado.
+        """
+        conn = get_connection()
+        if conn is None:
+            raise ConnectionError("Não foi possível obter conexão com o banco de dados.")
+        try:
+            with conn.cursor(name=f"exportacao_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = Exportacao.LINHAS_POR_LOTE
+                cursor.execute(consulta, params)
+                total = 0
+                for linha in cursor:
+                    total += 1
+                    yield linha
+            conn.commit()
+            logger.info(f"Exportação concluída: {total} linhas.")
+        finally:
+            release_connection(conn)
+
+    @staticmethod
+    def _valor_celula(valor):
+        if valor is None:
+            return ""
+        if hasattr(valor, "strftime"):
+            return valor.strftime("%Y-%m-%d")
+        return valor
+
+    @staticmethod
+    def gerar_csv(colunas, linhas):
+        """
+        Gera o CSV em pedaços de bytes (UTF-8 com BOM, para abrir corretamente no Excel).
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")
+        writer.writerow(colunas)
+        pendentes = 0
+        for linha in linhas:
+            writer.writerow([Exportacao._valor_celula(valor) for valor in linha])
+            pendentes += 1
+            if pendentes >= Exportacao.LINHAS_POR_LOTE:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pendentes = 0
+        yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def gerar_xlsx(colunas, linhas, titulo="Relatório"):
+        """
+        Gera o XLSX em blocos de bytes. As linhas são gravadas em modo write-only em um arquivo
+        temporário (memória constante) e o arquivo é enviado em blocos de TAMANHO_BLOCO.
+
+        Levanta:
+            ImportError: Se o openpyxl não estiver instalado.
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        planilha = workbook.create_sheet(title=titulo[:31])
+        planilha.append(colunas)
+        for linha in linhas:
+            planilha.append([
+                float(valor) if hasattr(valor, "as_tuple") else valor
+                for valor in linha
+            ])
+
+        arquivo = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+        try:
+            arquivo.close()
+            workbook.save(arquivo.name)
+            with open(arquivo.name, "rb") as conteudo:
+                while True:
+                    bloco = conteudo.read(Exportacao.TAMANHO_BLOCO)
+                    if not bloco:
+                        break
+                    yield bloco
+        finally:
+            os.unlink(arquivo.name)
+
+    @staticmethod
+    def exportar(conjunto, formato, filtros):
+        """
+        Prepara a exportação de um conjunto de dados.
+
+        Parâmetros:
+            conjunto (str): Nome do conjunto (locacoes, itens_locados ou status).
+            formato (str): 'csv' ou 'xlsx'.
+            filtros (dict): Filtros aceitos pelo conjunto.
+
+        Retorna:
+            tuple: (gerador de bytes, mimetype, nome do arquivo).
+
+        Levanta:
+            ValueError: Se o conjunto, o formato ou os filtros forem inválidos.
+            NotImplementedError: Se o formato for 'xlsx' e o openpyxl não estiver instalado.
+        """
+        if formato not in Exportacao.FORMATOS:
+            raise ValueError("Formato de exportação inválido. Use 'csv' ou 'xlsx'.")
+        if formato == "xlsx":
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                raise NotImplementedError("Exportação em XLSX requer o pacote openpyxl.")
+        colunas, consulta, params = Exportacao.montar_consulta(conjunto, filtros)
+
+        # Executa a consulta antes de iniciar a resposta, para que erros virem status HTTP
+        linhas = Exportacao.linhas(consulta, params)
+        primeira = next(linhas, None)
+        if primeira is not None:
+            linhas = itertools.chain([primeira], linhas)
+        if formato == "csv":
+            conteudo = Exportacao.gerar_csv(colunas, linhas)
+        else:
+            conteudo = Exportacao.gerar_xlsx(colunas, linhas, titulo=conjunto)
+        nome_arquivo = f"relatorio_{conjunto}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        return conteudo, Exportacao.FORMATOS[formato], nome_arquivo
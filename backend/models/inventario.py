@@ -1,5 +1,7 @@
 import psycopg2
-from database import get_connection, release_connection
+from database import get_connection, release_connection, transaction
+from cache_respostas import cache_respostas
+from models.busca import Busca
 import logging
 
 # Configuração de logging
@@ -29,6 +31,7 @@ class Inventario:
                 RETURNING id
             """, (nome_item, quantidade, quantidade, tipo_item))
             conn.commit()
+            cache_respostas.invalidar('inventario')
             item_id = cursor.fetchone()[0]
             logger.info(f"Item '{nome_item}' adicionado ao inventário com ID {item_id}.")
             return item_id
@@ -85,6 +88,44 @@ class Inventario:
         finally:
             release_connection(conn)
 
+    @staticmethod
+    def buscar(termo, limite=None):
+        """
+        Busca itens do inventário pelo nome, sem diferenciar acentos e maiúsculas, em ordem de relevância.
+
+        Parâmetros:
+            termo (str): Trecho do nome digitado.
+            limite (int, optional): Número máximo de resultados (1 a Busca.LIMITE_MAXIMO).
+
+        Retorna:
+            list: Lista de dicionários contendo os itens encontrados.
+
+        Levanta:
+            ValueError: Se o limite for inválido.
+        """
+        limite = Busca.validar_limite(limite)
+        consulta, params = Busca.montar_consulta(
+            "id, nome_item, quantidade, quantidade_disponivel, tipo_item", "inventario", "nome_item", termo, limite
+        )
+        try:
+            with transaction() as cursor:
+                cursor.execute(consulta, params)
+                items = cursor.fetchall()
+            return [
+                {
+                    "id": item[0],
+                    "nome_item": item[1],
+                    "quantidade": item[2],
+                    "quantidade_disponivel": item[3],
+                    "tipo_item": item[4],
+                    "status": Inventario._get_status(item[2], item[3]),
+                }
+                for item in items
+            ]
+        except Exception as e:
+            logger.error(f"Erro ao buscar itens do inventário pelo nome: {e}")
+            return []
+
     @staticmethod
     def _get_status(total, available):
         """
@@ -114,16 +155,15 @@ class Inventario:
         Retorna:
             dict: Detalhes do item encontrado ou None se não encontrado.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            logger.info(f"Buscando item no inventário pelo modelo: {modelo}")
-            cursor.execute("""
-                SELECT id, nome_item, quantidade_disponivel, tipo_item
-                FROM inventario
-                WHERE nome_item = %s
-            """, (modelo,))
-            item = cursor.fetchone()
+            with transaction() as cursor:
+                logger.info(f"Buscando item no inventário pelo modelo: {modelo}")
+                cursor.execute("""
+                    SELECT id, nome_item, quantidade_disponivel, tipo_item
+                    FROM inventario
+                    WHERE nome_item = %s
+                """, (modelo,))
+                item = cursor.fetchone()
             if item:
                 logger.info(f"Item encontrado no inventário: {modelo}")
                 return {
@@ -137,8 +177,6 @@ class Inventario:
         except Exception as e:
             logger.error(f"Erro ao buscar item no inventário: {e}")
             return None
-        finally:
-            release_connection(conn)
             
     @staticmethod
     def get_item_id_by_modelo(modelo):
@@ -181,16 +219,15 @@ class Inventario:
         Retorna:
             dict: Detalhes do item encontrado ou None se não encontrado.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            logger.info(f"Buscando item no inventário pelo ID: {item_id}")
-            cursor.execute("""
-                SELECT id, nome_item, quantidade, quantidade_disponivel, tipo_item
-                FROM inventario
-                WHERE id = %s
-            """, (item_id,))
-            item = cursor.fetchone()
+            with transaction() as cursor:
+                logger.info(f"Buscando item no inventário pelo ID: {item_id}")
+                cursor.execute("""
+                    SELECT id, nome_item, quantidade, quantidade_disponivel, tipo_item
+                    FROM inventario
+                    WHERE id = %s
+                """, (item_id,))
+                item = cursor.fetchone()
             if item:
                 logger.info(f"Item encontrado no inventário: ID {item_id}")
                 return {
@@ -206,8 +243,6 @@ class Inventario:
         except Exception as e:
             logger.error(f"Erro ao buscar item no inventário: {e}")
             return None
-        finally:
-            release_connection(conn)
             
     @staticmethod
     def update_quantidade(item_id, nova_quantidade):
@@ -221,42 +256,39 @@ class Inventario:
         Retorna:
             bool: True se atualizado com sucesso, False caso contrário.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            # Primeiro, obter a quantidade atual e disponível
-            cursor.execute("""
-                SELECT quantidade, quantidade_disponivel FROM inventario WHERE id = %s
-            """, (item_id,))
-            item = cursor.fetchone()
-            
-            if not item:
-                logger.warning(f"Item ID {item_id} não encontrado.")
-                return False
-                
-            quantidade_atual, quantidade_disponivel = item
-            
-            # Calcular a diferença entre a quantidade atual e a nova
-            diferenca = nova_quantidade - quantidade_atual
-            
-            # Atualizar a quantidade total e a quantidade disponível
-            nova_quantidade_disponivel = max(0, quantidade_disponivel + diferenca)
-            
-            cursor.execute("""
-                UPDATE inventario
-                SET quantidade = %s,
-                    quantidade_disponivel = %s
-                WHERE id = %s
-            """, (nova_quantidade, nova_quantidade_disponivel, item_id))
-            conn.commit()
-            
+            with transaction() as cursor:
+                # Trava a linha: reservas e devoluções concorrentes esperam por este ajuste
+                cursor.execute("""
+                    SELECT quantidade, quantidade_disponivel FROM inventario WHERE id = %s FOR UPDATE
+                """, (item_id,))
+                item = cursor.fetchone()
+
+                if not item:
+                    logger.warning(f"Item ID {item_id} não encontrado.")
+                    return False
+
+                quantidade_atual, quantidade_disponivel = item
+
+                # Calcular a diferença entre a quantidade atual e a nova
+                diferenca = nova_quantidade - quantidade_atual
+
+                # Atualizar a quantidade total e a quantidade disponível
+                nova_quantidade_disponivel = max(0, quantidade_disponivel + diferenca)
+
+                cursor.execute("""
+                    UPDATE inventario
+                    SET quantidade = %s,
+                        quantidade_disponivel = %s
+                    WHERE id = %s
+                """, (nova_quantidade, nova_quantidade_disponivel, item_id))
+                cache_respostas.invalidar('inventario')
+
             logger.info(f"Quantidade do item ID {item_id} atualizada para {nova_quantidade}.")
             return True
         except Exception as e:
             logger.error(f"Erro ao atualizar quantidade do item ID {item_id}: {e}")
             return False
-        finally:
-            release_connection(conn)
             
     @staticmethod
     def delete_item(item_id):
@@ -274,6 +306,7 @@ class Inventario:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM inventario WHERE id = %s", (item_id,))
             conn.commit()
+            cache_respostas.invalidar('inventario')
             excluido = cursor.rowcount > 0
             if excluido:
                 logger.info(f"Item ID {item_id} excluído com sucesso.")
@@ -299,43 +332,44 @@ class Inventario:
         Retorna:
             bool: True se o estoque foi atualizado com sucesso, False caso contrário.
         """
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT quantidade_disponivel, quantidade FROM inventario WHERE id = %s
-            """, (item_id,))
-            item = cursor.fetchone()
-
-            if not item:
-                logger.warning(f"Item ID {item_id} não encontrado.")
-                return False
+        if operation == "decrease":
+            # Retira só se houver saldo; a condição é avaliada com a linha travada pelo UPDATE
+            query = """
+                UPDATE inventario
+                SET quantidade_disponivel = quantidade_disponivel - %s
+                WHERE id = %s AND quantidade_disponivel >= %s
+                RETURNING quantidade_disponivel
+            """
+        elif operation == "increase":
+            query = """
+                UPDATE inventario
+                SET quantidade_disponivel = quantidade_disponivel + %s
+                WHERE id = %s AND quantidade_disponivel + %s <= quantidade
+                RETURNING quantidade_disponivel
+            """
+        else:
+            logger.error("Operação inválida. Use 'decrease' ou 'increase'.")
+            return False
 
-            current_available, total_quantity = item
-            if operation == "decrease":
-                if current_available < quantity_change:
-                    logger.warning(f"Estoque insuficiente para item ID {item_id}. Disponível: {current_available}, Solicitado: {quantity_change}")
-                    return False
-                new_quantity = current_available - quantity_change
-            elif operation == "increase":
-                if current_available + quantity_change > total_quantity:
-                    logger.warning(f"Quantidade excede o total permitido para item ID {item_id}.")
+        try:
+            with transaction() as cursor:
+                cursor.execute(query, (quantity_change, item_id, quantity_change))
+                atualizado = cursor.fetchone()
+                if not atualizado:
+                    cursor.execute("""
+                        SELECT quantidade_disponivel, quantidade FROM inventario WHERE id = %s
+                    """, (item_id,))
+                    item = cursor.fetchone()
+                    if not item:
+                        logger.warning(f"Item ID {item_id} não encontrado.")
+                    elif operation == "decrease":
+                        logger.warning(f"Estoque insuficiente para item ID {item_id}. Disponível: {item[0]}, Solicitado: {quantity_change}")
+                    else:
+                        logger.warning(f"Quantidade excede o total permitido para item ID {item_id}.")
                     return False
-                new_quantity = current_available + quantity_change
-            else:
-                logger.error("Operação inválida. Use 'decrease' ou 'increase'.")
-                return False
-
-            cursor.execute("""
-                UPDATE inventario
-                SET quantidade_disponivel = %s
-                WHERE id = %s
-            """, (new_quantity, item_id))
-            conn.commit()
-            logger.info(f"Estoque do item ID {item_id} atualizado com sucesso. Nova quantidade disponível: {new_quantity}")
+                cache_respostas.invalidar('inventario')
+            logger.info(f"Estoque do item ID {item_id} atualizado com sucesso. Nova quantidade disponível: {atualizado[0]}")
             return True
         except Exception as e:
             logger.error(f"Erro ao atualizar estoque do item ID {item_id}: {e}")
             return False
-        finally:
-            release_connection(conn)
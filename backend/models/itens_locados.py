@@ -1,6 +1,7 @@
 import psycopg2
-from database import get_connection, release_connection
+from database import get_connection, release_connection, transaction
 from models.inventario import Inventario
+from models.reserva_estoque import ReservaEstoque
 from datetime import date, datetime
 import logging
 
@@ -27,38 +28,22 @@ class ItensLocados:
             logger.error("A quantidade a ser adicionada deve ser positiva.")
             return False
 
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            # Verificar se o item existe e está disponível no inventário
-            inventario_item = Inventario.get_item_by_id(item_id)
-            if not inventario_item:
-                logger.error(f"Item ID {item_id} não encontrado no inventário.")
-                return False
-            if quantidade > inventario_item['quantidade_disponivel']:
-                logger.error(f"Quantidade solicitada ({quantidade}) excede o estoque disponível ({inventario_item['quantidade_disponivel']}).")
-                return False
-
-            # Inserir o item na tabela itens_locados
-            cursor.execute('''
-                INSERT INTO itens_locados (locacao_id, item_id, quantidade, data_alocacao)
-                VALUES (%s, %s, %s, %s)
-            ''', (locacao_id, item_id, quantidade, date.today()))
-            conn.commit()
-            logger.info(f"Item ID {item_id} adicionado à locação ID {locacao_id} com quantidade {quantidade} em {date.today()}.")
+            with transaction() as cursor:
+                # Reservar o estoque (trava a linha do inventário e verifica o saldo)
+                ReservaEstoque.reservar(cursor, {item_id: quantidade})
 
-            # Atualizar o estoque no inventário
-            sucesso_estoque = Inventario.atualizar_estoque(item_id, -quantidade)
-            if not sucesso_estoque:
-                logger.error(f"Erro ao atualizar estoque para o item ID {item_id}.")
-                raise Exception(f"Erro ao atualizar estoque para o item ID {item_id}.")
+                # Inserir o item na tabela itens_locados
+                cursor.execute('''
+                    INSERT INTO itens_locados (locacao_id, item_id, quantidade, data_alocacao)
+                    VALUES (%s, %s, %s, %s)
+                ''', (locacao_id, item_id, quantidade, date.today()))
 
+            logger.info(f"Item ID {item_id} adicionado à locação ID {locacao_id} com quantidade {quantidade} em {date.today()}.")
             return True
         except Exception as e:
             logger.error(f"Erro ao adicionar item locado: {e}")
             return False
-        finally:
-            release_connection(conn)
 
     @staticmethod
     def marcar_como_devolvido(locacao_id, item_id=None, data_devolucao=None):
@@ -109,6 +94,62 @@ class ItensLocados:
         finally:
             release_connection(conn)
 
+    @staticmethod
+    def _formatar_item(row, today):
+        """
+        Converte uma linha de itens locados no dicionário retornado pela API, calculando o status.
+
+        Parâmetros:
+            row (tuple): (item_id, nome_item, quantidade, data_alocacao, data_devolucao, tipo_item, data_fim).
+            today (date): Data de referência para identificar atrasos.
+
+        Retorna:
+            dict: Detalhes do item locado.
+        """
+        item_id, nome_item, quantidade, data_alocacao, data_devolucao, tipo_item, data_fim = row
+
+        # Converter data_alocacao para objeto date se for string
+        if isinstance(data_alocacao, str):
+            try:
+                data_alocacao = datetime.strptime(data_alocacao, '%Y-%m-%d').date()
+            except ValueError:
+                logger.error(f"Formato de data inválido para data_alocacao: {data_alocacao}")
+                data_alocacao = today  # Valor padrão em caso de erro
+
+        # Converter data_fim para objeto date se for string
+        if isinstance(data_fim, str):
+            try:
+                data_fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+            except ValueError:
+                logger.error(f"Formato de data inválido para data_fim: {data_fim}")
+                data_fim = today  # Valor padrão em caso de erro
+
+        # Converter data_devolucao para objeto date se for string e não None
+        if data_devolucao is not None and isinstance(data_devolucao, str):
+            try:
+                data_devolucao = datetime.strptime(data_devolucao, '%Y-%m-%d').date()
+            except ValueError:
+                logger.error(f"Formato de data inválido para data_devolucao: {data_devolucao}")
+                data_devolucao = None  # Ignorar data inválida
+
+        if data_devolucao is not None:
+            status = 'devolvido'
+        else:
+            if data_fim < today:
+                status = 'atrasado'
+            else:
+                status = 'aguardando devolução'
+
+        return {
+            "item_id": item_id,
+            "nome_item": nome_item,
+            "quantidade": quantidade,
+            "data_alocacao": data_alocacao.strftime("%Y-%m-%d") if data_alocacao else None,
+            "data_devolucao": data_devolucao.strftime("%Y-%m-%d") if data_devolucao else None,
+            "tipo_item": tipo_item,
+            "status": status
+        }
+
     @staticmethod
     def obter_por_locacao(locacao_id):
         """
@@ -120,78 +161,70 @@ class ItensLocados:
         Retorna:
             list: Lista de dicionários com detalhes dos itens locados.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT 
-                    il.item_id, 
-                    inv.nome_item, 
-                    il.quantidade, 
-                    il.data_alocacao, 
-                    il.data_devolucao, 
-                    inv.tipo_item,
-                    loc.data_fim
-                FROM itens_locados il
-                JOIN inventario inv ON il.item_id = inv.id
-                JOIN locacoes loc ON il.locacao_id = loc.id
-                WHERE il.locacao_id = %s
-            ''', (locacao_id,))
-            items = cursor.fetchall()
+            with transaction() as cursor:
+                cursor.execute('''
+                    SELECT 
+                        il.item_id, 
+                        inv.nome_item, 
+                        il.quantidade, 
+                        il.data_alocacao, 
+                        il.data_devolucao, 
+                        inv.tipo_item,
+                        loc.data_fim
+                    FROM itens_locados il
+                    JOIN inventario inv ON il.item_id = inv.id
+                    JOIN locacoes loc ON il.locacao_id = loc.id
+                    WHERE il.locacao_id = %s
+                ''', (locacao_id,))
+                items = cursor.fetchall()
             logger.info(f"Itens obtidos para locação ID {locacao_id}.")
 
             today = date.today()
-            items_list = []
-            for row in items:
-                item_id, nome_item, quantidade, data_alocacao, data_devolucao, tipo_item, data_fim = row
-                
-                # Converter data_alocacao para objeto date se for string
-                if isinstance(data_alocacao, str):
-                    try:
-                        data_alocacao = datetime.strptime(data_alocacao, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Formato de data inválido para data_alocacao: {data_alocacao}")
-                        data_alocacao = today  # Valor padrão em caso de erro
-                
-                # Converter data_fim para objeto date se for string
-                if isinstance(data_fim, str):
-                    try:
-                        data_fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Formato de data inválido para data_fim: {data_fim}")
-                        data_fim = today  # Valor padrão em caso de erro
-                
-                # Converter data_devolucao para objeto date se for string e não None
-                if data_devolucao is not None and isinstance(data_devolucao, str):
-                    try:
-                        data_devolucao = datetime.strptime(data_devolucao, '%Y-%m-%d').date()
-                    except ValueError:
-                        logger.error(f"Formato de data inválido para data_devolucao: {data_devolucao}")
-                        data_devolucao = None  # Ignorar data inválida
-                
-                if data_devolucao is not None:
-                    status = 'devolvido'
-                else:
-                    if data_fim < today:
-                        status = 'atrasado'
-                    else:
-                        status = 'aguardando devolução'
-
-                items_list.append({
-                    "item_id": item_id,
-                    "nome_item": nome_item,
-                    "quantidade": quantidade,
-                    "data_alocacao": data_alocacao.strftime("%Y-%m-%d") if data_alocacao else None,
-                    "data_devolucao": data_devolucao.strftime("%Y-%m-%d") if data_devolucao else None,
-                    "tipo_item": tipo_item,
-                    "status": status
-                })
-            return items_list
+            return [ItensLocados._formatar_item(row, today) for row in items]
         except Exception as e:
             logger.error(f"Erro ao buscar itens locados: {e}")
             return []
-        finally:
-            release_connection(conn)
+
+    @staticmethod
+    def obter_por_locacoes(locacao_ids, cursor):
+        """
+        Retorna os itens de várias locações em uma única consulta, agrupados por locação.
+        Evita uma consulta por locação (N+1) nas listagens.
+
+        Parâmetros:
+            locacao_ids (list): IDs das locações.
+            cursor: Cursor de banco de dados já aberto pelo chamador.
+
+        Retorna:
+            dict: Mapeamento {locacao_id: [itens]}; locações sem itens recebem lista vazia.
+        """
+        itens_por_locacao = {locacao_id: [] for locacao_id in locacao_ids}
+        if not itens_por_locacao:
+            return itens_por_locacao
+
+        cursor.execute('''
+            SELECT 
+                il.locacao_id,
+                il.item_id, 
+                inv.nome_item, 
+                il.quantidade, 
+                il.data_alocacao, 
+                il.data_devolucao, 
+                inv.tipo_item,
+                loc.data_fim
+            FROM itens_locados il
+            JOIN inventario inv ON il.item_id = inv.id
+            JOIN locacoes loc ON il.locacao_id = loc.id
+            WHERE il.locacao_id = ANY(%s)
+            ORDER BY il.locacao_id, il.id
+        ''', (list(itens_por_locacao),))
+
+        today = date.today()
+        for row in cursor.fetchall():
+            itens_por_locacao[row[0]].append(ItensLocados._formatar_item(row[1:], today))
+        logger.info(f"Itens obtidos para {len(itens_por_locacao)} locações em uma única consulta.")
+        return itens_por_locacao
 
     @staticmethod
     def registrar_problema(locacao_id, item_id, descricao_problema):
@@ -307,58 +340,43 @@ class ItensLocados:
             logger.error("A nova quantidade deve ser positiva.")
             return False
             
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            
-            # Verificar se o item locado existe
-            cursor.execute('''
-                SELECT quantidade
-                FROM itens_locados
-                WHERE locacao_id = %s AND item_id = %s
-            ''', (locacao_id, item_id))
-            
-            item = cursor.fetchone()
-            if not item:
-                logger.error(f"Item ID {item_id} não encontrado na locação ID {locacao_id}.")
-                return False
-                
-            quantidade_atual = item[0]
-            
-            # Calcular a diferença de quantidade
-            diferenca = nova_quantidade - quantidade_atual
-            
-            # Verificar se há estoque suficiente para aumentar a quantidade
-            if diferenca > 0:
-                inventario_item = Inventario.get_item_by_id(item_id)
-                if not inventario_item:
-                    logger.error(f"Item ID {item_id} não encontrado no inventário.")
-                    return False
-                    
-                if diferenca > inventario_item['quantidade_disponivel']:
-                    logger.error(f"Quantidade adicional solicitada ({diferenca}) excede o estoque disponível ({inventario_item['quantidade_disponivel']}).")
+            with transaction() as cursor:
+                # Verificar se o item locado existe, travando a linha: edições concorrentes da
+                # mesma linha esperam e calculam a diferença sobre a quantidade já atualizada
+                cursor.execute('''
+                    SELECT quantidade
+                    FROM itens_locados
+                    WHERE locacao_id = %s AND item_id = %s
+                    FOR UPDATE
+                ''', (locacao_id, item_id))
+
+                item = cursor.fetchone()
+                if not item:
+                    logger.error(f"Item ID {item_id} não encontrado na locação ID {locacao_id}.")
                     return False
-            
-            # Atualizar a quantidade do item locado
-            cursor.execute('''
-                UPDATE itens_locados
-                SET quantidade = %s
-                WHERE locacao_id = %s AND item_id = %s
-            ''', (nova_quantidade, locacao_id, item_id))
-            conn.commit()
-            
-            # Atualizar o estoque no inventário
-            if diferenca != 0:
-                sucesso_estoque = Inventario.atualizar_estoque(item_id, -diferenca)
-                if not sucesso_estoque:
-                    logger.error(f"Erro ao atualizar estoque para o item ID {item_id}.")
-                    raise Exception(f"Erro ao atualizar estoque para o item ID {item_id}.")
-            
+
+                quantidade_atual = item[0]
+
+                # Calcular a diferença de quantidade
+                diferenca = nova_quantidade - quantidade_atual
+
+                # Reservar a diferença (ou devolvê-la ao estoque, se a quantidade diminuiu)
+                if diferenca > 0:
+                    ReservaEstoque.reservar(cursor, {item_id: diferenca})
+                elif diferenca < 0:
+                    ReservaEstoque.liberar(cursor, {item_id: -diferenca})
+
+                # Atualizar a quantidade do item locado
+                cursor.execute('''
+                    UPDATE itens_locados
+                    SET quantidade = %s
+                    WHERE locacao_id = %s AND item_id = %s
+                ''', (nova_quantidade, locacao_id, item_id))
+
             logger.info(f"Quantidade do item ID {item_id} na locação ID {locacao_id} atualizada para {nova_quantidade}.")
             return True
-            
+
         except Exception as e:
             logger.error(f"Erro ao atualizar quantidade do item locado: {e}")
             return False
-        finally:
-            release_connection(conn)
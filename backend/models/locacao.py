@@ -1,17 +1,28 @@
 import psycopg2
-from database import get_connection, release_connection
+from psycopg2.extras import execute_values
+from database import get_connection, release_connection, transaction
 from models.itens_locados import ItensLocados
 from models.cliente import Cliente
 from models.inventario import Inventario
+from models.reserva_estoque import ReservaEstoque, EstoqueInsuficienteError
+from cache_respostas import cache_respostas
 import logging
+import base64
+import json
 from datetime import datetime, date
-from helpers import atualizar_estoque
 
 # Configuração de logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class Locacao:
+    # Limites de tamanho de página para a listagem paginada
+    LIMITE_PADRAO = 50
+    LIMITE_MAXIMO = 200
+
+    # Colunas de ordenação aceitas pela listagem paginada (sempre decrescente, desempate por id)
+    ORDENACOES = ('id', 'data_inicio')
+
     @staticmethod
     def validar_dados_locacao(data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final):
         """
@@ -63,6 +74,9 @@ class Locacao:
 
         Retorna:
             int: ID da locação criada no banco de dados, ou None em caso de erro.
+
+        Levanta:
+            EstoqueInsuficienteError: Se algum item não tiver saldo; nada é gravado.
         """
         logger.debug("Iniciando o processo de criação de locação.")
         if not all([data_inicio, data_fim]):
@@ -75,82 +89,174 @@ class Locacao:
             logger.error(f"Validação de dados falhou: {ve}")
             return None
 
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            # Criar ou buscar cliente
-            cliente = Cliente.get_cliente_por_dados(nome=nome_cliente, endereco=endereco_cliente, telefone=telefone_cliente)
-            if not cliente:
-                # Criar cliente dentro da mesma transação
-                if not nome_cliente or not telefone_cliente:
-                    logger.warning("Nome e telefone são obrigatórios para criar um cliente.")
-                    return None
-                
-                cursor.execute("""
-                    INSERT INTO clientes (nome, endereco, telefone, referencia)
-                    VALUES (%s, %s, %s, %s)
+            with transaction() as cursor:
+                # Criar ou buscar cliente
+                cliente = Cliente.get_cliente_por_dados(nome=nome_cliente, endereco=endereco_cliente, telefone=telefone_cliente)
+                if not cliente:
+                    # Criar cliente dentro da mesma transação
+                    if not nome_cliente or not telefone_cliente:
+                        logger.warning("Nome e telefone são obrigatórios para criar um cliente.")
+                        return None
+
+                    cursor.execute("""
+                        INSERT INTO clientes (nome, endereco, telefone, referencia)
+                        VALUES (%s, %s, %s, %s)
+                        RETURNING id
+                    """, (nome_cliente, endereco_cliente, telefone_cliente, None))
+                    cliente_id = cursor.fetchone()[0]
+                    cache_respostas.invalidar('clientes')
+                    logger.info(f"Cliente criado com sucesso: ID {cliente_id}")
+                else:
+                    cliente_id = cliente['id']
+
+                # Criar a locação
+                cursor.execute('''
+                    INSERT INTO locacoes (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final, status, numero_nota)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                     RETURNING id
-                """, (nome_cliente, endereco_cliente, telefone_cliente, None))
-                cliente_id = cursor.fetchone()[0]
-                logger.info(f"Cliente criado com sucesso: ID {cliente_id}")
-            else:
-                cliente_id = cliente['id']
+                ''', (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final, status, numero_nota))
+                locacao_id = cursor.fetchone()[0]
+                logger.info(f"Locação criada com sucesso: ID {locacao_id}")
+
+                # Adicionar itens à locação e baixar o estoque em lote
+                if itens:
+                    Locacao._inserir_itens(cursor, locacao_id, itens)
 
-            # Criar a locação
-            cursor.execute('''
-                INSERT INTO locacoes (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final, status, numero_nota)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            ''', (cliente_id, data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final, status, numero_nota))
-            locacao_id = cursor.fetchone()[0]
-            logger.info(f"Locação criada com sucesso: ID {locacao_id}")
-
-            # Adicionar itens à locação
-            if itens:
-                for item in itens:
-                    modelo = item.get('modelo')
-                    quantidade = item.get('quantidade')
-                    unidade = item.get('unidade', 'peças')
-
-                    if not modelo or not quantidade:
-                        logger.error("Itens devem conter 'modelo' e 'quantidade'.")
-                        raise ValueError("Erro nos dados do item.")
-
-                    inventario_item = Inventario.get_item_by_modelo(modelo)
-                    if not inventario_item:
-                        logger.error(f"Item '{modelo}' não encontrado no inventário.")
-                        raise ValueError(f"Item '{modelo}' não disponível.")
-
-                    item_id = inventario_item['id']
-                    quantidade_disponivel = inventario_item['quantidade_disponivel']
-
-                    if quantidade > quantidade_disponivel:
-                        logger.error(f"Quantidade solicitada ({quantidade}) excede o disponível ({quantidade_disponivel}) para o item '{modelo}'.")
-                        raise ValueError(f"Estoque insuficiente para o item '{modelo}'.")
-
-                    cursor.execute('''
-                        INSERT INTO itens_locados (locacao_id, item_id, quantidade)
-                        VALUES (%s, %s, %s)
-                    ''', (locacao_id, item_id, quantidade))
-                    logger.debug(f"Item adicionado à locação: {modelo} (Qtd: {quantidade})")
-
-                    # Atualizar estoque usando a mesma transação
-                    atualizar_estoque(item_id, -quantidade, cursor)
-
-            # Commit all changes at once
-            conn.commit()
             logger.info(f"Locação registrada com sucesso: ID {locacao_id}")
             return locacao_id
+        except EstoqueInsuficienteError:
+            raise
         except (psycopg2.Error, ValueError) as e:
             logger.error(f"Erro ao criar locação: {e}")
             return None
-        finally:
-            release_connection(conn)
+
+    @staticmethod
+    def _inserir_itens(cursor, locacao_id, itens):
+        """
+        Insere os itens de uma locação e baixa o estoque com um conjunto fixo de instruções,
+        independente do número de linhas do pedido.
+
+        A baixa de estoque é feita por ReservaEstoque.reservar; se algum item não tiver saldo,
+        nenhuma linha é alterada por esta função e a transação do chamador deve ser desfeita.
+
+        Parâmetros:
+            cursor: Cursor da transação em andamento.
+            locacao_id (int): ID da locação.
+            itens (list): Lista de dicionários com 'modelo' e 'quantidade'.
+
+        Levanta:
+            EstoqueInsuficienteError: Se algum item não tiver estoque suficiente.
+            ValueError: Se algum item for inválido ou não existir.
+        """
+        for item in itens:
+            if not item.get('modelo') or not item.get('quantidade'):
+                logger.error("Itens devem conter 'modelo' e 'quantidade'.")
+                raise ValueError("Erro nos dados do item.")
+
+        modelos = list({item['modelo'] for item in itens})
+        cursor.execute('''
+            SELECT nome_item, id
+            FROM inventario
+            WHERE nome_item = ANY(%s)
+        ''', (modelos,))
+        ids_por_modelo = dict(cursor.fetchall())
+
+        for modelo in modelos:
+            if modelo not in ids_por_modelo:
+                logger.error(f"Item '{modelo}' não encontrado no inventário.")
+                raise ValueError(f"Item '{modelo}' não disponível.")
+
+        # Reserva tudo ou nada, travando as linhas do inventário em ordem de id
+        ReservaEstoque.reservar(cursor, [(ids_por_modelo[item['modelo']], item['quantidade']) for item in itens])
+
+        execute_values(cursor, '''
+            INSERT INTO itens_locados (locacao_id, item_id, quantidade)
+            VALUES %s
+        ''', [(locacao_id, ids_por_modelo[item['modelo']], item['quantidade']) for item in itens],
+            page_size=len(itens))
+        logger.debug(f"{len(itens)} itens adicionados à locação ID {locacao_id}.")
+
+    @staticmethod
+    def _formatar_locacao(locacao, itens_locados):
+        """
+        Converte uma linha da listagem de locações no dicionário retornado pela API.
+
+        Parâmetros:
+            locacao (tuple): (id, data_inicio, data_fim, valor_total, valor_pago_entrega, valor_receber_final,
+                              status, nome, endereco, telefone, numero_nota).
+            itens_locados (list): Itens já formatados da locação.
+
+        Retorna:
+            dict: Detalhes da locação.
+        """
+        # Converter strings de data para objetos datetime se necessário
+        data_inicio = locacao[1]
+        data_fim = locacao[2]
+        
+        # Verificar se as datas são strings e convertê-las para o formato correto
+        if isinstance(data_inicio, str):
+            data_inicio_str = data_inicio
+        else:
+            data_inicio_str = data_inicio.strftime("%Y-%m-%d") if data_inicio else None
+            
+        if isinstance(data_fim, str):
+            data_fim_str = data_fim
+        else:
+            data_fim_str = data_fim.strftime("%Y-%m-%d") if data_fim else None
+        
+        # Tratar valores financeiros para evitar erros de conversão
+        valor_total = 0.0
+        valor_pago_entrega = 0.0
+        valor_receber_final = 0.0
+        
+        if locacao[3] is not None:
+            try:
+                valor_total = float(locacao[3])
+            except (ValueError, TypeError):
+                valor_total = 0.0
+                
+        if locacao[4] is not None:
+            try:
+                valor_pago_entrega = float(locacao[4])
+            except (ValueError, TypeError):
+                valor_pago_entrega = 0.0
+                
+        if locacao[5] is not None:
+            try:
+                valor_receber_final = float(locacao[5])
+            except (ValueError, TypeError):
+                valor_receber_final = valor_total - valor_pago_entrega
+        else:
+            valor_receber_final = valor_total - valor_pago_entrega
+        
+        resultado = {
+            "id": locacao[0],
+            "data_inicio": data_inicio_str,
+            "data_fim": data_fim_str,
+            "valor_total": valor_total,
+            "valor_pago_entrega": valor_pago_entrega,
+            "valor_receber_final": valor_receber_final,
+            "status": locacao[6] if locacao[6] is not None else "ativo",
+            "cliente": {
+                "nome": locacao[7] if locacao[7] is not None else "",
+                "endereco": locacao[8] if locacao[8] is not None else "",
+                "telefone": locacao[9] if locacao[9] is not None else ""
+            },
+            "itens": itens_locados
+        }
+        
+        # Adicionar numero_nota se existir (pode ser None em registros antigos)
+        if len(locacao) > 10 and locacao[10] is not None:
+            resultado["numero_nota"] = locacao[10]
+        return resultado
 
     @staticmethod
     def obter_todas_detalhadas():
         """
         Obtém todas as locações com detalhes completos, incluindo informações do cliente e itens locados.
+        Os itens de todas as locações são carregados em uma única consulta, de modo que a listagem
+        executa sempre duas consultas, independentemente do número de locações.
 
         Retorna:
             list: Lista de dicionários com detalhes das locações, ou uma lista vazia se não houver locações.
@@ -161,7 +267,7 @@ class Locacao:
             cursor.execute('''
                 SELECT locacoes.id, locacoes.data_inicio, locacoes.data_fim, locacoes.valor_total,
                        locacoes.valor_pago_entrega, locacoes.valor_receber_final, locacoes.status,
-                       clientes.nome, clientes.endereco, clientes.telefone
+                       clientes.nome, clientes.endereco, clientes.telefone, locacoes.numero_nota
                 FROM locacoes
                 JOIN clientes ON locacoes.cliente_id = clientes.id
             ''')
@@ -171,70 +277,11 @@ class Locacao:
                 logger.info("Nenhuma locação encontrada.")
                 return []
 
-            resultado = []
-            for locacao in locacoes:
-                locacao_id = locacao[0]
-                itens_locados = ItensLocados.obter_por_locacao(locacao_id)
-
-                # Converter strings de data para objetos datetime se necessário
-                data_inicio = locacao[1]
-                data_fim = locacao[2]
-                
-                # Verificar se as datas são strings e convertê-las para o formato correto
-                if isinstance(data_inicio, str):
-                    data_inicio_str = data_inicio
-                else:
-                    data_inicio_str = data_inicio.strftime("%Y-%m-%d") if data_inicio else None
-                    
-                if isinstance(data_fim, str):
-                    data_fim_str = data_fim
-                else:
-                    data_fim_str = data_fim.strftime("%Y-%m-%d") if data_fim else None
-                
-                # Tratar valores financeiros para evitar erros de conversão
-                valor_total = 0.0
-                valor_pago_entrega = 0.0
-                valor_receber_final = 0.0
-                
-                if locacao[3] is not None:
-                    try:
-                        valor_total = float(locacao[3])
-                    except (ValueError, TypeError):
-                        valor_total = 0.0
-                        
-                if locacao[4] is not None:
-                    try:
-                        valor_pago_entrega = float(locacao[4])
-                    except (ValueError, TypeError):
-                        valor_pago_entrega = 0.0
-                        
-                if locacao[5] is not None:
-                    try:
-                        valor_receber_final = float(locacao[5])
-                    except (ValueError, TypeError):
-                        valor_receber_final = valor_total - valor_pago_entrega
-                else:
-                    valor_receber_final = valor_total - valor_pago_entrega
-                
-                resultado.append({
-                    "id": locacao_id,
-                    "data_inicio": data_inicio_str,
-                    "data_fim": data_fim_str,
-                    "valor_total": valor_total,
-                    "valor_pago_entrega": valor_pago_entrega,
-                    "valor_receber_final": valor_receber_final,
-                    "status": locacao[6] if locacao[6] is not None else "ativo",
-                    "cliente": {
-                        "nome": locacao[7] if locacao[7] is not None else "",
-                        "endereco": locacao[8] if locacao[8] is not None else "",
-                        "telefone": locacao[9] if locacao[9] is not None else ""
-                    },
-                    "itens": itens_locados
-                })
-                
-                # Adicionar numero_nota se existir (pode ser None em registros antigos)
-                if len(locacao) > 10 and locacao[10] is not None:
-                    resultado[-1]["numero_nota"] = locacao[10]
+            itens_por_locacao = ItensLocados.obter_por_locacoes([locacao[0] for locacao in locacoes], cursor)
+            resultado = [
+                Locacao._formatar_locacao(locacao, itens_por_locacao[locacao[0]])
+                for locacao in locacoes
+            ]
 
             logger.info(f"{len(resultado)} locações processadas com sucesso.")
             return resultado
@@ -245,55 +292,192 @@ class Locacao:
             release_connection(conn)
 
     @staticmethod
-    def confirmar_devolucao(locacao_id):
+    def _codificar_cursor(ordenar, locacao):
         """
-        Confirma a devolução de uma locação, restaurando o estoque e atualizando o status.
+        Gera o cursor opaco que aponta para depois da última locação de uma página.
 
         Parâmetros:
-            locacao_id (int): ID da locação a ser confirmada.
+            ordenar (str): Coluna de ordenação ('id' ou 'data_inicio').
+            locacao (dict): Última locação da página, já formatada.
 
         Retorna:
-            dict: Resultado da operação com chave 'sucesso' e 'mensagem'.
+            str: Cursor codificado em base64 (seguro para URL).
         """
+        posicao = {"id": locacao["id"]}
+        if ordenar == 'data_inicio':
+            posicao["data_inicio"] = locacao["data_inicio"]
+        return base64.urlsafe_b64encode(json.dumps(posicao).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decodificar_cursor(ordenar, cursor_pagina):
+        """
+        Decodifica um cursor gerado por _codificar_cursor.
+
+        Levanta:
+            ValueError: Se o cursor for inválido ou não corresponder à ordenação pedida.
+        """
+        try:
+            posicao = json.loads(base64.urlsafe_b64decode(cursor_pagina.encode('ascii')))
+            locacao_id = int(posicao["id"])
+            if ordenar == 'data_inicio':
+                data_inicio = datetime.strptime(posicao["data_inicio"], '%Y-%m-%d').date()
+                return data_inicio, locacao_id
+            return (locacao_id,)
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Cursor de paginação inválido.")
+
+    @staticmethod
+    def obter_pagina(limite=None, cursor_pagina=None, ordenar='id', status=None, cliente_id=None,
+                     data_inicio=None, data_fim=None, numero_nota=None):
+        """
+        Obtém uma página de locações detalhadas usando paginação por chave (keyset),
+        com os filtros aplicados no SQL.
+
+        Parâmetros:
+            limite (int, optional): Tamanho da página (1 a LIMITE_MAXIMO). Padrão: LIMITE_PADRAO.
+            cursor_pagina (str, optional): Cursor retornado pela página anterior.
+            ordenar (str): 'id' ou 'data_inicio', sempre em ordem decrescente.
+            status (str, optional): Filtra pelo status da locação (vários separados por vírgula).
+            cliente_id (int, optional): Filtra pelas locações de um cliente.
+            data_inicio (str, optional): Locações com data_inicio >= data informada ('YYYY-MM-DD').
+            data_fim (str, optional): Locações com data_fim <= data informada ('YYYY-MM-DD').
+            numero_nota (str, optional): Filtra pelo número da nota.
+
+        Retorna:
+            dict: {"data": [...], "proximo_cursor": str ou None, "limite": int}
+
+        Levanta:
+            ValueError: Se algum parâmetro for inválido.
+        """
+        try:
+            limite = Locacao.LIMITE_PADRAO if limite is None else int(limite)
+            cliente_id = None if cliente_id is None else int(cliente_id)
+        except (ValueError, TypeError):
+            raise ValueError("Os parâmetros 'limite' e 'cliente_id' devem ser números inteiros.")
+        if not 1 <= limite <= Locacao.LIMITE_MAXIMO:
+            raise ValueError(f"O limite deve estar entre 1 e {Locacao.LIMITE_MAXIMO}.")
+        if ordenar not in Locacao.ORDENACOES:
+            raise ValueError(f"Ordenação inválida. Use uma de: {', '.join(Locacao.ORDENACOES)}.")
+
+        condicoes = []
+        params = []
+        if status:
+            # Aceita vários status separados por vírgula (ex.: 'concluido,concluído')
+            condicoes.append("locacoes.status = ANY(%s)")
+            params.append([valor.strip() for valor in status.split(',') if valor.strip()])
+        if cliente_id is not None:
+            condicoes.append("locacoes.cliente_id = %s")
+            params.append(cliente_id)
+        for valor, condicao in ((data_inicio, "locacoes.data_inicio >= %s"), (data_fim, "locacoes.data_fim <= %s")):
+            if valor:
+                try:
+                    params.append(datetime.strptime(valor, '%Y-%m-%d').date())
+                except ValueError:
+                    raise ValueError("As datas devem estar no formato 'YYYY-MM-DD'.")
+                condicoes.append(condicao)
+        if numero_nota:
+            condicoes.append("locacoes.numero_nota = %s")
+            params.append(numero_nota)
+
+        if ordenar == 'data_inicio':
+            ordem = "locacoes.data_inicio DESC, locacoes.id DESC"
+            if cursor_pagina:
+                condicoes.append("(locacoes.data_inicio, locacoes.id) < (%s, %s)")
+                params.extend(Locacao._decodificar_cursor(ordenar, cursor_pagina))
+        else:
+            ordem = "locacoes.id DESC"
+            if cursor_pagina:
+                condicoes.append("locacoes.id < %s")
+                params.extend(Locacao._decodificar_cursor(ordenar, cursor_pagina))
+
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        # Busca um registro a mais para saber se existe próxima página
+        params.append(limite + 1)
+
         conn = get_connection()
         try:
             cursor = conn.cursor()
-            # Verifica a existência e o status da locação
-            cursor.execute('''
-                SELECT status
+            cursor.execute(f'''
+                SELECT locacoes.id, locacoes.data_inicio, locacoes.data_fim, locacoes.valor_total,
+                       locacoes.valor_pago_entrega, locacoes.valor_receber_final, locacoes.status,
+                       clientes.nome, clientes.endereco, clientes.telefone, locacoes.numero_nota
                 FROM locacoes
-                WHERE id = %s
-            ''', (locacao_id,))
-            locacao = cursor.fetchone()
-
-            if not locacao:
-                logger.warning(f"Locação ID {locacao_id} não encontrada.")
-                return {"sucesso": False, "mensagem": "Locação não encontrada"}
+                JOIN clientes ON locacoes.cliente_id = clientes.id
+                {where}
+                ORDER BY {ordem}
+                LIMIT %s
+            ''', params)
+            locacoes = cursor.fetchall()
 
-            status_atual = locacao[0]
+            tem_proxima = len(locacoes) > limite
+            locacoes = locacoes[:limite]
+            itens_por_locacao = ItensLocados.obter_por_locacoes([locacao[0] for locacao in locacoes], cursor)
+            pagina = [
+                Locacao._formatar_locacao(locacao, itens_por_locacao[locacao[0]])
+                for locacao in locacoes
+            ]
 
-            if status_atual == "concluido":
-                logger.info(f"Locação ID {locacao_id} já concluída.")
-                return {"sucesso": False, "mensagem": "Locação já concluída"}
+            logger.info(f"Página com {len(pagina)} locações obtida.")
+            return {
+                "data": pagina,
+                "proximo_cursor": Locacao._codificar_cursor(ordenar, pagina[-1]) if tem_proxima else None,
+                "limite": limite
+            }
+        except psycopg2.Error as e:
+            logger.error(f"Erro ao buscar página de locações: {e}")
+            return {"data": [], "proximo_cursor": None, "limite": limite}
+        finally:
+            release_connection(conn)
 
-            if status_atual != "ativo":
-                logger.warning(f"Locação ID {locacao_id} não está ativa e não pode ser devolvida.")
-                return {"sucesso": False, "mensagem": "Somente locações ativas podem ser devolvidas."}
+    @staticmethod
+    def confirmar_devolucao(locacao_id):
+        """
+        Confirma a devolução de uma locação, restaurando o estoque e atualizando o status.
 
-            # Atualiza o status para "concluido" e registra a data de devolução efetiva
-            data_devolucao = datetime.now()
-            cursor.execute('''
-                UPDATE locacoes
-                SET status = 'concluido', data_devolucao_efetiva = %s
-                WHERE id = %s
-            ''', (data_devolucao, locacao_id))
-            conn.commit()
-            logger.debug(f"Status da locação ID {locacao_id} atualizado para 'concluido'.")
+        Parâmetros:
+            locacao_id (int): ID da locação a ser confirmada.
 
-            # Restaura o estoque dos itens locados
-            sucesso_estoque = Locacao.atualizar_estoque_devolucao(locacao_id)
-            if not sucesso_estoque:
-                raise ValueError("Erro ao restaurar estoque durante a confirmação de devolução.")
+        Retorna:
+            dict: Resultado da operação com chave 'sucesso' e 'mensagem'.
+        """
+        try:
+            with transaction() as cursor:
+                # Verifica a existência e o status da locação (bloqueando a linha até o fim da transação)
+                cursor.execute('''
+                    SELECT status
+                    FROM locacoes
+                    WHERE id = %s
+                    FOR UPDATE
+                ''', (locacao_id,))
+                locacao = cursor.fetchone()
+
+                if not locacao:
+                    logger.warning(f"Locação ID {locacao_id} não encontrada.")
+                    return {"sucesso": False, "mensagem": "Locação não encontrada"}
+
+                status_atual = locacao[0]
+
+                if status_atual == "concluido":
+                    logger.info(f"Locação ID {locacao_id} já concluída.")
+                    return {"sucesso": False, "mensagem": "Locação já concluída"}
+
+                if status_atual != "ativo":
+                    logger.warning(f"Locação ID {locacao_id} não está ativa e não pode ser devolvida.")
+                    return {"sucesso": False, "mensagem": "Somente locações ativas podem ser devolvidas."}
+
+                # Atualiza o status para "concluido" e registra a data de devolução efetiva
+                data_devolucao = datetime.now()
+                cursor.execute('''
+                    UPDATE locacoes
+                    SET status = 'concluido', data_devolucao_efetiva = %s
+                    WHERE id = %s
+                ''', (data_devolucao, locacao_id))
+                logger.debug(f"Status da locação ID {locacao_id} atualizado para 'concluido'.")
+
+                # Restaura o estoque dos itens locados na mesma transação
+                sucesso_estoque = Locacao.atualizar_estoque_devolucao(locacao_id)
+                if not sucesso_estoque:
+                    raise ValueError("Erro ao restaurar estoque durante a confirmação de devolução.")
 
             logger.info(f"Devolução confirmada para locação ID {locacao_id}.")
             return {
@@ -304,8 +488,6 @@ class Locacao:
         except (psycopg2.Error, ValueError) as e:
             logger.error(f"Erro ao confirmar devolução para locação ID {locacao_id}: {e}")
             return {"sucesso": False, "mensagem": "Erro ao confirmar devolução."}
-        finally:
-            release_connection(conn)
 
     @staticmethod
     def atualizar_estoque_devolucao(locacao_id):
@@ -316,37 +498,31 @@ class Locacao:
             locacao_id (int): ID da locação cujos itens devem ter o estoque restaurado.
 
         Retorna:
-            bool: True se o estoque foi restaurado com sucesso, False caso contrário.
+            bool: True se o estoque foi restaurado (ou se a locação não tem itens), False em
+            caso de erro.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            # Obtém os itens locados associados à locação
-            itens_locados = ItensLocados.obter_por_locacao(locacao_id)
-            if not itens_locados:
-                logger.warning(f"Nenhum item encontrado para locação ID {locacao_id}.")
-                return False
-
-            for item in itens_locados:
-                item_id = item.get('item_id')
-                quantidade = item.get('quantidade')
-
-                if not item_id or not quantidade:
-                    logger.warning(f"Dados incompletos para item: {item}")
-                    continue
-
-                # Atualiza o estoque (aumenta a quantidade disponível)
-                atualizar_estoque(item_id, quantidade, cursor)
-
-                logger.debug(f"Estoque restaurado para item ID {item_id} na locação ID {locacao_id}.")
+            with transaction() as cursor:
+                # Obtém os itens locados pela própria transação: um erro na consulta levanta
+                # exceção, e uma lista vazia significa só que a locação não tem itens
+                cursor.execute('''
+                    SELECT item_id, quantidade FROM itens_locados WHERE locacao_id = %s
+                ''', (locacao_id,))
+                devolucoes = [(item_id, quantidade) for item_id, quantidade in cursor.fetchall()
+                              if item_id and quantidade]
+                if not devolucoes:
+                    # Locação sem itens (todos removidos): não há estoque a restaurar
+                    logger.info(f"Nenhum item a devolver ao estoque para locação ID {locacao_id}.")
+                    return True
+
+                # Atualiza o estoque (aumenta a quantidade disponível) em uma única instrução
+                ReservaEstoque.liberar(cursor, devolucoes)
 
             logger.info(f"Estoque restaurado para todos os itens da locação ID {locacao_id}.")
             return True
         except (psycopg2.Error, ValueError) as e:
             logger.error(f"Erro ao restaurar estoque para locação ID {locacao_id}: {e}")
             return False
-        finally:
-            release_connection(conn)
 
     @staticmethod
     def atualizar_status(locacao_id, novo_status):
@@ -383,6 +559,29 @@ class Locacao:
         finally:
             release_connection(conn)
             
+    @staticmethod
+    def obter_resumo():
+        """
+        Conta as locações ativas e, entre elas, as atrasadas (data_fim anterior à data atual),
+        sem carregar as locações nem seus itens.
+
+        Retorna:
+            dict: {"ativas": int, "atrasadas": int}
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            # Usa o índice (status, data_fim); o custo fica limitado às locações ativas
+            cursor.execute('''
+                SELECT COUNT(*), COUNT(*) FILTER (WHERE data_fim < %s)
+                FROM locacoes
+                WHERE status = 'ativo'
+            ''', (date.today(),))
+            ativas, atrasadas = cursor.fetchone()
+            return {"ativas": ativas, "atrasadas": atrasadas}
+        finally:
+            release_connection(conn)
+
     @staticmethod
     def obter_locacoes_atrasadas():
         """
@@ -412,10 +611,11 @@ class Locacao:
                 logger.info("Nenhuma locação atrasada encontrada.")
                 return []
             
+            itens_por_locacao = ItensLocados.obter_por_locacoes([locacao[0] for locacao in locacoes], cursor)
             resultado = []
             for locacao in locacoes:
                 locacao_id = locacao[0]
-                itens_locados = ItensLocados.obter_por_locacao(locacao_id)
+                itens_locados = itens_por_locacao[locacao_id]
                 
                 # Calcular dias de atraso
                 data_fim = datetime.strptime(locacao[2], '%Y-%m-%d').date() if isinstance(locacao[2], str) else locacao[2]
@@ -459,34 +659,30 @@ class Locacao:
         Retorna:
             dict: Dados da locação ou None se não encontrada.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT l.*, c.nome as nome_cliente, c.endereco as endereco_cliente, 
-                       c.telefone as telefone_cliente
-                FROM locacoes l
-                LEFT JOIN clientes c ON l.cliente_id = c.id
-                WHERE l.id = %s
-            ''', (locacao_id,))
-            
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            columns = [description[0] for description in cursor.description]
-            locacao = dict(zip(columns, row))
-            
-            # Buscar itens locados
-            itens = ItensLocados.obter_por_locacao(locacao_id)
-            locacao['itens'] = itens
-            
+            with transaction() as cursor:
+                cursor.execute('''
+                    SELECT l.*, c.nome as nome_cliente, c.endereco as endereco_cliente, 
+                           c.telefone as telefone_cliente
+                    FROM locacoes l
+                    LEFT JOIN clientes c ON l.cliente_id = c.id
+                    WHERE l.id = %s
+                ''', (locacao_id,))
+
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                columns = [description[0] for description in cursor.description]
+                locacao = dict(zip(columns, row))
+
+                # Buscar itens locados (mesma conexão)
+                locacao['itens'] = ItensLocados.obter_por_locacao(locacao_id)
+
             return locacao
         except psycopg2.Error as e:
             logger.error(f"Erro ao buscar locação ID {locacao_id}: {e}")
             return None
-        finally:
-            release_connection(conn)
     
     @staticmethod
     def prorrogar_locacao(locacao_id, nova_data_fim, valor_adicional=0):
@@ -557,45 +753,40 @@ class Locacao:
         Retorna:
             bool: True se finalizada com sucesso, False caso contrário.
         """
-        conn = get_connection()
         try:
-            cursor = conn.cursor()
-            
-            # Verificar se a locação existe
-            cursor.execute('SELECT id, status FROM locacoes WHERE id = %s', (locacao_id,))
-            locacao = cursor.fetchone()
-            if not locacao:
-                logger.warning(f"Locação ID {locacao_id} não encontrada.")
-                return False
-            
-            if locacao[1] == 'concluido':
-                logger.warning(f"Locação ID {locacao_id} já está concluída.")
-                return False
-            
-            # Usar data atual se não fornecida
-            if not data_finalizacao:
-                data_finalizacao = datetime.now().strftime('%Y-%m-%d')
-            
-            # Atualizar status para concluído
-            cursor.execute('''
-                UPDATE locacoes 
-                SET status = 'concluido', data_fim = %s
-                WHERE id = %s
-            ''', (data_finalizacao, locacao_id))
-            
-            # Restaurar estoque
-            Locacao.atualizar_estoque_devolucao(locacao_id)
-            
-            conn.commit()
+            with transaction() as cursor:
+                # Verificar se a locação existe
+                cursor.execute('SELECT id, status FROM locacoes WHERE id = %s FOR UPDATE', (locacao_id,))
+                locacao = cursor.fetchone()
+                if not locacao:
+                    logger.warning(f"Locação ID {locacao_id} não encontrada.")
+                    return False
+
+                if locacao[1] == 'concluido':
+                    logger.warning(f"Locação ID {locacao_id} já está concluída.")
+                    return False
+
+                # Usar data atual se não fornecida
+                if not data_finalizacao:
+                    data_finalizacao = datetime.now().strftime('%Y-%m-%d')
+
+                # Atualizar status para concluído
+                cursor.execute('''
+                    UPDATE locacoes 
+                    SET status = 'concluido', data_fim = %s
+                    WHERE id = %s
+                ''', (data_finalizacao, locacao_id))
+
+                # Restaurar estoque na mesma transação
+                if not Locacao.atualizar_estoque_devolucao(locacao_id):
+                    raise ValueError("Erro ao restaurar estoque durante a finalização antecipada.")
+
             logger.info(f"Locação ID {locacao_id} finalizada antecipadamente. Motivo: {motivo}")
             return True
-            
-        except psycopg2.Error as e:
+
+        except (psycopg2.Error, ValueError) as e:
             logger.error(f"Erro ao finalizar locação ID {locacao_id} antecipadamente: {e}")
-            conn.rollback()
             return False
-        finally:
-            release_connection(conn)
     
     @staticmethod
     def delete_locacao(locacao_id):
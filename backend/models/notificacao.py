@@ -1,5 +1,5 @@
 import psycopg2
-from database import get_connection, release_connection
+from database import get_connection, release_connection, transaction
 import logging
 from datetime import datetime
 
@@ -140,7 +140,7 @@ class Notificacao:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE notificacoes
-                SET lida = 1
+                SET lida = TRUE
                 WHERE id = %s
             """, (notificacao_id,))
             conn.commit()
@@ -216,81 +216,57 @@ class Notificacao:
     @staticmethod
     def gerar_notificacoes_automaticas():
         """
-        Gera notificações automáticas com base em condições do sistema.
-        Por exemplo, estoque crítico, devoluções atrasadas, etc.
+        Gera notificações automáticas com base em condições do sistema:
+        estoque crítico (menos de 10% disponível) e devoluções atrasadas.
+
+        Cada tipo é gerado por um único INSERT ... SELECT, que ignora os casos que já têm
+        notificação não lida. O índice único parcial uq_notificacoes_automaticas_nao_lidas
+        impede duplicatas quando duas execuções concorrem.
 
         Retorna:
             int: Número de notificações geradas.
+
+        Levanta:
+            psycopg2.Error: Em erro no banco; o agendador contabiliza a rodada como falha.
         """
-        conn = get_connection()
-        try:
-            notificacoes_geradas = 0
-            cursor = conn.cursor()
-            data_atual = datetime.now().strftime("%Y-%m-%d")
-            
-            # Verificar itens com estoque crítico (menos de 10%)
+        with transaction() as cursor:
             cursor.execute("""
-                SELECT id, nome_item, quantidade, quantidade_disponivel
-                FROM inventario
-                WHERE quantidade > 0 AND (quantidade_disponivel * 100 / quantidade) < 10
+                INSERT INTO notificacoes (tipo, titulo, mensagem, data_criacao, lida, relacionado_id)
+                SELECT 'estoque_critico',
+                       'Estoque Crítico: ' || i.nome_item,
+                       'O item ' || i.nome_item || ' está com estoque crítico. Apenas '
+                           || ROUND(i.quantidade_disponivel * 100.0 / i.quantidade, 1) || '% disponível ('
+                           || i.quantidade_disponivel || ' de ' || i.quantidade || ' unidades).',
+                       NOW(), FALSE, i.id
+                FROM inventario i
+                WHERE i.quantidade > 0 AND (i.quantidade_disponivel * 100 / i.quantidade) < 10
+                  AND NOT EXISTS (
+                      SELECT 1 FROM notificacoes n
+                      WHERE n.tipo = 'estoque_critico' AND n.relacionado_id = i.id AND n.lida = FALSE
+                  )
+                ON CONFLICT DO NOTHING
             """)
-            itens_criticos = cursor.fetchall()
-            
-            for item in itens_criticos:
-                item_id, nome_item, quantidade, disponivel = item
-                percentual = (disponivel * 100) / quantidade
-                
-                # Verificar se já existe notificação para este item
-                cursor.execute("""
-                    SELECT id FROM notificacoes 
-                    WHERE tipo = 'estoque_critico' AND relacionado_id = %s AND lida = 0
-                """, (item_id,))
-                
-                if not cursor.fetchone():
-                    titulo = f"Estoque Crítico: {nome_item}"
-                    mensagem = f"O item {nome_item} está com estoque crítico. Apenas {percentual:.1f}% disponível ({disponivel} de {quantidade} unidades)."
-                    
-                    cursor.execute("""
-                        INSERT INTO notificacoes (tipo, titulo, mensagem, data_criacao, lida, relacionado_id)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, ('estoque_critico', titulo, mensagem, data_atual, False, item_id))
-                    notificacoes_geradas += 1
-            
-            # Verificar devoluções atrasadas
+            estoque_critico = cursor.rowcount
+
             cursor.execute("""
-                SELECT l.id, c.nome, l.data_fim
+                INSERT INTO notificacoes (tipo, titulo, mensagem, data_criacao, lida, relacionado_id)
+                SELECT 'devolucao_atrasada',
+                       'Devolução Atrasada: ' || c.nome,
+                       'A devolução do cliente ' || c.nome || ' está atrasada. Data prevista: '
+                           || TO_CHAR(l.data_fim, 'YYYY-MM-DD') || '.',
+                       NOW(), FALSE, l.id
                 FROM locacoes l
                 JOIN clientes c ON l.cliente_id = c.id
-                WHERE l.data_fim < %s AND l.status != 'concluido'
-            """, (data_atual,))
-            
-            devolucoes_atrasadas = cursor.fetchall()
-            
-            for devolucao in devolucoes_atrasadas:
-                locacao_id, cliente_nome, data_fim = devolucao
-                
-                # Verificar se já existe notificação para esta devolução
-                cursor.execute("""
-                    SELECT id FROM notificacoes 
-                    WHERE tipo = 'devolucao_atrasada' AND relacionado_id = %s AND lida = 0
-                """, (locacao_id,))
-                
-                if not cursor.fetchone():
-                    titulo = f"Devolução Atrasada: {cliente_nome}"
-                    mensagem = f"A devolução do cliente {cliente_nome} está atrasada. Data prevista: {data_fim}."
-                    
-                    cursor.execute("""
-                        INSERT INTO notificacoes (tipo, titulo, mensagem, data_criacao, lida, relacionado_id)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, ('devolucao_atrasada', titulo, mensagem, data_atual, False, locacao_id))
-                    notificacoes_geradas += 1
-            
-            conn.commit()
-            logger.info(f"Geradas {notificacoes_geradas} notificações automáticas.")
-            return notificacoes_geradas
-            
-        except Exception as e:
-            logger.error(f"Erro ao gerar notificações automáticas: {e}")
-            return 0
-        finally:
-            release_connection(conn)
+                WHERE l.data_fim < CURRENT_DATE AND l.status != 'concluido'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM notificacoes n
+                      WHERE n.tipo = 'devolucao_atrasada' AND n.relacionado_id = l.id AND n.lida = FALSE
+                  )
+                ON CONFLICT DO NOTHING
+            """)
+            devolucoes_atrasadas = cursor.rowcount
+
+        notificacoes_geradas = estoque_critico + devolucoes_atrasadas
+        logger.info(f"Geradas {notificacoes_geradas} notificações automáticas "
+                    f"({estoque_critico} de estoque crítico, {devolucoes_atrasadas} de devolução atrasada).")
+        return notificacoes_geradas
@@ -1,8 +1,6 @@
-from database import get_connection, release_connection
+from database import transaction
 from datetime import datetime
 import logging
-from io import BytesIO
-import pandas as pd
 import psycopg2
 
 # Configuração de logging
@@ -68,6 +66,33 @@ class Relatorios:
             params.append(data_fim)
         return query, params
 
+    @staticmethod
+    def _filtros_resumo(data_inicio=None, data_fim=None):
+        """
+        Monta a cláusula WHERE dos filtros de data aplicada às tabelas de resumo
+        (relatorio_locacoes_diario, relatorio_clientes_diario e relatorio_itens_diario).
+
+        Retorna:
+            tuple: (cláusula WHERE, lista de parâmetros).
+
+        Levanta:
+            ValueError: Se alguma data estiver em formato inválido.
+        """
+        condicoes = []
+        params = []
+        if data_inicio:
+            if not Relatorios.validar_data(data_inicio):
+                raise ValueError("Formato de data inválido para data_inicio")
+            condicoes.append("data_inicio >= %s")
+            params.append(data_inicio)
+        if data_fim:
+            if not Relatorios.validar_data(data_fim):
+                raise ValueError("Formato de data inválido para data_fim")
+            condicoes.append("data_fim <= %s")
+            params.append(data_fim)
+        where_clause = " WHERE " + " AND ".join(condicoes) if condicoes else ""
+        return where_clause, params
+
     @staticmethod
     def obter_dados_resumo():
         """
@@ -77,38 +102,18 @@ class Relatorios:
         Retorna:
             dict: Dicionário contendo os dados de resumo ou uma resposta de erro em caso de falha.
         """
-        try:
-            with get_connection() as conn:
-                with conn.cursor() as cursor:
-                    logger.info("Executando consulta para obter dados de visão geral.")
-                    cursor.execute("""
-                        SELECT COUNT(*) AS total_locacoes,
-                               COALESCE(SUM(valor_total), 0) AS receita_total,
-                               COUNT(DISTINCT cliente_id) AS clientes_unicos,
-                               COUNT(DISTINCT item_id) AS itens_unicos_alugados,
-                               SUM(CASE WHEN status = 'concluido' THEN 1 ELSE 0 END) AS locacoes_concluidas,
-                               SUM(CASE WHEN status != 'concluido' THEN 1 ELSE 0 END) AS locacoes_pendentes
-                        FROM locacoes
-                    """)
-                    dados = cursor.fetchone()
-                    resumo = {
-                        "total_locacoes": dados[0] or 0,
-                        "receita_total": float(dados[1]) or 0.0,
-                        "clientes_unicos": dados[2] or 0,
-                        "itens_unicos_alugados": dados[3] or 0,
-                        "locacoes_concluidas": dados[4] or 0,
-                        "locacoes_pendentes": dados[5] or 0
-                    }
-                    logger.info("Dados de visão geral obtidos com sucesso.")
-                    return resumo
-        except psycopg2.Error as e:
-            return Relatorios.gerar_resposta_erro(f"Erro ao obter dados de visão geral: {e}")
+        return Relatorios.obter_dados_resumo_com_filtros()
     
     @staticmethod
     def obter_dados_resumo_com_filtros(data_inicio=None, data_fim=None):
         """
         Obtém uma visão geral com filtros de data, incluindo total de locações, receita total,
-        clientes únicos, itens únicos alugados, locações concluídas e pendentes dentro do intervalo de datas.
+        clientes únicos, itens únicos alugados, locações concluídas e pendentes dentro do intervalo de datas,
+        além da quantidade locada por tipo de item.
+
+        Lê apenas as tabelas de resumo mantidas por triggers (migrações 0005 e 0009): as de
+        locações e itens têm uma linha por combinação de datas (e status ou item), e a de
+        clientes uma linha por cliente por dia de início, com a menor data_fim do dia.
         
         Parâmetros:
             data_inicio (str, optional): Data de início no formato 'YYYY-MM-DD'. Padrão é None.
@@ -118,100 +123,50 @@ class Relatorios:
             dict: Dicionário contendo os dados de resumo filtrados ou uma resposta de erro em caso de falha.
         """
         try:
-            conn = get_connection()
-            if conn is None:
-                return Relatorios.gerar_resposta_erro("Não foi possível conectar ao banco de dados")
-                
-            cursor = conn.cursor()
-            
-            # Validar datas
-            if data_inicio and not Relatorios.validar_data(data_inicio):
-                cursor.close()
-                return Relatorios.gerar_resposta_erro(f"Formato de data inválido para data_inicio")
-            if data_fim and not Relatorios.validar_data(data_fim):
-                cursor.close()
-                return Relatorios.gerar_resposta_erro(f"Formato de data inválido para data_fim")
-            
-            # Construir filtros de data
-            date_conditions = []
-            params = []
-            
-            if data_inicio:
-                date_conditions.append("data_inicio >= %s")
-                params.append(data_inicio)
-            if data_fim:
-                date_conditions.append("data_fim <= %s")
-                params.append(data_fim)
-            
-            where_clause = ""
-            if date_conditions:
-                where_clause = " AND " + " AND ".join(date_conditions)
-            
-            # Primeira consulta: dados básicos das locações
-            query_locacoes = f"""
-                SELECT COUNT(*) AS total_locacoes,
-                       COALESCE(SUM(valor_total), 0) AS receita_total,
-                       COUNT(DISTINCT cliente_id) AS clientes_unicos,
-                       SUM(CASE WHEN status = 'concluido' THEN 1 ELSE 0 END) AS locacoes_concluidas,
-                       SUM(CASE WHEN status != 'concluido' THEN 1 ELSE 0 END) AS locacoes_pendentes
-                FROM locacoes
-                WHERE 1=1{where_clause}
-            """
-            
-            logger.info("Executando consulta para obter dados básicos de locações.")
-            cursor.execute(query_locacoes, params)
-            dados_locacoes = cursor.fetchone()
-            
-            # Segunda consulta: itens únicos alugados
-            query_itens = f"""
-                SELECT COUNT(DISTINCT il.item_id) AS itens_unicos_alugados
-                FROM itens_locados il 
-                JOIN locacoes l ON il.locacao_id = l.id
-                WHERE 1=1{where_clause}
-            """
-            
-            logger.info("Executando consulta para obter itens únicos alugados.")
-            cursor.execute(query_itens, params)
-            dados_itens = cursor.fetchone()
-            
-            # Construir resultado
-            if not dados_locacoes:
-                resumo = {
-                    "total_locacoes": 0,
-                    "receita_total": 0.0,
-                    "clientes_unicos": 0,
-                    "itens_unicos_alugados": 0,
-                    "locacoes_concluidas": 0,
-                    "locacoes_pendentes": 0
-                }
-            else:
-                resumo = {
-                    "total_locacoes": dados_locacoes[0] or 0,
-                    "receita_total": float(dados_locacoes[1]) if dados_locacoes[1] else 0.0,
-                    "clientes_unicos": dados_locacoes[2] or 0,
-                    "itens_unicos_alugados": dados_itens[0] if dados_itens else 0,
-                    "locacoes_concluidas": dados_locacoes[3] or 0,
-                    "locacoes_pendentes": dados_locacoes[4] or 0
-                }
-            
-            cursor.close()
-            release_connection(conn)
+            where_clause, params = Relatorios._filtros_resumo(data_inicio, data_fim)
+        except ValueError as ve:
+            return Relatorios.gerar_resposta_erro(str(ve))
+
+        try:
+            with transaction() as cursor:
+                logger.info("Executando consulta para obter dados de visão geral a partir dos resumos.")
+                cursor.execute(f"""
+                    SELECT COALESCE(SUM(total_locacoes), 0),
+                           COALESCE(SUM(receita_total), 0),
+                           COALESCE(SUM(total_locacoes) FILTER (WHERE status = 'concluido'), 0),
+                           COALESCE(SUM(total_locacoes) FILTER (WHERE status NOT IN ('concluido', '')), 0)
+                    FROM relatorio_locacoes_diario{where_clause}
+                """, params)
+                dados_locacoes = cursor.fetchone()
+
+                cursor.execute(f"""
+                    SELECT COUNT(DISTINCT cliente_id)
+                    FROM relatorio_clientes_diario{where_clause}
+                """, params)
+                clientes_unicos = cursor.fetchone()[0]
+
+                cursor.execute(f"""
+                    SELECT i.tipo_item, COUNT(DISTINCT r.item_id), SUM(r.quantidade)
+                    FROM (SELECT item_id, quantidade FROM relatorio_itens_diario{where_clause}) r
+                    JOIN inventario i ON i.id = r.item_id
+                    GROUP BY i.tipo_item
+                """, params)
+                itens_por_tipo = cursor.fetchall()
+
+            resumo = {
+                "total_locacoes": dados_locacoes[0],
+                "receita_total": float(dados_locacoes[1]),
+                "clientes_unicos": clientes_unicos,
+                "itens_unicos_alugados": sum(tipo[1] for tipo in itens_por_tipo),
+                "locacoes_concluidas": dados_locacoes[2],
+                "locacoes_pendentes": dados_locacoes[3],
+                "itens_por_tipo": {tipo[0]: int(tipo[2]) for tipo in itens_por_tipo}
+            }
             logger.info("Dados de visão geral com filtros obtidos com sucesso.")
             return resumo
-            
         except psycopg2.Error as e:
-            logger.error(f"Erro SQLite ao obter dados de visão geral: {e}")
-            if 'cursor' in locals() and cursor:
-                cursor.close()
-            if 'conn' in locals() and conn:
-                release_connection(conn)
             return Relatorios.gerar_resposta_erro(f"Erro ao obter dados de visão geral com filtros: {e}")
         except Exception as e:
-            logger.error(f"Erro geral ao obter dados de visão geral: {e}")
-            if 'cursor' in locals() and cursor:
-                cursor.close()
-            if 'conn' in locals() and conn:
-                release_connection(conn)
             return Relatorios.gerar_resposta_erro(f"Erro inesperado ao obter dados de visão geral: {e}")
     
     @staticmethod
@@ -228,39 +183,38 @@ class Relatorios:
             list: Lista de dicionários com detalhes das locações do cliente ou uma resposta de erro em caso de falha.
         """
         try:
-            with get_connection() as conn:
-                with conn.cursor() as cursor:
-                    params = [cliente_id]
-                    query = """
-                        SELECT l.id, l.data_inicio, l.data_fim, COALESCE(l.valor_total, 0) AS valor_total, l.status,
-                               i.nome_item, i.tipo_item, COALESCE(il.quantidade, 0) AS quantidade_locada
-                        FROM locacoes AS l
-                        JOIN itens_locados AS il ON l.id = il.locacao_id
-                        JOIN inventario AS i ON il.item_id = i.id
-                        WHERE l.cliente_id = %s
-                    """
-                    resultado = Relatorios.aplicar_filtros_de_data(query, params, data_inicio, data_fim, prefixo="l.")
-                    if isinstance(resultado, dict):
-                        return resultado
-                    query, params = resultado
-                    logger.info(f"Executando consulta para obter relatório do cliente ID {cliente_id}.")
-                    cursor.execute(query, params)
-                    locacoes = cursor.fetchall()
-                    relatorio = [
-                        {
-                            "locacao_id": locacao[0],
-                            "data_inicio": locacao[1].strftime("%Y-%m-%d") if locacao[1] else None,
-                            "data_fim": locacao[2].strftime("%Y-%m-%d") if locacao[2] else None,
-                            "valor_total": float(locacao[3]),
-                            "status": locacao[4],
-                            "nome_item": locacao[5],
-                            "tipo_item": locacao[6],
-                            "quantidade_locada": locacao[7]
-                        }
-                        for locacao in locacoes
-                    ]
-                    logger.info(f"Relatório do cliente ID {cliente_id} obtido com sucesso. Total de locações: {len(relatorio)}.")
-                    return relatorio
+            with transaction() as cursor:
+                params = [cliente_id]
+                query = """
+                    SELECT l.id, l.data_inicio, l.data_fim, COALESCE(l.valor_total, 0) AS valor_total, l.status,
+                           i.nome_item, i.tipo_item, COALESCE(il.quantidade, 0) AS quantidade_locada
+                    FROM locacoes AS l
+                    JOIN itens_locados AS il ON l.id = il.locacao_id
+                    JOIN inventario AS i ON il.item_id = i.id
+                    WHERE l.cliente_id = %s
+                """
+                resultado = Relatorios.aplicar_filtros_de_data(query, params, data_inicio, data_fim, prefixo="l.")
+                if isinstance(resultado, dict):
+                    return resultado
+                query, params = resultado
+                logger.info(f"Executando consulta para obter relatório do cliente ID {cliente_id}.")
+                cursor.execute(query, params)
+                locacoes = cursor.fetchall()
+                relatorio = [
+                    {
+                        "locacao_id": locacao[0],
+                        "data_inicio": locacao[1].strftime("%Y-%m-%d") if locacao[1] else None,
+                        "data_fim": locacao[2].strftime("%Y-%m-%d") if locacao[2] else None,
+                        "valor_total": float(locacao[3]),
+                        "status": locacao[4],
+                        "nome_item": locacao[5],
+                        "tipo_item": locacao[6],
+                        "quantidade_locada": locacao[7]
+                    }
+                    for locacao in locacoes
+                ]
+                logger.info(f"Relatório do cliente ID {cliente_id} obtido com sucesso. Total de locações: {len(relatorio)}.")
+                return relatorio
         except psycopg2.Error as e:
             return Relatorios.gerar_resposta_erro(f"Erro ao obter relatório do cliente {cliente_id}: {e}")
     
@@ -278,38 +232,37 @@ class Relatorios:
             list: Lista de dicionários com detalhes das locações onde o item foi alugado ou uma resposta de erro em caso de falha.
         """
         try:
-            with get_connection() as conn:
-                with conn.cursor() as cursor:
-                    params = [item_id]
-                    query = """
-                        SELECT l.id, l.data_inicio, l.data_fim, l.status,
-                               i.nome_item, i.tipo_item, COALESCE(il.quantidade, 0) AS quantidade_locada
-                        FROM locacoes AS l
-                        JOIN itens_locados AS il ON l.id = il.locacao_id
-                        JOIN inventario AS i ON il.item_id = i.id
-                        WHERE i.id = %s
-                    """
-                    resultado = Relatorios.aplicar_filtros_de_data(query, params, data_inicio, data_fim, prefixo="l.")
-                    if isinstance(resultado, dict):
-                        return resultado
-                    query, params = resultado
-                    logger.info(f"Executando consulta para obter uso do inventário para item ID {item_id}.")
-                    cursor.execute(query, params)
-                    dados = cursor.fetchall()
-                    uso_inventario = [
-                        {
-                            "locacao_id": dado[0],
-                            "data_inicio": dado[1].strftime("%Y-%m-%d") if dado[1] else None,
-                            "data_fim": dado[2].strftime("%Y-%m-%d") if dado[2] else None,
-                            "status": dado[3],
-                            "nome_item": dado[4],
-                            "tipo_item": dado[5],
-                            "quantidade_locada": dado[6]
-                        }
-                        for dado in dados
-                    ]
-                    logger.info(f"Uso do inventário para item ID {item_id} obtido com sucesso. Total de locações: {len(uso_inventario)}.")
-                    return uso_inventario
+            with transaction() as cursor:
+                params = [item_id]
+                query = """
+                    SELECT l.id, l.data_inicio, l.data_fim, l.status,
+                           i.nome_item, i.tipo_item, COALESCE(il.quantidade, 0) AS quantidade_locada
+                    FROM locacoes AS l
+                    JOIN itens_locados AS il ON l.id = il.locacao_id
+                    JOIN inventario AS i ON il.item_id = i.id
+                    WHERE i.id = %s
+                """
+                resultado = Relatorios.aplicar_filtros_de_data(query, params, data_inicio, data_fim, prefixo="l.")
+                if isinstance(resultado, dict):
+                    return resultado
+                query, params = resultado
+                logger.info(f"Executando consulta para obter uso do inventário para item ID {item_id}.")
+                cursor.execute(query, params)
+                dados = cursor.fetchall()
+                uso_inventario = [
+                    {
+                        "locacao_id": dado[0],
+                        "data_inicio": dado[1].strftime("%Y-%m-%d") if dado[1] else None,
+                        "data_fim": dado[2].strftime("%Y-%m-%d") if dado[2] else None,
+                        "status": dado[3],
+                        "nome_item": dado[4],
+                        "tipo_item": dado[5],
+                        "quantidade_locada": dado[6]
+                    }
+                    for dado in dados
+                ]
+                logger.info(f"Uso do inventário para item ID {item_id} obtido com sucesso. Total de locações: {len(uso_inventario)}.")
+                return uso_inventario
         except psycopg2.Error as e:
             return Relatorios.gerar_resposta_erro(f"Erro ao obter uso do inventário para o item {item_id}: {e}")
     
@@ -317,6 +270,7 @@ class Relatorios:
     def obter_relatorio_status(data_inicio=None, data_fim=None):
         """
         Obtém o relatório de status das locações, incluindo total de locações e receita total por status.
+        Lê a tabela de resumo relatorio_locacoes_diario.
         
         Parâmetros:
             data_inicio (str, optional): Data de início no formato 'YYYY-MM-DD'. Padrão é None.
@@ -326,32 +280,29 @@ class Relatorios:
             list: Lista de dicionários com detalhes do relatório de status ou uma resposta de erro em caso de falha.
         """
         try:
-            with get_connection() as conn:
-                with conn.cursor() as cursor:
-                    params = []
-                    query = """
-                        SELECT status, COUNT(*) AS total_locacoes, COALESCE(SUM(valor_total), 0) AS receita_total
-                        FROM locacoes 
-                        WHERE 1=1
-                    """
-                    resultado = Relatorios.aplicar_filtros_de_data(query, params, data_inicio, data_fim)
-                    if isinstance(resultado, dict):
-                        return resultado
-                    query, params = resultado
-                    query += " GROUP BY status"
-                    logger.info("Executando consulta para obter relatório de status das locações.")
-                    cursor.execute(query, params)
-                    dados = cursor.fetchall()
-                    relatorio_status = [
-                        {
-                            "status": dado[0],
-                            "total_locacoes": dado[1],
-                            "receita_total": float(dado[2])
-                        }
-                        for dado in dados
-                    ]
-                    logger.info(f"Relatório de status obtido com sucesso. Total de status diferentes: {len(relatorio_status)}.")
-                    return relatorio_status
+            where_clause, params = Relatorios._filtros_resumo(data_inicio, data_fim)
+        except ValueError as ve:
+            return Relatorios.gerar_resposta_erro(str(ve))
+
+        try:
+            with transaction() as cursor:
+                logger.info("Executando consulta para obter relatório de status das locações.")
+                cursor.execute(f"""
+                    SELECT NULLIF(status, ''), SUM(total_locacoes), SUM(receita_total)
+                    FROM relatorio_locacoes_diario{where_clause}
+                    GROUP BY status
+                """, params)
+                dados = cursor.fetchall()
+            relatorio_status = [
+                {
+                    "status": dado[0],
+                    "total_locacoes": int(dado[1]),
+                    "receita_total": float(dado[2])
+                }
+                for dado in dados
+            ]
+            logger.info(f"Relatório de status obtido com sucesso. Total de status diferentes: {len(relatorio_status)}.")
+            return relatorio_status
         except psycopg2.Error as e:
             return Relatorios.gerar_resposta_erro(f"Erro ao obter relatório de status: {e}")
     
@@ -367,21 +318,20 @@ class Relatorios:
             dict: Dicionário com detalhes do relatório ou uma resposta de erro em caso de falha.
         """
         try:
-            with get_connection() as conn:
-                with conn.cursor() as cursor:
-                    logger.info(f"Executando consulta para obter relatório com ID {relatorio_id}.")
-                    cursor.execute("SELECT * FROM relatorios WHERE id = %s", (relatorio_id,))
-                    resultado = cursor.fetchone()
-                    if resultado is None:
-                        return Relatorios.gerar_resposta_erro(f"Relatório com ID {relatorio_id} não encontrado.")
-                    relatorio = {
-                        "id": resultado[0],
-                        "data_inicio": resultado[1].strftime("%Y-%m-%d") if resultado[1] else None,
-                        "data_fim": resultado[2].strftime("%Y-%m-%d") if resultado[2] else None,
-                        "valor_total": float(resultado[3]) if resultado[3] else 0.0,
-                        "status": resultado[4]
-                    }
-                    logger.info(f"Relatório com ID {relatorio_id} obtido com sucesso.")
-                    return relatorio
+            with transaction() as cursor:
+                logger.info(f"Executando consulta para obter relatório com ID {relatorio_id}.")
+                cursor.execute("SELECT * FROM relatorios WHERE id = %s", (relatorio_id,))
+                resultado = cursor.fetchone()
+                if resultado is None:
+                    return Relatorios.gerar_resposta_erro(f"Relatório com ID {relatorio_id} não encontrado.")
+                relatorio = {
+                    "id": resultado[0],
+                    "data_inicio": resultado[1].strftime("%Y-%m-%d") if resultado[1] else None,
+                    "data_fim": resultado[2].strftime("%Y-%m-%d") if resultado[2] else None,
+                    "valor_total": float(resultado[3]) if resultado[3] else 0.0,
+                    "status": resultado[4]
+                }
+                logger.info(f"Relatório com ID {relatorio_id} obtido com sucesso.")
+                return relatorio
         except psycopg2.Error as e:
             return Relatorios.gerar_resposta_erro(f"Erro ao obter relatório com ID {relatorio_id}: {e}")
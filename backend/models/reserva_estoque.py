@@ -0,0 +1,131 @@
+from psycopg2.extras import execute_values
+from cache_respostas import cache_respostas
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EstoqueInsuficienteError(ValueError):
+    """
+    Levantada quando uma reserva não pode ser atendida.
+
+    Atributos:
+        faltas (list): Um dicionário por item sem saldo, com 'item_id', 'modelo',
+            'solicitado', 'disponivel' e 'faltando'.
+    """
+
+    def __init__(self, faltas):
+        self.faltas = faltas
+        modelos = ", ".join(f"'{falta['modelo']}'" for falta in faltas)
+        super().__init__(f"Estoque insuficiente para o(s) item(ns) {modelos}.")
+
+
+class ReservaEstoque:
+    """
+    Reserva e libera inventario.quantidade_disponivel dentro da transação do chamador.
+
+    As linhas do inventário são travadas com SELECT ... FOR UPDATE sempre em ordem crescente
+    de id, de modo que transações concorrentes esperam umas pelas outras em vez de entrar em
+    deadlock, e o saldo verificado é o mesmo que será decrementado.
+    """
+
+    @staticmethod
+    def _agrupar(quantidades):
+        """Soma quantidades repetidas e descarta itens com quantidade zero."""
+        if isinstance(quantidades, dict):
+            quantidades = quantidades.items()
+        total = {}
+        for item_id, quantidade in quantidades:
+            total[item_id] = total.get(item_id, 0) + quantidade
+        return sorted((item_id, quantidade) for item_id, quantidade in total.items() if quantidade)
+
+    @staticmethod
+    def reservar(cursor, quantidades):
+        """
+        Reserva estoque para um conjunto de itens, tudo ou nada.
+
+        Parâmetros:
+            cursor: Cursor da transação em andamento.
+            quantidades (dict | list): {item_id: quantidade} ou lista de pares (item_id, quantidade).
+
+        Retorna:
+            dict: Saldo disponível de cada item após a reserva.
+
+        Levanta:
+            EstoqueInsuficienteError: Se algum item não existir ou não tiver saldo; nada é alterado.
+        """
+        solicitado = ReservaEstoque._agrupar(quantidades)
+        if not solicitado:
+            return {}
+
+        cursor.execute('''
+            SELECT id, nome_item, quantidade_disponivel
+            FROM inventario
+            WHERE id = ANY(%s)
+            ORDER BY id
+            FOR UPDATE
+        ''', ([item_id for item_id, _ in solicitado],))
+        saldos = {item_id: (nome_item, disponivel) for item_id, nome_item, disponivel in cursor.fetchall()}
+
+        faltas = []
+        for item_id, quantidade in solicitado:
+            modelo, disponivel = saldos.get(item_id, (None, 0))
+            if quantidade > disponivel:
+                faltas.append({
+                    "item_id": item_id,
+                    "modelo": modelo,
+                    "solicitado": quantidade,
+                    "disponivel": disponivel,
+                    "faltando": quantidade - disponivel,
+                })
+        if faltas:
+            logger.warning(f"Reserva recusada por falta de estoque: {faltas}")
+            raise EstoqueInsuficienteError(faltas)
+
+        # As linhas já estão travadas; a condição no WHERE mantém o UPDATE seguro por si só
+        atualizados = execute_values(cursor, '''
+            UPDATE inventario AS inv
+            SET quantidade_disponivel = inv.quantidade_disponivel - v.quantidade
+            FROM (VALUES %s) AS v(item_id, quantidade)
+            WHERE inv.id = v.item_id AND inv.quantidade_disponivel >= v.quantidade
+            RETURNING inv.id, inv.quantidade_disponivel
+        ''', solicitado, template='(%s::integer, %s::integer)', page_size=len(solicitado), fetch=True)
+        if len(atualizados) != len(solicitado):
+            raise RuntimeError("Reserva de estoque inconsistente com as linhas travadas.")
+
+        cache_respostas.invalidar('inventario')
+        logger.debug(f"Estoque reservado: {solicitado}")
+        return dict(atualizados)
+
+    @staticmethod
+    def liberar(cursor, quantidades):
+        """
+        Devolve ao estoque as quantidades informadas (devolução ou redução de pedido).
+
+        Parâmetros:
+            cursor: Cursor da transação em andamento.
+            quantidades (dict | list): {item_id: quantidade} ou lista de pares (item_id, quantidade).
+
+        Retorna:
+            dict: Saldo disponível de cada item após a liberação.
+        """
+        devolvido = ReservaEstoque._agrupar(quantidades)
+        if not devolvido:
+            return {}
+
+        cursor.execute('''
+            SELECT id FROM inventario WHERE id = ANY(%s) ORDER BY id FOR UPDATE
+        ''', ([item_id for item_id, _ in devolvido],))
+        atualizados = execute_values(cursor, '''
+            UPDATE inventario AS inv
+            SET quantidade_disponivel = inv.quantidade_disponivel + v.quantidade
+            FROM (VALUES %s) AS v(item_id, quantidade)
+            WHERE inv.id = v.item_id
+            RETURNING inv.id, inv.quantidade_disponivel
+        ''', devolvido, template='(%s::integer, %s::integer)', page_size=len(devolvido), fetch=True)
+
+        cache_respostas.invalidar('inventario')
+        logger.debug(f"Estoque liberado: {devolvido}")
+        return dict(atualizados)
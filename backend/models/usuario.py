@@ -1,38 +1,13 @@
 import psycopg2
 from database import get_connection, release_connection
 import logging
-import hashlib
-import secrets
-import string
+import senhas
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Usuario:
-    @staticmethod
-    def _hash_senha(senha, salt=None):
-        """
-        Cria um hash seguro para a senha usando SHA-256 e um salt.
-        
-        Parâmetros:
-            senha (str): Senha em texto plano.
-            salt (str, optional): Salt para o hash. Se None, um novo salt será gerado.
-            
-        Retorna:
-            tuple: (hash_senha, salt)
-        """
-        if salt is None:
-            # Gerar um salt aleatório
-            caracteres = string.ascii_letters + string.digits
-            salt = ''.join(secrets.choice(caracteres) for _ in range(16))
-        
-        # Combinar senha e salt, e criar o hash
-        senha_salgada = (senha + salt).encode('utf-8')
-        hash_senha = hashlib.sha256(senha_salgada).hexdigest()
-        
-        return hash_senha, salt
-
     @staticmethod
     def criar_usuario(nome, email, senha, cargo="operador"):
         """
@@ -47,24 +22,24 @@ class Usuario:
         Retorna:
             int: ID do usuário criado ou None em caso de erro.
         """
+        # Hash da senha (no pool de senhas, antes de ocupar uma conexão do banco)
+        hash_senha = senhas.gerar_hash(senha)
+
         conn = get_connection()
         try:
             cursor = conn.cursor()
             # Verificar se o email já está em uso
-            cursor.execute("SELECT id FROM usuarios WHERE email = ?", (email,))
+            cursor.execute("SELECT id FROM usuarios WHERE email = %s", (email,))
             if cursor.fetchone():
                 logger.warning(f"Email já cadastrado: {email}")
                 return None
             
-            # Hash da senha
-            hash_senha, salt = Usuario._hash_senha(senha)
-            
-            # Inserir o usuário
+            # Inserir o usuário (o salt fica embutido no hash; a coluna salt é do formato antigo)
             cursor.execute("""
                 INSERT INTO usuarios (nome, email, hash_senha, salt, cargo)
-                VALUES (?, ?, ?, ?, ?)
+                VALUES (%s, %s, %s, '', %s)
                 RETURNING id
-            """, (nome, email, hash_senha, salt, cargo))
+            """, (nome, email, hash_senha, cargo))
             conn.commit()
             
             usuario_id = cursor.fetchone()[0]
@@ -80,6 +55,10 @@ class Usuario:
     def verificar_credenciais(email, senha):
         """
         Verifica se as credenciais de login são válidas.
+
+        A senha é conferida no pool de senhas, sem manter uma conexão do banco ocupada. Se o hash
+        armazenado for do formato antigo (SHA-256) ou usar parâmetros diferentes dos atuais, um
+        hash novo é gravado.
         
         Parâmetros:
             email (str): Email do usuário.
@@ -87,6 +66,9 @@ class Usuario:
             
         Retorna:
             dict: Dados do usuário se as credenciais forem válidas, None caso contrário.
+
+        Levanta:
+            senhas.SenhasSobrecarregadas: Se o pool de verificação estiver cheio.
         """
         conn = get_connection()
         try:
@@ -96,33 +78,59 @@ class Usuario:
                 FROM usuarios
                 WHERE email = %s
             """, (email,))
-            
             usuario = cursor.fetchone()
-            if not usuario:
-                logger.warning(f"Usuário não encontrado: {email}")
-                return None
-            
-            id, nome, email, hash_senha, salt, cargo = usuario
-            
-            # Verificar a senha
-            hash_verificacao, _ = Usuario._hash_senha(senha, salt)
-            if hash_verificacao != hash_senha:
-                logger.warning(f"Senha incorreta para o usuário: {email}")
-                return None
-            
-            logger.info(f"Login bem-sucedido: {email}")
-            return {
-                "id": id,
-                "nome": nome,
-                "email": email,
-                "cargo": cargo
-            }
+            conn.commit()
         except psycopg2.Error as e:
             logger.error(f"Erro ao verificar credenciais: {e}")
             return None
         finally:
             release_connection(conn)
 
+        if not usuario:
+            logger.warning(f"Usuário não encontrado: {email}")
+            senhas.verificar_ficticio(senha)
+            return None
+
+        id, nome, email, hash_senha, salt, cargo = usuario
+
+        # Verificar a senha
+        if not senhas.verificar_senha(senha, hash_senha, salt):
+            logger.warning(f"Senha incorreta para o usuário: {email}")
+            return None
+
+        if senhas.precisa_atualizar(hash_senha):
+            Usuario._atualizar_hash(id, hash_senha, senhas.gerar_hash(senha))
+
+        logger.info(f"Login bem-sucedido: {email}")
+        return {
+            "id": id,
+            "nome": nome,
+            "email": email,
+            "cargo": cargo
+        }
+
+    @staticmethod
+    def _atualizar_hash(usuario_id, hash_anterior, hash_novo):
+        """
+        Substitui o hash da senha após um login válido, se ele não mudou nesse meio-tempo.
+        Falhas são apenas registradas: o login já foi aceito.
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE usuarios SET hash_senha = %s, salt = ''
+                WHERE id = %s AND hash_senha = %s
+            """, (hash_novo, usuario_id, hash_anterior))
+            conn.commit()
+            if cursor.rowcount:
+                logger.info(f"Hash da senha do usuário ID {usuario_id} atualizado.")
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Erro ao atualizar hash da senha: {e}")
+        finally:
+            release_connection(conn)
+
     @staticmethod
     def obter_por_id(usuario_id):
         """
@@ -212,6 +220,8 @@ class Usuario:
         if not any([nome, email, senha, cargo]):
             logger.warning("Nenhum dado fornecido para atualização.")
             return False
+
+        hash_senha = senhas.gerar_hash(senha) if senha else None
         
         conn = get_connection()
         try:
@@ -241,12 +251,10 @@ class Usuario:
                 campos.append("email = %s")
                 valores.append(email)
             
-            if senha:
-                hash_senha, salt = Usuario._hash_senha(senha)
+            if hash_senha:
                 campos.append("hash_senha = %s")
                 valores.append(hash_senha)
-                campos.append("salt = %s")
-                valores.append(salt)
+                campos.append("salt = ''")
             
             if cargo:
                 campos.append("cargo = %s")
@@ -0,0 +1,171 @@
+"""
+Política de acesso às rotas da API.
+
+A política é declarada em POLITICA, por blueprint ou por endpoint, com um nível por método HTTP
+('*' vale para os métodos não listados). Ao registrar a aplicação, a política é resolvida para
+cada regra do url_map e compilada em um dicionário {endpoint: {método: nível}}; a cada
+requisição basta uma consulta por request.endpoint, sem percorrer prefixos de URL.
+
+Níveis:
+    PUBLICO     - sem autenticação
+    AUTENTICADO - exige token válido (Authorization: Bearer <token>; em GET, também ?token=)
+    ADMIN       - exige token válido de um usuário com cargo 'admin'
+
+As leituras de clientes, inventário, locações, notificações e relatórios continuam públicas;
+as escritas exigem autenticação. O stream de notificações, as exportações de relatórios e as
+métricas do cache também exigem: o EventSource e os links de download, que não enviam o
+cabeçalho Authorization, passam o token em ?token=. Endpoints que não aparecem na política,
+nem pelo blueprint, exigem autenticação e são listados em um aviso na inicialização; o teste
+tests/test_politica_acesso.py exige entrada explícita para todos.
+
+Para conferir o nível de cada rota registrada:
+    python -m politica_acesso
+"""
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PUBLICO = 'publico'
+AUTENTICADO = 'autenticado'
+ADMIN = 'admin'
+
+# Nível aplicado a endpoints sem entrada na política
+NIVEL_PADRAO = AUTENTICADO
+
+# Métodos que só leem dados
+LEITURA = {'GET': PUBLICO, '*': AUTENTICADO}
+
+POLITICA = {
+    # Endpoints da própria aplicação
+    'options_handler': {'*': PUBLICO},
+    'static': {'*': PUBLICO},
+    'metrics': {'*': PUBLICO},  # Protegida por METRICAS_TOKEN, quando definido
+
+    # Autenticação: login aberto; /auth/verificar responde 401 por conta própria
+    'auth_routes': {'*': AUTENTICADO},
+    'auth_routes.login': {'*': PUBLICO},
+    'auth_routes.verificar_token': {'*': PUBLICO},
+    'auth_routes.listar_usuarios': {'*': ADMIN},
+    'auth_routes.criar_usuario': {'*': ADMIN},
+    'auth_routes.atualizar_usuario': {'*': ADMIN},
+    'auth_routes.excluir_usuario': {'*': ADMIN},
+
+    'clientes_routes': LEITURA,
+    'inventario_routes': LEITURA,
+    'locacoes_routes': LEITURA,
+    'notificacoes_routes': LEITURA,
+    'notificacoes_routes.gerar_notificacoes_automaticas': {'*': PUBLICO},
+    'notificacoes_routes.stream_notificacoes': {'*': AUTENTICADO},
+    'reports': LEITURA,
+    'reports.export_report': {'*': AUTENTICADO},
+    'reports.cache_metrics': {'*': AUTENTICADO},
+    'reports.download_report': {'*': PUBLICO},  # Exportação com filtros no corpo
+
+    'itens_locados_routes': {'*': AUTENTICADO},
+    'damages_routes': {'*': AUTENTICADO},
+}
+
+
+def _blueprint(endpoint):
+    return endpoint.rsplit('.', 1)[0] if '.' in endpoint else None
+
+
+def _nivel(endpoint, metodo):
+    """Resolve o nível de um endpoint/método: endpoint, depois blueprint, depois o padrão."""
+    for chave in (endpoint, _blueprint(endpoint)):
+        regras = POLITICA.get(chave)
+        if regras is not None:
+            return regras.get(metodo, regras.get('*', NIVEL_PADRAO))
+    return NIVEL_PADRAO
+
+
+def compilar(app):
+    """
+    Compila a política para as regras registradas na aplicação.
+
+    Retorna:
+        dict: {endpoint: {método: nível}}
+    """
+    compilado = {}
+    for regra in app.url_map.iter_rules():
+        metodos = compilado.setdefault(regra.endpoint, {})
+        for metodo in regra.methods:
+            metodos[metodo] = _nivel(regra.endpoint, metodo)
+    return compilado
+
+
+def verificar_cobertura(app):
+    """
+    Confere a política contra as rotas registradas.
+
+    Retorna:
+        tuple: (endpoints sem entrada na política, entradas que não correspondem a nenhum
+        endpoint nem blueprint)
+    """
+    endpoints = {regra.endpoint for regra in app.url_map.iter_rules()}
+    blueprints = {_blueprint(endpoint) for endpoint in endpoints}
+    sem_politica = sorted(
+        endpoint for endpoint in endpoints if endpoint not in POLITICA and _blueprint(endpoint) not in POLITICA
+    )
+    sem_rota = sorted(chave for chave in POLITICA if chave not in endpoints and chave not in blueprints)
+    return sem_politica, sem_rota
+
+
+def matriz(app):
+    """
+    Retorna:
+        list: (regra, método, endpoint, nível) para cada rota e método registrados.
+    """
+    compilado = compilar(app)
+    return sorted(
+        (regra.rule, metodo, regra.endpoint, compilado[regra.endpoint][metodo])
+        for regra in app.url_map.iter_rules()
+        for metodo in regra.methods - {'HEAD', 'OPTIONS'}
+    )
+
+
+def registrar_politica_acesso(app):
+    """
+    Compila a política e registra na aplicação Flask a verificação de acesso.
+    Deve ser chamada depois de registrar os blueprints.
+    """
+    from flask import request
+    from routes.auth_routes import requer_admin, requer_autenticacao
+
+    compilado = compilar(app)
+    sem_politica, sem_rota = verificar_cobertura(app)
+    if sem_politica:
+        logger.warning(f"Endpoints sem política de acesso (exigem autenticação): {', '.join(sem_politica)}")
+    if sem_rota:
+        logger.warning(f"Entradas da política sem rota correspondente: {', '.join(sem_rota)}")
+
+    verificar = {
+        AUTENTICADO: requer_autenticacao(lambda: None),
+        ADMIN: requer_admin(lambda: None),
+    }
+
+    @app.before_request
+    def proteger_rotas():
+        # Preflight CORS e URLs sem rota (que terminam em 404/405) não passam pela política
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        metodos = compilado.get(request.endpoint)
+        nivel = metodos.get(request.method, NIVEL_PADRAO) if metodos else _nivel(request.endpoint, request.method)
+        if nivel == PUBLICO:
+            return None
+        return verificar[nivel]()
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    app = create_app()
+    for regra, metodo, endpoint, nivel in matriz(app):
+        print(f"{nivel:<12} {metodo:<7} {regra:<55} {endpoint}")
+    sem_politica, sem_rota = verificar_cobertura(app)
+    for endpoint in sem_politica:
+        print(f"Sem política (padrão {NIVEL_PADRAO}): {endpoint}")
+    for chave in sem_rota:
+        print(f"Política sem rota: {chave}")
@@ -0,0 +1,146 @@
+"""
+Configuração de logging e registro das requisições recebidas.
+
+O ambiente vem de APP_ENV (ou FLASK_ENV); sem nenhum dos dois, vale "production". Cada ambiente
+tem um perfil com o nível de log e a amostragem dos corpos das requisições:
+
+    development - DEBUG, registra o corpo de todas as requisições POST/PUT/PATCH/DELETE
+    production  - INFO, não registra corpos
+
+LOG_NIVEL, LOG_PAYLOAD_AMOSTRAGEM (fração de 0 a 1) e LOG_PAYLOAD_MAX_BYTES sobrescrevem o
+perfil. O corpo só é lido quando a requisição é sorteada e cabe no limite; campos sensíveis
+(senha, token etc.) são mascarados e o texto é truncado no limite. O JSON é lido com
+request.get_json, que guarda o resultado: a rota que o ler em seguida reaproveita o mesmo objeto.
+
+Os registros de log vão para uma fila (QueueHandler) e são escritos no stderr por uma thread
+própria (QueueListener), de modo que a requisição não espera pela escrita.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMATO_LOG = "%(asctime)s [%(levelname)s]: %(message)s"
+
+PERFIS = {
+    "development": {"nivel": "DEBUG", "amostragem": 1.0, "max_bytes": 4096},
+    "production": {"nivel": "INFO", "amostragem": 0.0, "max_bytes": 1024},
+}
+
+AMBIENTE = (os.getenv('APP_ENV') or os.getenv('FLASK_ENV') or 'production').lower()
+if AMBIENTE not in PERFIS:
+    logger.warning(f"Ambiente '{AMBIENTE}' desconhecido; usando o perfil 'production'.")
+    AMBIENTE = 'production'
+
+_perfil = PERFIS[AMBIENTE]
+# Variáveis vazias (como as de .env.example) mantêm o valor do perfil
+NIVEL_LOG = (os.getenv('LOG_NIVEL') or _perfil['nivel']).upper()
+AMOSTRAGEM_PAYLOAD = float(os.getenv('LOG_PAYLOAD_AMOSTRAGEM') or _perfil['amostragem'])
+MAX_BYTES_PAYLOAD = int(os.getenv('LOG_PAYLOAD_MAX_BYTES') or _perfil['max_bytes'])
+
+# Em produção os corpos sorteados saem em INFO, para não exigir DEBUG em todo o processo
+NIVEL_PAYLOAD = logging.DEBUG if AMBIENTE == 'development' else logging.INFO
+
+# Métodos cujo corpo pode ser registrado
+METODOS_COM_CORPO = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Trechos de nomes de campo cujo valor nunca é registrado
+CAMPOS_SENSIVEIS = ('senha', 'password', 'token', 'secret', 'authorization')
+MASCARA = '***'
+
+_listener = None
+
+
+def configurar_logging():
+    """
+    Direciona o logger raiz para uma fila atendida por uma thread de escrita.
+
+    Substitui os handlers instalados pelos logging.basicConfig dos módulos. Pode ser chamada de
+    novo (por exemplo, em um processo filho após fork) para recriar a thread de escrita.
+    """
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+
+    fila = queue.SimpleQueue()
+    saida = logging.StreamHandler(sys.stderr)
+    saida.setFormatter(logging.Formatter(FORMATO_LOG))
+    _listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    raiz.setLevel(NIVEL_LOG)
+    _listener.start()
+
+
+def encerrar_logging():
+    """Escreve os registros pendentes e para a thread de escrita."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(encerrar_logging)
+
+
+def mascarar(dados):
+    """Cópia de dados com os valores dos campos sensíveis substituídos por MASCARA."""
+    if isinstance(dados, dict):
+        return {
+            chave: MASCARA if any(trecho in str(chave).lower() for trecho in CAMPOS_SENSIVEIS) else mascarar(valor)
+            for chave, valor in dados.items()
+        }
+    if isinstance(dados, list):
+        return [mascarar(valor) for valor in dados]
+    return dados
+
+
+def resumir_payload(request):
+    """
+    Texto do corpo da requisição para o log: mascarado e truncado em MAX_BYTES_PAYLOAD.
+
+    Retorna:
+        str: O corpo resumido, ou uma descrição quando ele não é lido.
+    """
+    tamanho = request.content_length
+    if not tamanho:
+        return "sem corpo"
+    if tamanho > MAX_BYTES_PAYLOAD:
+        return f"{tamanho} bytes (acima do limite de {MAX_BYTES_PAYLOAD}, omitido)"
+    if not request.is_json:
+        return f"{tamanho} bytes ({request.mimetype or 'sem tipo'})"
+
+    dados = request.get_json(silent=True)
+    if dados is None:
+        return f"{tamanho} bytes (JSON inválido)"
+    texto = json.dumps(mascarar(dados), ensure_ascii=False, default=str)
+    if len(texto) > MAX_BYTES_PAYLOAD:
+        texto = texto[:MAX_BYTES_PAYLOAD] + "..."
+    return texto
+
+
+def registrar_log_requisicoes(app):
+    """Registra na aplicação Flask o log das requisições recebidas e dos corpos sorteados."""
+    from flask import request
+
+    @app.before_request
+    def log_request_info():
+        logger.debug("Requisição recebida: %s %s", request.method, request.path)
+        if (AMOSTRAGEM_PAYLOAD > 0 and request.method in METODOS_COM_CORPO
+                and logger.isEnabledFor(NIVEL_PAYLOAD) and random.random() < AMOSTRAGEM_PAYLOAD):
+            logger.log(NIVEL_PAYLOAD, "Dados recebidos em %s %s: %s",
+                       request.method, request.path, resumir_payload(request))
@@ -1,34 +1,62 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, g
 from models.usuario import Usuario
 from helpers import handle_database_error
+# verificar_token também é o nome da rota /auth/verificar (endpoint auth_routes.verificar_token)
+from auth_tokens import emitir_token, revogar_token, verificar_token as validar_token
+from senhas import SenhasSobrecarregadas
 import psycopg2
 import logging
-import secrets
 import functools
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Segundos sugeridos ao cliente quando o pool de verificação de senhas está cheio
+RETRY_AFTER_SENHAS = 2
+
+def resposta_sobrecarga():
+    resposta = jsonify({"error": "Muitas requisições de autenticação. Tente novamente em instantes."})
+    resposta.headers['Retry-After'] = str(RETRY_AFTER_SENHAS)
+    return resposta, 503
+
+# Parâmetro aceito no lugar do cabeçalho em requisições GET: EventSource e links de download
+# não enviam o cabeçalho Authorization
+PARAMETRO_TOKEN = 'token'
+
 # Criação do blueprint para as rotas de autenticação
 auth_routes = Blueprint('auth_routes', __name__, url_prefix='/auth')
 
+def obter_token():
+    """
+    Retorna o token do cabeçalho Authorization: Bearer <token> ou, em requisições GET, do
+    parâmetro ?token=; None se não houver.
+    """
+    cabecalho = request.headers.get('Authorization')
+    if cabecalho and cabecalho.startswith('Bearer '):
+        return cabecalho.split(' ')[1]
+    if request.method == 'GET':
+        return request.args.get(PARAMETRO_TOKEN) or None
+    return None
+
 # Função decoradora para verificar autenticação
 def requer_autenticacao(f):
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token or not token.startswith('Bearer '):
+        token = obter_token()
+        if not token:
             logger.warning("Tentativa de acesso sem token de autenticação")
             return jsonify({"error": "Autenticação necessária"}), 401
         
-        token = token.split(' ')[1]
-        if token not in session_tokens:
+        usuario, token_renovado = validar_token(token)
+        if usuario is None:
             logger.warning("Token de autenticação inválido")
             return jsonify({"error": "Token inválido ou expirado"}), 401
         
-        # Adiciona o usuário à requisição
-        request.usuario = session_tokens[token]
+        # Adiciona o usuário à requisição; o token renovado vai no cabeçalho da resposta
+        request.usuario = usuario
+        if token_renovado:
+            g.token_renovado = token_renovado
         return f(*args, **kwargs)
     return decorated_function
 
@@ -43,9 +71,6 @@ def requer_admin(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Dicionário para armazenar tokens de sessão (em produção, usar Redis ou similar)
-session_tokens = {}
-
 @auth_routes.route('/login', methods=['POST'])
 def login():
     """Rota para autenticação de usuários."""
@@ -63,9 +88,8 @@ def login():
             logger.warning(f"Tentativa de login falhou para o email: {dados.get('email')}")
             return jsonify({"error": "Credenciais inválidas"}), 401
         
-        # Gerar token de sessão
-        token = secrets.token_hex(32)
-        session_tokens[token] = usuario
+        # Gerar token assinado (válido em qualquer worker que compartilhe a SECRET_KEY)
+        token = emitir_token(usuario)
         
         logger.info(f"Login bem-sucedido para o usuário: {usuario['email']}")
         return jsonify({
@@ -78,6 +102,9 @@ def login():
                 "cargo": usuario['cargo']
             }
         }), 200
+    except SenhasSobrecarregadas as e:
+        logger.warning(f"Pool de senhas sobrecarregado durante login: {e}")
+        return resposta_sobrecarga()
     except psycopg2.Error as e:
         logger.error(f"Erro no banco de dados durante login: {e}")
         return handle_database_error(e)
@@ -90,11 +117,8 @@ def login():
 def logout():
     """Rota para encerrar a sessão do usuário."""
     try:
-        token = request.headers.get('Authorization').split(' ')[1]
-        if token in session_tokens:
-            usuario = session_tokens[token]
-            del session_tokens[token]
-            logger.info(f"Logout bem-sucedido para o usuário: {usuario['email']}")
+        if revogar_token(obter_token()):
+            logger.info(f"Logout bem-sucedido para o usuário: {request.usuario['email']}")
         
         return jsonify({"message": "Logout bem-sucedido"}), 200
     except Exception as ex:
@@ -157,6 +181,9 @@ def criar_usuario():
         
         logger.info(f"Usuário criado com sucesso: ID {usuario_id}")
         return jsonify({"message": "Usuário criado com sucesso", "id": usuario_id}), 201
+    except SenhasSobrecarregadas as e:
+        logger.warning(f"Pool de senhas sobrecarregado ao criar usuário: {e}")
+        return resposta_sobrecarga()
     except psycopg2.Error as e:
         logger.error(f"Erro no banco de dados ao criar usuário: {e}")
         return handle_database_error(e)
@@ -189,6 +216,9 @@ def atualizar_usuario(usuario_id):
         
         logger.info(f"Usuário ID {usuario_id} atualizado com sucesso")
         return jsonify({"message": "Usuário atualizado com sucesso"}), 200
+    except SenhasSobrecarregadas as e:
+        logger.warning(f"Pool de senhas sobrecarregado ao atualizar usuário: {e}")
+        return resposta_sobrecarga()
     except psycopg2.Error as e:
         logger.error(f"Erro no banco de dados ao atualizar usuário: {e}")
         return handle_database_error(e)
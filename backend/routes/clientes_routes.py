@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models.cliente import Cliente  # Import específico para modularidade
+from cache_respostas import cache_respostas
 import psycopg2
 import logging
 
@@ -11,6 +12,7 @@ logger = logging.getLogger(__name__)
 clientes_routes = Blueprint("clientes_routes", __name__)
 
 @clientes_routes.route("/", methods=["GET"])
+@cache_respostas.em_cache('clientes')
 def get_clientes():
     """
     Rota para listar todos os clientes.
@@ -27,6 +29,7 @@ def get_clientes():
         return jsonify({"error": "Erro inesperado ao buscar clientes."}), 500
 
 @clientes_routes.route("/<int:cliente_id>", methods=["GET"])
+@cache_respostas.em_cache('clientes')
 def get_cliente(cliente_id):
     """
     Rota para obter um cliente específico pelo ID.
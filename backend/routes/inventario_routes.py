@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models.inventario import Inventario  # Import específico para modularidade
+from models.disponibilidade import Disponibilidade
 from helpers import handle_database_error
+from cache_respostas import cache_respostas
 import logging
 import psycopg2
 
@@ -12,6 +14,7 @@ logger = logging.getLogger(__name__)
 inventario_routes = Blueprint('inventario_routes', __name__, url_prefix='/inventario')
 
 @inventario_routes.route('', methods=['GET'])
+@cache_respostas.em_cache('inventario')
 def get_inventario():
     """
     Rota para listar todos os itens do inventário com quantidades atualizadas.
@@ -42,6 +45,7 @@ def get_inventario():
         return jsonify({"error": "Erro inesperado ao buscar inventário."}), 500
 
 @inventario_routes.route('/<int:item_id>', methods=['GET'])
+@cache_respostas.em_cache('inventario')
 def get_item_by_id(item_id):
     """
     Rota para obter um item específico do inventário pelo ID.
@@ -90,6 +94,7 @@ def add_inventario():
         return jsonify({"error": "Erro inesperado ao adicionar item ao inventário."}), 500
 
 @inventario_routes.route('/disponiveis', methods=['GET'])
+@cache_respostas.em_cache('inventario')
 def get_inventario_disponiveis():
     """
     Rota para listar itens disponíveis no inventário.
@@ -105,6 +110,27 @@ def get_inventario_disponiveis():
         logger.error(f"Erro inesperado ao buscar itens disponíveis no inventário: {ex}", exc_info=True)
         return jsonify({"error": "Erro ao buscar itens disponíveis no inventário."}), 500
 
+@inventario_routes.route('/<int:item_id>/disponibilidade', methods=['GET'])
+def get_disponibilidade_item(item_id):
+    """
+    Rota para obter a disponibilidade diária de um item entre duas datas.
+    Parâmetros opcionais: de=AAAA-MM-DD (padrão: hoje) e ate=AAAA-MM-DD (padrão: de + 30 dias).
+    """
+    try:
+        calendario = Disponibilidade.obter_por_item(item_id, request.args.get('de'), request.args.get('ate'))
+        if calendario is None:
+            logger.warning(f"Item ID {item_id} não encontrado.")
+            return jsonify({"error": "Item não encontrado."}), 404
+        return jsonify(calendario), 200
+    except ValueError as ve:
+        logger.warning(f"Parâmetros de disponibilidade inválidos: {ve}")
+        return jsonify({"error": str(ve)}), 400
+    except psycopg2.Error as e:
+        return handle_database_error(e)
+    except Exception as ex:
+        logger.error(f"Erro inesperado ao calcular disponibilidade do item: {ex}", exc_info=True)
+        return jsonify({"error": "Erro inesperado ao calcular disponibilidade do item."}), 500
+
 @inventario_routes.route('/<int:item_id>', methods=['PUT'])
 def update_item(item_id):
     """
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models.locacao import Locacao
+from models.reserva_estoque import EstoqueInsuficienteError
 from helpers import handle_database_error
 import psycopg2
 import logging
@@ -46,6 +47,9 @@ def criar_locacao():
         logger.info(f"Locação criada com sucesso: ID {locacao_id}")
         return jsonify({"message": "Locação criada com sucesso!", "id": locacao_id}), 201
         
+    except EstoqueInsuficienteError as ei:
+        logger.warning(f"Locação recusada: {ei}")
+        return jsonify({"error": str(ei), "faltas": ei.faltas}), 409
     except ValueError as ve:
         logger.error(f"Erro de validação: {ve}")
         return jsonify({"error": str(ve)}), 400
@@ -56,13 +60,38 @@ def criar_locacao():
         logger.error(f"Erro inesperado: {ex}")
         return jsonify({"error": "Erro ao criar locação."}), 500
 
+# Parâmetros de consulta que ativam a listagem paginada de GET /locacoes
 @locacoes_routes.route('', methods=['GET'])
 def listar_locacoes():
-    """Rota para listar todas as locações."""
+    """
+    Rota para listar locações.
+
+    Retorna uma página no formato {"data": [...], "proximo_cursor": ..., "limite": ...}, filtrada
+    pelos parâmetros limite (padrão: Locacao.LIMITE_PADRAO), cursor, ordenar, status,
+    cliente_id, data_inicio, data_fim e numero_nota. A lista completa (formato legado, sem
+    limite) só é retornada com ?todas=1.
+    """
     try:
-        locacoes = Locacao.obter_todas_detalhadas()
-        logger.info(f"{len(locacoes)} locações encontradas.")
-        return jsonify(locacoes), 200
+        if request.args.get('todas') in ('1', 'true'):
+            locacoes = Locacao.obter_todas_detalhadas()
+            logger.info(f"{len(locacoes)} locações encontradas.")
+            return jsonify(locacoes), 200
+
+        pagina = Locacao.obter_pagina(
+            limite=request.args.get('limite'),
+            cursor_pagina=request.args.get('cursor'),
+            ordenar=request.args.get('ordenar', 'id'),
+            status=request.args.get('status'),
+            cliente_id=request.args.get('cliente_id'),
+            data_inicio=request.args.get('data_inicio'),
+            data_fim=request.args.get('data_fim'),
+            numero_nota=request.args.get('numero_nota')
+        )
+        logger.info(f"{len(pagina['data'])} locações retornadas na página.")
+        return jsonify(pagina), 200
+    except ValueError as ve:
+        logger.warning(f"Parâmetros de listagem inválidos: {ve}")
+        return jsonify({"error": str(ve)}), 400
     except psycopg2.Error as e:
         logger.error(f"Erro no banco de dados: {e}")
         return handle_database_error(e)
@@ -102,6 +131,19 @@ def listar_locacoes_atrasadas():
         logger.error(f"Erro inesperado: {ex}")
         return jsonify({"error": "Erro ao listar locações atrasadas."}), 500
 
+@locacoes_routes.route('/resumo', methods=['GET'])
+def resumo_locacoes():
+    """Rota com a contagem de locações ativas e atrasadas (usada no painel inicial)."""
+    try:
+        resumo = Locacao.obter_resumo()
+        return jsonify(resumo), 200
+    except psycopg2.Error as e:
+        logger.error(f"Erro no banco de dados: {e}")
+        return handle_database_error(e)
+    except Exception as ex:
+        logger.error(f"Erro inesperado: {ex}")
+        return jsonify({"error": "Erro ao obter resumo das locações."}), 500
+
 @locacoes_routes.route('/<int:locacao_id>', methods=['GET'])
 def obter_locacao(locacao_id):
     """Rota para obter uma locação específica pelo ID."""
@@ -1,6 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from models.notificacao import Notificacao
+from canal_notificacoes import CanalLotado, canal_notificacoes
+from agendador import agendador_notificacoes
+import json
 import logging
+import queue
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -9,15 +13,17 @@ logger = logging.getLogger(__name__)
 # Criação do Blueprint para notificações
 notificacoes_routes = Blueprint('notificacoes_routes', __name__)
 
+# Intervalo (segundos) entre comentários de keep-alive no stream SSE
+INTERVALO_KEEPALIVE = 15
+# Segundos sugeridos ao cliente quando o limite de streams do processo foi atingido
+RETRY_AFTER_STREAM = 5
+
 @notificacoes_routes.route('/', methods=['GET'])
 def obter_todas_notificacoes():
     """
     Retorna todas as notificações.
     """
     try:
-        # Gerar notificações automáticas antes de retornar
-        Notificacao.gerar_notificacoes_automaticas()
-        
         notificacoes = Notificacao.get_all()
         return jsonify({
             "status": "success",
@@ -37,9 +43,6 @@ def obter_notificacoes_nao_lidas():
     Retorna todas as notificações não lidas.
     """
     try:
-        # Gerar notificações automáticas antes de retornar
-        Notificacao.gerar_notificacoes_automaticas()
-        
         notificacoes = Notificacao.get_unread()
         return jsonify({
             "status": "success",
@@ -158,17 +161,24 @@ def criar_notificacao():
             "message": f"Erro ao criar notificação: {str(e)}"
         }), 500
 
-@notificacoes_routes.route('/gerar-automaticas', methods=['POST'])
+@notificacoes_routes.route('/gerar-automaticas', methods=['GET', 'POST'])
 def gerar_notificacoes_automaticas():
     """
-    Gera notificações automáticas com base em condições do sistema.
+    Retorna o resultado da última rodada do agendador de notificações automáticas, executada
+    por qualquer worker. A geração em si roda em segundo plano (ver agendador.py); esta rota
+    não varre o banco.
     """
     try:
-        quantidade = Notificacao.gerar_notificacoes_automaticas()
+        rodada = agendador_notificacoes.ultima_rodada()
+        quantidade = rodada["geradas"]
         return jsonify({
             "status": "success",
-            "data": {"quantidade": quantidade},
-            "message": f"Geradas {quantidade} notificações automáticas."
+            "data": {
+                "quantidade": quantidade,
+                "ultima_execucao": rodada["ultima_execucao"],
+                "agendador": agendador_notificacoes.metricas(),
+            },
+            "message": f"Geradas {quantidade} notificações automáticas na última execução."
         }), 200
     except Exception as e:
         logger.error(f"Erro ao gerar notificações automáticas: {e}")
@@ -176,3 +186,46 @@ def gerar_notificacoes_automaticas():
             "status": "error",
             "message": f"Erro ao gerar notificações automáticas: {str(e)}"
         }), 500
+
+@notificacoes_routes.route('/stream', methods=['GET'])
+def stream_notificacoes():
+    """
+    Stream Server-Sent Events com as notificações criadas, alteradas ou excluídas a partir
+    da conexão. O cliente carrega a lista inicial em /notificacoes/nao-lidas e depois só
+    recebe as mudanças (evento 'notificacao' com operacao, id e a notificação).
+
+    Cada stream ocupa uma thread do worker; acima de NOTIFICACOES_STREAMS_MAX streams no
+    processo, responde 503 com Retry-After.
+    """
+    try:
+        fila = canal_notificacoes.assinar()
+    except CanalLotado as e:
+        logger.warning(f"Stream de notificações recusado: {e}")
+        resposta = jsonify({"error": "Muitas conexões ao stream de notificações. Tente novamente em instantes."})
+        resposta.headers['Retry-After'] = str(RETRY_AFTER_STREAM)
+        return resposta, 503
+
+    def gerar():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    evento = fila.get(timeout=INTERVALO_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if evento is None:
+                    return
+                dados = json.dumps(evento, default=str, ensure_ascii=False)
+                yield f"id: {evento['id']}\nevent: notificacao\ndata: {dados}\n\n"
+        finally:
+            canal_notificacoes.cancelar(fila)
+
+    logger.info(f"Cliente conectado ao stream de notificações ({canal_notificacoes.total_assinantes()} ativos).")
+    resposta = Response(stream_with_context(gerar()), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # Se o cliente desconectar antes do primeiro evento, o gerador nunca roda (nem o seu finally)
+    resposta.call_on_close(lambda: canal_notificacoes.cancelar(fila))
+    return resposta
@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from models.report import Relatorios
-from io import BytesIO
+from models.exportacao import Exportacao
+from cache_respostas import cache_respostas
 
 reports_bp = Blueprint("reports", __name__, url_prefix="/reports")
 
@@ -69,32 +70,31 @@ def inventory_usage(item_id):
     except Exception as ex:
         return jsonify({"error": f"Erro ao gerar uso do inventário: {str(ex)}"}), 500
 
-# Endpoint de relatório de status com opções de exportação
+# Endpoint de relatório de status
 @reports_bp.route("/status", methods=["GET"])
 def status_report():
     """
-    Retorna o status das locações, podendo ser exportado como Excel ou gráfico.
+    Retorna o status das locações em JSON. A planilha é exportada por
+    /reports/export/status?formato=xlsx, que exige autenticação.
     """
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
     export_format = request.args.get("export_format")
 
     try:
-        data = Relatorios.obter_relatorio_status(start_date, end_date)
-
-        if "error" in data:
-            return jsonify(data), 400
-
-        # Retorna arquivo Excel para download
+        # Formatos de exportação respondem antes de consultar o relatório
         if export_format == "excel":
-            # Função export_report_to_excel não está definida
-            return jsonify({"error": "Exportação para Excel não implementada"}), 501
+            return jsonify({"error": "Use /reports/export/status?formato=xlsx para exportar em Excel."}), 400
 
-        # Retorna gráfico gerado
         if export_format == "chart":
             # Função generate_summary_chart não está definida
             return jsonify({"error": "Geração de gráfico não implementada"}), 501
 
+        data = Relatorios.obter_relatorio_status(start_date, end_date)
+
+        if "error" in data:
+            return jsonify(data), 400
+
         # Retorna dados em JSON como resposta padrão
         return jsonify(data), 200
     except Exception as ex:
@@ -118,50 +118,83 @@ def report_by_id(relatorio_id):
 
 # Endpoint para buscar clientes (para autocomplete/filtros)
 @reports_bp.route("/clients", methods=["GET"])
+@cache_respostas.em_cache('clientes')
 def search_clients():
     """
-    Retorna lista de clientes para filtros e buscas.
+    Retorna os clientes cujo nome contém o termo de busca (ignorando acentos), em ordem de
+    relevância, para filtros e autocomplete. Aceita o parâmetro limite (padrão 20, máximo 100).
     """
     from models.cliente import Cliente
     try:
         search_term = request.args.get("search", "")
-        clientes = Cliente.get_all()
-        
-        # Filtrar por termo de busca se fornecido
-        if search_term:
-            clientes = [c for c in clientes if search_term.lower() in c.get('nome', '').lower()]
-        
+        clientes = Cliente.buscar(search_term, limite=request.args.get("limite"))
         return jsonify(clientes), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as ex:
         return jsonify({"error": f"Erro ao buscar clientes: {str(ex)}"}), 500
 
 # Endpoint para buscar itens do inventário (para autocomplete/filtros)
 @reports_bp.route("/items", methods=["GET"])
+@cache_respostas.em_cache('inventario')
 def search_items():
     """
-    Retorna lista de itens do inventário para filtros e buscas.
+    Retorna os itens do inventário cujo nome contém o termo de busca (ignorando acentos), em
+    ordem de relevância, para filtros e autocomplete. Aceita o parâmetro limite (padrão 20, máximo 100).
     """
     from models.inventario import Inventario
     try:
         search_term = request.args.get("search", "")
-        itens = Inventario.get_all()
-        
-        # Filtrar por termo de busca se fornecido
-        if search_term:
-            itens = [i for i in itens if search_term.lower() in i.get('nome_item', '').lower()]
-        
+        itens = Inventario.buscar(search_term, limite=request.args.get("limite"))
         return jsonify(itens), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as ex:
         return jsonify({"error": f"Erro ao buscar itens: {str(ex)}"}), 500
 
+# Endpoint com as métricas do cache de respostas deste processo
+@reports_bp.route("/cache", methods=["GET"])
+def cache_metrics():
+    """
+    Retorna acertos, falhas, respostas 304 e a taxa de acerto do cache de respostas.
+    """
+    return jsonify(cache_respostas.metricas()), 200
+
+def exportar_resposta(conjunto, formato):
+    """
+    Monta a resposta em streaming de uma exportação, com os filtros da query string.
+    """
+    try:
+        conteudo, mimetype, nome_arquivo = Exportacao.exportar(conjunto, formato, request.args)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except NotImplementedError as ni:
+        return jsonify({"error": str(ni)}), 501
+    return Response(stream_with_context(conteudo), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename={nome_arquivo}",
+        "X-Accel-Buffering": "no",
+    })
+
+# Endpoint de exportação direto do banco (CSV ou XLSX), em streaming
+@reports_bp.route("/export/<conjunto>", methods=["GET"])
+def export_report(conjunto):
+    """
+    Exporta um conjunto de dados (locacoes, itens_locados ou status) em CSV ou XLSX.
+    Parâmetros: formato=csv|xlsx (padrão csv) e os filtros start_date, end_date,
+    cliente_id, item_id e status, conforme o conjunto.
+    """
+    try:
+        return exportar_resposta(conjunto, request.args.get("formato", "csv"))
+    except Exception as ex:
+        return jsonify({"error": f"Erro ao exportar relatório: {str(ex)}"}), 500
+
 # Endpoint para download de relatórios em CSV
 @reports_bp.route("/download", methods=["POST"])
 def download_report():
     """
-    Gera e retorna um arquivo CSV com os dados do relatório.
+    Gera e retorna um arquivo CSV com os dados do relatório enviados pelo cliente.
+    Para exportar dados do banco, prefira /reports/export/<conjunto>.
     """
-    import csv
-    from io import StringIO
     try:
         dados = request.get_json()
         report_data = dados.get('report_data', [])
@@ -169,21 +202,11 @@ def download_report():
         if not report_data:
             return jsonify({"error": "Nenhum dado fornecido para download."}), 400
         
-        # Criar CSV em memória
-        output = StringIO()
-        if len(report_data) > 0:
-            writer = csv.DictWriter(output, fieldnames=report_data[0].keys())
-            writer.writeheader()
-            writer.writerows(report_data)
-        
-        # Converter para bytes
-        csv_data = output.getvalue().encode('utf-8-sig')
-        
-        return send_file(
-            BytesIO(csv_data),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='relatorio.csv'
-        )
+        # Escreve o CSV em pedaços, sem montar o arquivo inteiro em memória
+        colunas = list(report_data[0].keys())
+        linhas = ([registro.get(coluna) for coluna in colunas] for registro in report_data)
+        return Response(stream_with_context(Exportacao.gerar_csv(colunas, linhas)), mimetype='text/csv', headers={
+            "Content-Disposition": "attachment; filename=relatorio.csv",
+        })
     except Exception as ex:
         return jsonify({"error": f"Erro ao gerar download: {str(ex)}"}), 500
@@ -0,0 +1,232 @@
+"""
+Hash e verificação de senhas.
+
+Os hashes novos são gerados com scrypt (ou PBKDF2-SHA256, com SENHA_ALGORITMO=pbkdf2_sha256) e
+guardam os próprios parâmetros, no formato:
+
+    scrypt$n=16384,r=8,p=1$<salt base64>$<hash base64>
+    pbkdf2_sha256$i=600000$<salt base64>$<hash base64>
+
+Os hashes antigos (SHA-256 de senha + salt, com o salt na coluna usuarios.salt) continuam
+aceitos. Quando o hash armazenado é antigo ou foi gerado com parâmetros diferentes dos atuais,
+precisa_atualizar() retorna True e o login grava um hash novo (atualização transparente).
+
+O custo é configurável (SENHA_SCRYPT_N/R/P, SENHA_PBKDF2_ITERACOES) e pode ser calibrado para a
+máquina com:
+
+    python -m senhas --calibrar 250      # custo para ~250 ms por verificação
+
+Hash e verificação rodam em um pool limitado de SENHA_WORKERS threads (as funções do hashlib
+liberam o GIL). Até SENHA_FILA_MAX pedidos aguardam na fila; além disso, ou após
+SENHA_ESPERA_MAX segundos de espera, é levantado SenhasSobrecarregadas, de modo que uma rajada
+de logins não ocupa todas as threads que atendem a API.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as EsperaEsgotada
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ALGORITMO = os.getenv('SENHA_ALGORITMO', 'scrypt')
+SCRYPT_N = int(os.getenv('SENHA_SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = int(os.getenv('SENHA_SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('SENHA_SCRYPT_P', '1'))
+PBKDF2_ITERACOES = int(os.getenv('SENHA_PBKDF2_ITERACOES', '600000'))
+
+WORKERS = int(os.getenv('SENHA_WORKERS', '2'))
+FILA_MAX = int(os.getenv('SENHA_FILA_MAX', '32'))
+ESPERA_MAX = float(os.getenv('SENHA_ESPERA_MAX', '10'))
+
+TAMANHO_SALT = 16
+TAMANHO_HASH = 32
+
+if ALGORITMO not in ('scrypt', 'pbkdf2_sha256'):
+    raise ValueError(f"SENHA_ALGORITMO inválido: {ALGORITMO}")
+
+
+class SenhasSobrecarregadas(Exception):
+    """O pool de verificação de senhas está cheio ou demorou demais para atender."""
+
+
+def _b64(dados):
+    return base64.b64encode(dados).decode('ascii').rstrip('=')
+
+
+def _de_b64(texto):
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def _scrypt(senha, salt, n, r, p):
+    # maxmem precisa cobrir os 128 * r * n bytes do algoritmo (o padrão do OpenSSL é 32 MiB)
+    return hashlib.scrypt(senha.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * n * 2 + 1024 * 1024, dklen=TAMANHO_HASH)
+
+
+def _pbkdf2(senha, salt, iteracoes):
+    return hashlib.pbkdf2_hmac('sha256', senha.encode('utf-8'), salt, iteracoes, dklen=TAMANHO_HASH)
+
+
+def _parametros_atuais():
+    if ALGORITMO == 'scrypt':
+        return f"n={SCRYPT_N},r={SCRYPT_R},p={SCRYPT_P}"
+    return f"i={PBKDF2_ITERACOES}"
+
+
+def _gerar_hash(senha):
+    salt = secrets.token_bytes(TAMANHO_SALT)
+    if ALGORITMO == 'scrypt':
+        derivado = _scrypt(senha, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    else:
+        derivado = _pbkdf2(senha, salt, PBKDF2_ITERACOES)
+    return f"{ALGORITMO}${_parametros_atuais()}${_b64(salt)}${_b64(derivado)}"
+
+
+def _verificar(senha, hash_armazenado, salt_legado=None):
+    partes = hash_armazenado.split('$')
+    if len(partes) != 4:
+        # Formato antigo: SHA-256 hexadecimal de senha + salt
+        if salt_legado is None:
+            return False
+        calculado = hashlib.sha256((senha + salt_legado).encode('utf-8')).hexdigest()
+        return hmac.compare_digest(calculado, hash_armazenado)
+
+    algoritmo, parametros, salt, esperado = partes
+    try:
+        valores = dict(item.split('=', 1) for item in parametros.split(','))
+        salt, esperado = _de_b64(salt), _de_b64(esperado)
+        if algoritmo == 'scrypt':
+            calculado = _scrypt(senha, salt, int(valores['n']), int(valores['r']), int(valores['p']))
+        elif algoritmo == 'pbkdf2_sha256':
+            calculado = _pbkdf2(senha, salt, int(valores['i']))
+        else:
+            logger.error(f"Algoritmo de hash de senha desconhecido: {algoritmo}")
+            return False
+    except (ValueError, KeyError) as e:
+        logger.error(f"Hash de senha malformado: {e}")
+        return False
+    return hmac.compare_digest(calculado, esperado)
+
+
+def precisa_atualizar(hash_armazenado):
+    """
+    Retorna:
+        bool: True se o hash é do formato antigo ou não usa o algoritmo e os parâmetros atuais.
+    """
+    partes = hash_armazenado.split('$')
+    return len(partes) != 4 or partes[0] != ALGORITMO or partes[1] != _parametros_atuais()
+
+
+# Pool limitado de verificação e vagas (em execução + na fila)
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='senhas')
+_vagas = threading.BoundedSemaphore(WORKERS + FILA_MAX)
+
+
+def _executar(funcao, *args):
+    if not _vagas.acquire(blocking=False):
+        raise SenhasSobrecarregadas("Fila de verificação de senhas cheia.")
+    try:
+        futuro = _executor.submit(funcao, *args)
+    except BaseException:
+        _vagas.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas.release())
+    try:
+        return futuro.result(timeout=ESPERA_MAX)
+    except EsperaEsgotada:
+        futuro.cancel()
+        raise SenhasSobrecarregadas("Tempo de espera da verificação de senha esgotado.")
+
+
+def gerar_hash(senha):
+    """
+    Gera o hash de uma senha com o algoritmo e os parâmetros atuais.
+
+    Parâmetros:
+        senha (str): Senha em texto plano.
+
+    Retorna:
+        str: Hash com algoritmo, parâmetros e salt embutidos.
+
+    Levanta:
+        SenhasSobrecarregadas: Se o pool estiver cheio.
+    """
+    return _executar(_gerar_hash, senha)
+
+
+def verificar_senha(senha, hash_armazenado, salt_legado=None):
+    """
+    Confere a senha com o hash armazenado (formato novo ou SHA-256 antigo).
+
+    Parâmetros:
+        senha (str): Senha em texto plano.
+        hash_armazenado (str): Valor de usuarios.hash_senha.
+        salt_legado (str, optional): Valor de usuarios.salt, usado apenas pelo formato antigo.
+
+    Retorna:
+        bool: True se a senha confere.
+
+    Levanta:
+        SenhasSobrecarregadas: Se o pool estiver cheio.
+    """
+    return _executar(_verificar, senha, hash_armazenado, salt_legado)
+
+
+# Hash usado quando o e-mail não existe, para que o tempo de resposta não revele quais e-mails
+# estão cadastrados
+_hash_ficticio = None
+
+
+def verificar_ficticio(senha):
+    """Executa uma verificação de custo igual ao atual, sem usuário (sempre False)."""
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = _executar(_gerar_hash, secrets.token_hex(8))
+    _executar(_verificar, senha, _hash_ficticio)
+    return False
+
+
+def calibrar(alvo_ms):
+    """
+    Procura o custo cujo hash leva cerca de alvo_ms nesta máquina.
+
+    Retorna:
+        tuple: (variável de ambiente, valor, ms medidos)
+    """
+    senha, salt = 'calibracao', secrets.token_bytes(TAMANHO_SALT)
+    if ALGORITMO == 'scrypt':
+        n = 2 ** 12
+        while True:
+            inicio = time.perf_counter()
+            _scrypt(senha, salt, n, SCRYPT_R, SCRYPT_P)
+            ms = (time.perf_counter() - inicio) * 1000
+            if ms >= alvo_ms or n >= 2 ** 20:
+                return 'SENHA_SCRYPT_N', n, ms
+            n *= 2
+
+    inicio = time.perf_counter()
+    _pbkdf2(senha, salt, 100_000)
+    por_iteracao = (time.perf_counter() - inicio) * 1000 / 100_000
+    iteracoes = max(100_000, int(alvo_ms / por_iteracao) // 1000 * 1000)
+    inicio = time.perf_counter()
+    _pbkdf2(senha, salt, iteracoes)
+    return 'SENHA_PBKDF2_ITERACOES', iteracoes, (time.perf_counter() - inicio) * 1000
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibra o custo do hash de senhas.")
+    parser.add_argument("--calibrar", type=float, default=250, metavar="MS",
+                        help="Tempo alvo por verificação, em milissegundos")
+    args = parser.parse_args()
+    variavel, valor, ms = calibrar(args.calibrar)
+    print(f"{ALGORITMO}: {variavel}={valor} ({ms:.0f} ms por verificação; "
+          f"com SENHA_WORKERS={WORKERS}, ~{WORKERS * 1000 / ms:.1f} logins/s por processo)")
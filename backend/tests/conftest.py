@@ -0,0 +1,12 @@
+"""
+Configuração dos testes (a partir do diretório backend: python -m pytest tests).
+
+Os testes não precisam de banco: as consultas são substituídas onde necessário.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('SECRET_KEY', 'chave-dos-testes')
+os.environ.setdefault('NOTIFICACOES_AGENDADOR', '0')
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+from prometheus_client import REGISTRY
+
+import agendador
+import models.notificacao
+from agendador import AgendadorNotificacoes
+
+
+class CursorAgendador:
+    """
+    Cursor da transação do agendador: o advisory lock sempre é obtido, e a reivindicação da
+    rodada em agendador_execucoes atualiza `reivindicadas` linhas.
+    """
+
+    def __init__(self, reivindicadas=1):
+        self.reivindicadas = reivindicadas
+        self.rowcount = 0
+        self.consultas = []
+
+    def execute(self, query, params=None):
+        self.consultas.append(" ".join(query.split()))
+        self.rowcount = self.reivindicadas if "SET ultima_execucao" in query else 1
+
+    def fetchone(self):
+        return (True,)
+
+
+def _rodadas(resultado):
+    return REGISTRY.get_sample_value('notificacoes_job_runs_total', {'resultado': resultado}) or 0
+
+
+def _transacao(cursor):
+    @contextmanager
+    def transacao():
+        yield cursor
+    return transacao
+
+
+@contextmanager
+def transacao_com_erro():
+    raise psycopg2.OperationalError("conexão perdida")
+    yield
+
+
+def test_erro_no_banco_conta_como_falha(monkeypatch):
+    monkeypatch.setattr(agendador, 'transaction', _transacao(CursorAgendador()))
+    monkeypatch.setattr(models.notificacao, 'transaction', transacao_com_erro)
+
+    agendador_teste = AgendadorNotificacoes(intervalo=60, jitter=0, atraso_inicial=0)
+    falhas, executadas = _rodadas('falha'), _rodadas('executada')
+
+    assert agendador_teste.executar_uma_vez() is None
+    assert agendador_teste.metricas()['falhas'] == 1
+    assert agendador_teste.metricas()['execucoes'] == 0
+    assert _rodadas('falha') == falhas + 1
+    assert _rodadas('executada') == executadas
+
+
+def test_rodada_recente_de_outro_worker_e_pulada(monkeypatch):
+    geracoes = []
+    monkeypatch.setattr(agendador, 'transaction', _transacao(CursorAgendador(reivindicadas=0)))
+    monkeypatch.setattr(agendador.Notificacao, 'gerar_notificacoes_automaticas', lambda: geracoes.append(1) or 0)
+
+    agendador_teste = AgendadorNotificacoes(intervalo=60, jitter=0.1, atraso_inicial=0)
+    puladas = _rodadas('pulada')
+
+    assert agendador_teste.executar_uma_vez() is None
+    assert geracoes == []
+    assert agendador_teste.metricas()['execucoes_puladas'] == 1
+    assert _rodadas('pulada') == puladas + 1
+
+
+def test_rodada_reivindicada_registra_as_geradas(monkeypatch):
+    cursor = CursorAgendador()
+    monkeypatch.setattr(agendador, 'transaction', _transacao(cursor))
+    monkeypatch.setattr(agendador.Notificacao, 'gerar_notificacoes_automaticas', lambda: 3)
+
+    agendador_teste = AgendadorNotificacoes(intervalo=60, jitter=0.1, atraso_inicial=0)
+
+    assert agendador_teste.executar_uma_vez() == 3
+    assert "ultima_execucao <= NOW() - make_interval(secs => %s)" in cursor.consultas[1]
+    assert cursor.consultas[2].startswith("UPDATE agendador_execucoes SET ultimas_geradas")
+
+
+def test_chamada_direta_propaga_o_erro(monkeypatch):
+    monkeypatch.setattr(models.notificacao, 'transaction', transacao_com_erro)
+
+    with pytest.raises(psycopg2.OperationalError):
+        models.notificacao.Notificacao.gerar_notificacoes_automaticas()
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+from flask import Flask, jsonify
+
+import cache_respostas as modulo
+from cache_respostas import CacheRespostas
+
+
+class CursorVersoes:
+    """Cursor que responde às consultas de cache_versoes a partir de um dicionário (o "banco")."""
+
+    def __init__(self, versoes):
+        self.versoes = versoes
+        self.resultado = []
+
+    def execute(self, query, params=None):
+        grupos = params[0]
+        if query.startswith("UPDATE"):
+            for grupo in grupos:
+                self.versoes[grupo] = self.versoes.get(grupo, 0) + 1
+        else:
+            self.resultado = [(grupo, self.versoes[grupo]) for grupo in grupos if grupo in self.versoes]
+
+    def fetchall(self):
+        return self.resultado
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    versoes = {'inventario': 0, 'clientes': 0}
+
+    @contextmanager
+    def transacao():
+        yield CursorVersoes(versoes)
+
+    monkeypatch.setattr(modulo, 'transaction', transacao)
+    return versoes
+
+
+def _worker(estoque):
+    """Um "worker": instância própria do cache servindo o estoque atual."""
+    cache = CacheRespostas(ttl=60, max_entradas=10)
+    app = Flask(__name__)
+
+    @cache.em_cache('inventario')
+    def listar():
+        return jsonify(estoque)
+
+    def get():
+        with app.test_request_context('/inventario'):
+            resposta = listar()
+            return resposta.headers['X-Cache'], resposta.get_json()
+
+    return cache, get
+
+
+def test_escrita_em_um_worker_invalida_os_outros(banco):
+    estoque = {'andaime': 10}
+    cache_a, get_a = _worker(estoque)
+    _, get_b = _worker(estoque)
+
+    assert get_b() == ('MISS', {'andaime': 10})
+    assert get_b() == ('HIT', {'andaime': 10})
+
+    estoque['andaime'] = 7
+    cache_a.invalidar('inventario')
+
+    assert banco['inventario'] == 1
+    assert get_b() == ('MISS', {'andaime': 7})
+
+
+def test_sem_versoes_responde_sem_cache(monkeypatch):
+    @contextmanager
+    def transacao_com_erro():
+        raise psycopg2.OperationalError("conexão perdida")
+        yield
+
+    monkeypatch.setattr(modulo, 'transaction', transacao_com_erro)
+    cache = CacheRespostas(ttl=60, max_entradas=10)
+    listar = cache.em_cache('inventario')(lambda: jsonify({'andaime': 10}))
+
+    # A invalidação não propaga o erro: a escrita já foi confirmada
+    cache.invalidar('inventario')
+
+    with Flask(__name__).test_request_context('/inventario'):
+        resposta = listar()
+    assert resposta.status_code == 200
+    assert resposta.get_json() == {'andaime': 10}
+    assert 'X-Cache' not in resposta.headers
+    assert cache.metricas()['entradas'] == 0
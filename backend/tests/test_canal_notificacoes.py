@@ -0,0 +1,36 @@
+import pytest
+
+from canal_notificacoes import CanalLotado, CanalNotificacoes
+
+
+@pytest.fixture(autouse=True)
+def sem_escuta(monkeypatch):
+    # A escuta abriria uma conexão ao banco; o limite de clientes não depende dela
+    monkeypatch.setattr(CanalNotificacoes, '_escutar', lambda self: None)
+
+
+def test_recusa_streams_acima_do_limite():
+    canal = CanalNotificacoes(max_assinantes=2)
+    primeira = canal.assinar()
+    canal.assinar()
+
+    with pytest.raises(CanalLotado):
+        canal.assinar()
+    assert canal.total_assinantes() == 2
+
+    # Um cliente que sai libera a vaga
+    canal.cancelar(primeira)
+    canal.assinar()
+    assert canal.total_assinantes() == 2
+
+
+def test_zero_nao_limita():
+    canal = CanalNotificacoes(max_assinantes=0)
+    for _ in range(50):
+        canal.assinar()
+    assert canal.total_assinantes() == 50
+
+
+def test_limite_vazio_no_ambiente_nao_limita(monkeypatch):
+    monkeypatch.setenv('NOTIFICACOES_STREAMS_MAX', '')
+    assert CanalNotificacoes().max_assinantes == 0
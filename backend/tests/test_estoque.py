@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+
+import models.inventario
+import models.itens_locados
+from models.inventario import Inventario
+from models.itens_locados import ItensLocados
+
+
+class CursorRegistro:
+    """Registra as consultas e responde fetchone com os resultados informados, em ordem."""
+
+    def __init__(self, resultados):
+        self.consultas = []
+        self.resultados = list(resultados)
+
+    def execute(self, query, params=None):
+        self.consultas.append(" ".join(query.split()))
+
+    def fetchone(self):
+        return self.resultados.pop(0) if self.resultados else None
+
+
+def _transacao(cursor):
+    @contextmanager
+    def transacao():
+        yield cursor
+    return transacao
+
+
+def test_retirada_de_estoque_e_relativa_e_condicionada_ao_saldo(monkeypatch):
+    cursor = CursorRegistro([(7,)])
+    monkeypatch.setattr(models.inventario, 'transaction', _transacao(cursor))
+
+    assert Inventario.update_stock(1, 3, operation="decrease") is True
+    assert "SET quantidade_disponivel = quantidade_disponivel - %s" in cursor.consultas[0]
+    assert "quantidade_disponivel >= %s" in cursor.consultas[0]
+
+
+def test_retirada_sem_saldo_nao_altera(monkeypatch):
+    # O UPDATE condicional não encontra linha; a consulta seguinte só explica o motivo
+    cursor = CursorRegistro([None, (2, 10)])
+    monkeypatch.setattr(models.inventario, 'transaction', _transacao(cursor))
+
+    assert Inventario.update_stock(1, 3, operation="decrease") is False
+    assert len(cursor.consultas) == 2 and cursor.consultas[1].startswith("SELECT")
+
+
+def test_ajuste_da_quantidade_total_trava_a_linha(monkeypatch):
+    cursor = CursorRegistro([(10, 4)])
+    monkeypatch.setattr(models.inventario, 'transaction', _transacao(cursor))
+
+    assert Inventario.update_quantidade(1, 12) is True
+    assert cursor.consultas[0].endswith("FOR UPDATE")
+
+
+def test_edicao_de_item_locado_trava_a_linha_antes_da_reserva(monkeypatch):
+    cursor = CursorRegistro([(5,)])
+    reservas = []
+    monkeypatch.setattr(models.itens_locados, 'transaction', _transacao(cursor))
+    monkeypatch.setattr(models.itens_locados.ReservaEstoque, 'reservar',
+                        lambda cur, quantidades: reservas.append((len(cursor.consultas), quantidades)))
+
+    assert ItensLocados.update_quantidade(1, 2, 8) is True
+    assert cursor.consultas[0].endswith("FOR UPDATE")
+    assert reservas == [(1, {2: 3})]
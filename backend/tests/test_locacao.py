@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+
+import psycopg2
+
+import models.locacao
+from models.locacao import Locacao
+
+
+class CursorItens:
+    def __init__(self, itens):
+        self.itens = itens
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return self.itens
+
+
+def test_locacao_sem_itens_devolve_sem_erro(monkeypatch):
+    @contextmanager
+    def transacao():
+        yield CursorItens([])
+
+    liberados = []
+    monkeypatch.setattr(models.locacao, 'transaction', transacao)
+    monkeypatch.setattr(models.locacao.ReservaEstoque, 'liberar', lambda cursor, itens: liberados.append(itens))
+
+    assert Locacao.atualizar_estoque_devolucao(1) is True
+    assert liberados == []
+
+
+def test_itens_devolvidos_ao_estoque(monkeypatch):
+    @contextmanager
+    def transacao():
+        yield CursorItens([(3, 2), (5, 1)])
+
+    liberados = []
+    monkeypatch.setattr(models.locacao, 'transaction', transacao)
+    monkeypatch.setattr(models.locacao.ReservaEstoque, 'liberar', lambda cursor, itens: liberados.append(itens))
+
+    assert Locacao.atualizar_estoque_devolucao(1) is True
+    assert liberados == [[(3, 2), (5, 1)]]
+
+
+def test_erro_no_banco_continua_falhando(monkeypatch):
+    @contextmanager
+    def transacao_com_erro():
+        raise psycopg2.OperationalError("conexão perdida")
+        yield
+
+    monkeypatch.setattr(models.locacao, 'transaction', transacao_com_erro)
+
+    assert Locacao.atualizar_estoque_devolucao(1) is False
+
+
+class ConexaoResumo:
+    def __init__(self, linha):
+        self.linha = linha
+        self.consultas = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        self.consultas.append(query)
+
+    def fetchone(self):
+        return self.linha
+
+
+def test_resumo_conta_sem_carregar_locacoes(monkeypatch):
+    conexao = ConexaoResumo((7, 2))
+    monkeypatch.setattr(models.locacao, 'get_connection', lambda: conexao)
+    monkeypatch.setattr(models.locacao, 'release_connection', lambda conn: None)
+
+    assert Locacao.obter_resumo() == {"ativas": 7, "atrasadas": 2}
+    assert len(conexao.consultas) == 1
+    assert "COUNT(*)" in conexao.consultas[0]
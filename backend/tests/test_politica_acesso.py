@@ -0,0 +1,69 @@
+import pytest
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+import politica_acesso
+import registro_requisicoes
+from app import create_app
+from politica_acesso import AUTENTICADO, POLITICA
+from routes.auth_routes import obter_token
+
+app = create_app(iniciar_tarefas=False)
+
+ROTAS = sorted(
+    (regra.rule, metodo, regra.endpoint)
+    for regra in app.url_map.iter_rules()
+    for metodo in regra.methods - {'HEAD', 'OPTIONS'}
+)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def encerrar_logging():
+    # create_app liga o logging ao stderr capturado pelo pytest; encerra antes de ele ser fechado
+    yield
+    registro_requisicoes.encerrar_logging()
+
+
+@pytest.mark.parametrize("regra,metodo,endpoint", ROTAS)
+def test_toda_rota_tem_politica_explicita(regra, metodo, endpoint):
+    # Nada pode cair no nível padrão por esquecimento: a entrada do endpoint (ou, na falta
+    # dela, a do blueprint) precisa cobrir o método, diretamente ou por '*'
+    chave = endpoint if endpoint in POLITICA else politica_acesso._blueprint(endpoint)
+    assert chave in POLITICA, f"{metodo} {regra} ({endpoint}) sem entrada em POLITICA"
+    assert metodo in POLITICA[chave] or '*' in POLITICA[chave], f"{metodo} {regra} sem nível em POLITICA[{chave!r}]"
+
+
+def test_politica_sem_entradas_orfas():
+    assert politica_acesso.verificar_cobertura(app) == ([], [])
+
+
+@pytest.mark.parametrize("caminho", ["/notificacoes/stream", "/reports/export/status", "/reports/cache"])
+def test_streams_e_exportacoes_exigem_token(caminho):
+    endpoint = app.url_map.bind('localhost').match(caminho)[0]
+    assert politica_acesso._nivel(endpoint, 'GET') == AUTENTICADO
+
+    _, status, _ = run_wsgi_app(app, EnvironBuilder(path=caminho).get_environ(), buffered=True)
+    assert status.startswith('401')
+    _, status, _ = run_wsgi_app(app, EnvironBuilder(path=caminho, query_string={'token': 'invalido'}).get_environ(),
+                                buffered=True)
+    assert status.startswith('401')
+
+
+def test_status_publico_nao_exporta_planilha():
+    # /reports/status é leitura pública; a planilha só sai pela exportação autenticada
+    caminho = '/reports/status'
+    endpoint = app.url_map.bind('localhost').match(caminho)[0]
+    assert politica_acesso._nivel(endpoint, 'GET') != AUTENTICADO
+
+    _, status, cabecalhos = run_wsgi_app(
+        app, EnvironBuilder(path=caminho, query_string={'export_format': 'excel'}).get_environ(), buffered=True)
+    assert status.startswith('400')
+    assert 'attachment' not in cabecalhos.get('Content-Disposition', '')
+
+
+def test_token_no_parametro_so_em_get():
+    with app.test_request_context('/notificacoes/stream?token=abc'):
+        assert obter_token() == 'abc'
+    with app.test_request_context('/notificacoes/stream?token=abc', headers={'Authorization': 'Bearer xyz'}):
+        assert obter_token() == 'xyz'
+    with app.test_request_context('/auth/logout?token=abc', method='POST'):
+        assert obter_token() is None
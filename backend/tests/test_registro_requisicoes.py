@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from registro_requisicoes import PERFIS
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROTEIRO = ("import json, registro_requisicoes as r; "
+           "print(json.dumps([r.NIVEL_LOG, r.AMOSTRAGEM_PAYLOAD, r.MAX_BYTES_PAYLOAD]))")
+
+
+def _importar(**variaveis):
+    """Importa o módulo em um processo novo (os valores são lidos na importação)."""
+    ambiente = {**os.environ, **variaveis}
+    saida = subprocess.run([sys.executable, "-c", ROTEIRO], cwd=BACKEND, env=ambiente,
+                           capture_output=True, text=True)
+    assert saida.returncode == 0, saida.stderr
+    return json.loads(saida.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("ambiente", sorted(PERFIS))
+def test_variaveis_vazias_usam_o_perfil(ambiente):
+    # Como em um .env copiado de .env.example sem preencher as chaves
+    valores = _importar(APP_ENV=ambiente, LOG_NIVEL='', LOG_PAYLOAD_AMOSTRAGEM='', LOG_PAYLOAD_MAX_BYTES='')
+
+    perfil = PERFIS[ambiente]
+    assert valores == [perfil['nivel'], perfil['amostragem'], perfil['max_bytes']]
+
+
+def test_variaveis_preenchidas_sobrescrevem_o_perfil():
+    valores = _importar(APP_ENV='production', LOG_NIVEL='warning', LOG_PAYLOAD_AMOSTRAGEM='0.25',
+                        LOG_PAYLOAD_MAX_BYTES='2048')
+
+    assert valores == ['WARNING', 0.25, 2048]
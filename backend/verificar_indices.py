@@ -0,0 +1,119 @@
+"""
+Verifica, via EXPLAIN, se cada consulta dos caminhos mais frequentes usa o índice esperado.
+
+A verificação roda com enable_seqscan desligado dentro de uma transação que é desfeita ao final,
+de modo que o resultado indica se o índice é utilizável pela consulta independentemente do
+volume atual das tabelas. Termina com código de saída 1 se alguma consulta não usar seu índice.
+
+Uso:
+    python verificar_indices.py
+"""
+import sys
+import logging
+from database import get_connection, release_connection
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (descrição, consulta, parâmetros, índice esperado)
+CONSULTAS = [
+    (
+        "Itens de uma locação",
+        "SELECT item_id, quantidade FROM itens_locados WHERE locacao_id = %s",
+        (1,),
+        "idx_itens_locados_locacao_id",
+    ),
+    (
+        "Itens de várias locações (listagem em lote)",
+        "SELECT item_id, quantidade FROM itens_locados WHERE locacao_id = ANY(%s)",
+        ([1, 2, 3],),
+        "idx_itens_locados_locacao_id",
+    ),
+    (
+        "Uso de um item do inventário",
+        "SELECT locacao_id, quantidade FROM itens_locados WHERE item_id = %s",
+        (1,),
+        "idx_itens_locados_item_id",
+    ),
+    (
+        "Locações de um cliente",
+        "SELECT id, data_inicio FROM locacoes WHERE cliente_id = %s",
+        (1,),
+        "idx_locacoes_cliente_id",
+    ),
+    (
+        "Locações atrasadas",
+        "SELECT id FROM locacoes WHERE status = 'ativo' AND data_fim < CURRENT_DATE",
+        (),
+        "idx_locacoes_status_data_fim",
+    ),
+    (
+        "Página de locações por data de início",
+        "SELECT id FROM locacoes ORDER BY data_inicio DESC, id DESC LIMIT %s",
+        (51,),
+        "idx_locacoes_data_inicio_id",
+    ),
+    (
+        "Deduplicação de notificações automáticas",
+        "SELECT id FROM notificacoes WHERE tipo = %s AND relacionado_id = %s AND lida = FALSE",
+        ('estoque_critico', 1),
+        "idx_notificacoes_tipo_relacionado_lida",
+    ),
+    (
+        "Danos de uma locação",
+        "SELECT id FROM registro_danos WHERE locacao_id = %s",
+        (1,),
+        "idx_registro_danos_locacao_id",
+    ),
+    (
+        "Cliente por nome, endereço e telefone",
+        "SELECT id FROM clientes WHERE nome = %s AND endereco = %s AND telefone = %s",
+        ('Cliente', 'Rua', '0000'),
+        "idx_clientes_nome_endereco_telefone",
+    ),
+]
+
+def indices_do_plano(no):
+    """Retorna os nomes de todos os índices usados em um nó do plano (recursivamente)."""
+    indices = set()
+    if 'Index Name' in no:
+        indices.add(no['Index Name'])
+    for filho in no.get('Plans', []):
+        indices |= indices_do_plano(filho)
+    return indices
+
+def verificar_indices():
+    """
+    Executa EXPLAIN para cada consulta de CONSULTAS e compara com o índice esperado.
+
+    Retorna:
+        bool: True se todas as consultas usam o índice esperado, False caso contrário.
+    """
+    conn = get_connection()
+    if conn is None:
+        logger.error("Não foi possível conectar ao banco de dados.")
+        return False
+    falhas = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for descricao, consulta, params, esperado in CONSULTAS:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {consulta}", params)
+            plano = cursor.fetchone()[0][0]['Plan']
+            usados = indices_do_plano(plano)
+            if esperado in usados:
+                logger.info(f"[OK]    {descricao}: {esperado}")
+            else:
+                falhas += 1
+                logger.error(f"[FALHA] {descricao}: esperado {esperado}, plano usa {sorted(usados) or plano['Node Type']}")
+    finally:
+        conn.rollback()
+        release_connection(conn)
+
+    if falhas:
+        logger.error(f"{falhas} consulta(s) sem o índice esperado.")
+    return falhas == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if verificar_indices() else 1)
@@ -0,0 +1,13 @@
+"""
+Ponto de entrada WSGI para servidores de produção:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+A aplicação é criada sem as tarefas em segundo plano, porque com preload este módulo é
+importado no processo mestre, antes do fork; cada worker inicia o agendador no post_fork
+(ver gunicorn.conf.py). Com outro servidor WSGI, chame agendador.iniciar_agendador() em cada
+processo que atende requisições.
+"""
+from app import create_app
+
+app = create_app(iniciar_tarefas=False)
@@ -47,6 +47,12 @@ const apiRequest = async (endpoint, options = {}) => {
   try {
     const response = await fetch(url, fetchOptions);
     
+    // O backend renova o token perto do vencimento e envia o novo no cabeçalho X-Auth-Token
+    const renewedToken = response.headers.get('X-Auth-Token');
+    if (renewedToken) {
+      localStorage.setItem('authToken', renewedToken);
+    }
+    
     // Verificar se a resposta é um JSON válido
     const contentType = response.headers.get('content-type');
     const isJson = contentType && contentType.includes('application/json');
@@ -108,4 +114,5 @@ const api = {
   delete: (endpoint, options = {}) => apiRequest(endpoint, { method: 'DELETE', ...options }),
 };
 
+export { API_BASE_URL, getAuthToken };
 export default api;
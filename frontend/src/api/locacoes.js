@@ -2,9 +2,22 @@
 // Serviço de API para gerenciamento de locações
 import api from './config';
 
-// Listar todas as locações
-export const listarLocacoes = () => {
-  return api.get('/locacoes');
+// Listar as locações ativas, percorrendo as páginas do servidor
+export const listarLocacoesAtivas = async () => {
+  const locacoes = [];
+  let cursor = null;
+  do {
+    const query = `status=ativo&limite=200${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`;
+    const pagina = await api.get(`/locacoes?${query}`);
+    locacoes.push(...(pagina?.data || []));
+    cursor = pagina?.proximo_cursor || null;
+  } while (cursor);
+  return locacoes;
+};
+
+// Contagem de locações ativas e atrasadas: { ativas, atrasadas }
+export const obterResumoLocacoes = () => {
+  return api.get('/locacoes/resumo');
 };
 
 // Listar locações com devolução atrasada
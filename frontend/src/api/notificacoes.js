@@ -1,4 +1,7 @@
-import api from './config';
+import api, { API_BASE_URL, getAuthToken } from './config';
+
+// Espera (ms) antes de reabrir o stream de notificações recusado pelo servidor
+const INTERVALO_RECONEXAO_STREAM = 5000;
 
 /**
  * Serviço para gerenciar notificações
@@ -103,6 +106,51 @@ export const NotificacoesService = {
       console.error('Erro ao gerar notificações automáticas:', error);
       throw error;
     }
+  },
+
+  /**
+   * Abre o stream (Server-Sent Events) de notificações criadas, alteradas ou excluídas.
+   * O EventSource não envia o cabeçalho Authorization: o token vai no parâmetro token.
+   * @param {Function} onEvento - Recebe {operacao, id, notificacao} a cada mudança
+   * @param {Function} onConectado - Chamada a cada (re)conexão, para recarregar a lista
+   * @returns {{close: Function}} Conexão aberta; chame close() para encerrar
+   */
+  abrirStream: (onEvento, onConectado) => {
+    let source = null;
+    let espera = null;
+    let encerrado = false;
+
+    const conectar = () => {
+      const token = encodeURIComponent(getAuthToken() || '');
+      const atual = new EventSource(`${API_BASE_URL}/notificacoes/stream?token=${token}`);
+      source = atual;
+      atual.addEventListener('notificacao', (event) => {
+        try {
+          onEvento(JSON.parse(event.data));
+        } catch (error) {
+          console.error('Evento de notificação inválido:', error);
+        }
+      });
+      if (onConectado) {
+        atual.onopen = onConectado;
+      }
+      // Em respostas de erro (token vencido, servidor ocupado) o EventSource desiste;
+      // reabre depois de um intervalo, com o token atual
+      atual.onerror = () => {
+        if (atual.readyState === EventSource.CLOSED && !encerrado) {
+          espera = setTimeout(conectar, INTERVALO_RECONEXAO_STREAM);
+        }
+      };
+    };
+
+    conectar();
+    return {
+      close: () => {
+        encerrado = true;
+        clearTimeout(espera);
+        source.close();
+      }
+    };
   }
 };
 
@@ -13,12 +13,13 @@ const handleRequestError = (error) => {
 };
 
 /**
- * Busca todos os pedidos (locações) do backend.
+ * Busca os pedidos (locações) mais recentes do backend (primeira página).
+ * Para navegar por todos os pedidos, use fetchOrdersPage.
  * @returns {Array} Lista de pedidos
  */
 export const fetchOrders = async () => {
   try {
-    const response = await api.get("/locacoes");
+    const response = await api.get("/locacoes?limite=50");
     console.log("Pedidos carregados com sucesso:", response);
     // Garantir que sempre retornamos um array
     return Array.isArray(response) ? response : (response?.data || []);
@@ -28,6 +29,37 @@ export const fetchOrders = async () => {
   }
 };
 
+/**
+ * Busca uma página de pedidos (locações), com filtros aplicados no servidor.
+ * @param {Object} params - Parâmetros da página
+ * @param {Number} params.limite - Quantidade de pedidos por página
+ * @param {String} params.cursor - Cursor retornado pela página anterior
+ * @param {String} params.status - Status (vários separados por vírgula)
+ * @param {Number} params.cliente_id - ID do cliente
+ * @param {String} params.data_inicio - Data de início mínima (YYYY-MM-DD)
+ * @param {String} params.data_fim - Data de fim máxima (YYYY-MM-DD)
+ * @param {String} params.numero_nota - Número da nota
+ * @returns {Object} { data: Array, proximo_cursor: String|null }
+ */
+export const fetchOrdersPage = async (params = {}) => {
+  const query = new URLSearchParams();
+  Object.entries({ limite: 50, ...params }).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== "") {
+      query.append(key, value);
+    }
+  });
+  try {
+    const response = await api.get(`/locacoes?${query.toString()}`);
+    return {
+      data: Array.isArray(response?.data) ? response.data : [],
+      proximo_cursor: response?.proximo_cursor || null,
+    };
+  } catch (error) {
+    handleRequestError(error);
+    return { data: [], proximo_cursor: null };
+  }
+};
+
 /**
  * Busca os pedidos associados a um cliente específico.
  * @param {Number} clientId - ID do cliente
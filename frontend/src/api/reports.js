@@ -1,4 +1,4 @@
-import api from './config';
+import api, { API_BASE_URL, getAuthToken } from './config';
 
 // Endpoint base para relatórios
 
@@ -73,10 +73,9 @@ export const fetchStatusReport = async ({ startDate, endDate } = {}) => {
 // Função para buscar clientes com base no termo de pesquisa
 export const fetchClients = async (searchTerm) => {
   try {
-    const response = await api.get(`/reports/clients`, {
-      params: { search: searchTerm },
-    });
-    return response.data; // Supondo que a resposta seja uma lista de clientes
+    const params = new URLSearchParams({ search: searchTerm || "" });
+    const response = await api.get(`/reports/clients?${params.toString()}`);
+    return Array.isArray(response) ? response : []; // Lista de clientes em ordem de relevância
   } catch (error) {
     console.error("Erro ao buscar clientes:", error);
     return []; // Retorna uma lista vazia em caso de erro
@@ -86,10 +85,9 @@ export const fetchClients = async (searchTerm) => {
 // Função para buscar itens com base no termo de pesquisa
 export const fetchItems = async (searchTerm) => {
   try {
-    const response = await api.get(`/reports/items`, {
-      params: { search: searchTerm },
-    });
-    return response.data; // Supondo que a resposta seja uma lista de itens
+    const params = new URLSearchParams({ search: searchTerm || "" });
+    const response = await api.get(`/reports/items?${params.toString()}`);
+    return Array.isArray(response) ? response : []; // Lista de itens em ordem de relevância
   } catch (error) {
     console.error("Erro ao buscar itens:", error);
     return []; // Retorna uma lista vazia em caso de erro
@@ -120,32 +118,29 @@ export const downloadStatusChart = async () => {
   }
 };
 
-// Função para exportar relatório de status como arquivo Excel
-export const downloadStatusExcel = async () => {
-  try {
-    const response = await api.get(`/reports/status`, {
-      params: { export_format: "excel" },
-      responseType: "blob",
-    });
-
-    const url = window.URL.createObjectURL(
-      new Blob([response.data], {
-        type: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-      })
-    );
-    const link = document.createElement("a");
-    link.href = url;
-    link.setAttribute("download", "status_report.xlsx");
+// Função para exportar um relatório direto do banco (CSV ou XLSX)
+// O navegador baixa o arquivo em streaming, sem montá-lo em memória na página; como o link
+// não envia o cabeçalho Authorization, o token vai no parâmetro token
+export const exportReport = (conjunto, formato = "csv", filtros = {}) => {
+  const params = new URLSearchParams({ formato, token: getAuthToken() || "" });
+  Object.entries(filtros).forEach(([chave, valor]) => {
+    if (valor !== undefined && valor !== null && valor !== "") {
+      params.append(chave, valor);
+    }
+  });
+
+  const link = document.createElement("a");
+  link.href = `${API_BASE_URL}/reports/export/${conjunto}?${params.toString()}`;
+  link.setAttribute("download", "");
+
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+};
 
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-  } catch (error) {
-    console.error("Erro ao baixar o relatório de status em Excel:", error);
-    throw new Error(
-      "Erro ao baixar o relatório de status em Excel. Tente novamente."
-    );
-  }
+// Função para exportar relatório de status como arquivo Excel
+export const downloadStatusExcel = async ({ startDate, endDate } = {}) => {
+  exportReport("status", "xlsx", { start_date: startDate, end_date: endDate });
 };
 
 // Função para download do relatório em CSV
@@ -26,7 +26,7 @@ import {
 } from '@mui/material';
 import { Add as AddIcon, Edit as EditIcon, Delete as DeleteIcon } from '@mui/icons-material';
 import { listarDanos, registrarDano, atualizarDano, excluirDano } from '../../api/danos';
-import { listarLocacoes } from '../../api/locacoes';
+import { listarLocacoesAtivas } from '../../api/locacoes';
 import { listarItens } from '../../api/inventario';
 
 const DamagesPage = () => {
@@ -53,7 +53,7 @@ const DamagesPage = () => {
       setLoading(true);
       const [danosData, locacoesData, itensData] = await Promise.all([
         listarDanos(),
-        listarLocacoes(),
+        listarLocacoesAtivas(),
         listarItens()
       ]);
       setDanos(danosData);
@@ -147,9 +147,10 @@ const DamagesPage = () => {
     }
   };
 
+  // Só as locações ativas são carregadas; as demais aparecem apenas pelo número
   const getLocacaoNome = (locacaoId) => {
     const locacao = locacoes.find(l => l.id === locacaoId);
-    return locacao ? `#${locacao.id} - ${locacao.nome_cliente}` : 'N/A';
+    return locacao ? `#${locacao.id} - ${locacao.cliente?.nome || ''}` : `#${locacaoId}`;
   };
 
   const getItemNome = (itemId) => {
@@ -251,9 +252,14 @@ const DamagesPage = () => {
                 onChange={handleInputChange}
                 label="Locação"
               >
+                {editMode && currentDano.locacao_id && !locacoes.some(l => l.id === currentDano.locacao_id) && (
+                  <MenuItem value={currentDano.locacao_id}>
+                    {getLocacaoNome(currentDano.locacao_id)}
+                  </MenuItem>
+                )}
                 {locacoes.map((locacao) => (
                   <MenuItem key={locacao.id} value={locacao.id}>
-                    #{locacao.id} - {locacao.nome_cliente}
+                    {getLocacaoNome(locacao.id)}
                   </MenuItem>
                 ))}
               </Select>
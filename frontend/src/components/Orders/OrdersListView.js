@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import { Paper, Typography, Grid, Box, useTheme, Container } from "@mui/material";
+import { Paper, Typography, Grid, Box, Button, CircularProgress, useTheme, Container } from "@mui/material";
 import OrdersFilter from "./OrdersFilter";
 import OrdersActionsDialog from "./OrdersActionsDialog";
 import OrdersExtendDialog from "./OrdersExtendDialog";
@@ -7,7 +7,7 @@ import OrdersTableWrapper from "./OrdersTableWrapper";
 import SnackbarNotification from "./SnackbarNotification";
 import LoadingSpinner from "./LoadingSpinner";
 import {
-  fetchOrders,
+  fetchOrdersPage,
   updateOrderStatus,
   extendOrder,
   completeOrderEarly,
@@ -21,6 +21,23 @@ const normalizeStatus = (status) =>
     .normalize("NFD")
     .replace(/[\u0300-\u036f]/g, "");
 
+// Quantidade de pedidos carregados por página
+const PAGE_SIZE = 50;
+
+// Filtros aplicados no servidor para cada opção do filtro da tela.
+// O refinamento por data (ativos x expirados) continua sendo feito na página carregada.
+const serverFiltersFor = (filterValue) => {
+  switch (filterValue) {
+    case "active":
+    case "expired":
+      return { status: "ativo" };
+    case "completed":
+      return { status: "concluido,concluído" };
+    default:
+      return {};
+  }
+};
+
 const OrdersListView = ({ showTitle = true }) => {
   const theme = useTheme();
   const [orders, setOrders] = useState([]);
@@ -35,21 +52,27 @@ const OrdersListView = ({ showTitle = true }) => {
   });
   const [selectedOrder, setSelectedOrder] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     loadOrders();
   }, []);
 
-  const loadOrders = async () => {
+  const loadOrders = async (filterValue = filter) => {
     setLoading(true);
     try {
-      const data = await fetchOrders();
+      const { data, proximo_cursor } = await fetchOrdersPage({
+        limite: PAGE_SIZE,
+        ...serverFiltersFor(filterValue),
+      });
       if (!data || !Array.isArray(data)) {
         throw new Error("Dados inválidos recebidos.");
       }
       const formattedData = formatOrders(data);
       setOrders(formattedData);
-      filterOrders(filter, formattedData);
+      setNextCursor(proximo_cursor);
+      filterOrders(filterValue, formattedData);
     } catch (error) {
       handleError("Erro ao carregar pedidos. Por favor, tente novamente.");
     } finally {
@@ -57,6 +80,26 @@ const OrdersListView = ({ showTitle = true }) => {
     }
   };
 
+  const loadMoreOrders = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const { data, proximo_cursor } = await fetchOrdersPage({
+        limite: PAGE_SIZE,
+        cursor: nextCursor,
+        ...serverFiltersFor(filter),
+      });
+      const updatedOrders = [...orders, ...formatOrders(data)];
+      setOrders(updatedOrders);
+      setNextCursor(proximo_cursor);
+      filterOrders(filter, updatedOrders);
+    } catch (error) {
+      handleError("Erro ao carregar mais pedidos. Por favor, tente novamente.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatOrders = (orders) =>
     orders.map((order) => ({
       ...order,
@@ -123,7 +166,7 @@ const OrdersListView = ({ showTitle = true }) => {
 
   const handleFilterChange = (filterValue) => {
     setFilter(filterValue);
-    filterOrders(filterValue);
+    loadOrders(filterValue);
   };
 
   const handleConfirmAction = async () => {
@@ -263,21 +306,35 @@ const OrdersListView = ({ showTitle = true }) => {
           <OrdersFilter
             filter={filter}
             onFilterChange={handleFilterChange}
-            onRefresh={loadOrders}
+            onRefresh={() => loadOrders()}
             loading={loading}
           />
         </Box>
         {loading ? (
           <LoadingSpinner />
         ) : (
-          <OrdersTableWrapper
-            orders={filteredOrders}
-            onAction={(order, actionType) => {
-              setSelectedOrder({ ...order, action: actionType });
-              if (actionType === "extend") setExtendDialogOpen(true);
-              else setAlertOpen(true);
-            }}
-          />
+          <>
+            <OrdersTableWrapper
+              orders={filteredOrders}
+              onAction={(order, actionType) => {
+                setSelectedOrder({ ...order, action: actionType });
+                if (actionType === "extend") setExtendDialogOpen(true);
+                else setAlertOpen(true);
+              }}
+            />
+            {nextCursor && (
+              <Box sx={{ textAlign: "center", mt: 3 }}>
+                <Button
+                  variant="outlined"
+                  onClick={loadMoreOrders}
+                  disabled={loadingMore}
+                  startIcon={loadingMore ? <CircularProgress size={16} /> : null}
+                >
+                  Carregar mais pedidos
+                </Button>
+              </Box>
+            )}
+          </>
         )}
         </Box>
         </Paper>
@@ -65,11 +65,19 @@ const Navbar = () => {
       }
     };
     
-    fetchNotifications();
+    // Recebe apenas as mudanças pelo stream; a lista completa é carregada a cada (re)conexão
+    const aplicarEvento = ({ operacao, id, notificacao }) => {
+      setNotifications((atuais) => {
+        const restantes = atuais.filter((notif) => notif.id !== id);
+        if (operacao === 'DELETE' || !notificacao || notificacao.lida) {
+          return restantes;
+        }
+        return [notificacao, ...restantes];
+      });
+    };
     
-    // Atualizar notificações a cada 60 segundos
-    const interval = setInterval(fetchNotifications, 60000);
-    return () => clearInterval(interval);
+    const source = NotificacoesService.abrirStream(aplicarEvento, fetchNotifications);
+    return () => source.close();
   }, []);
   
   const handleMenu = (event) => {
@@ -42,7 +42,7 @@ import {
 import { useNavigate, Link } from 'react-router-dom';
 import { useThemeMode } from '../../contexts/ThemeContext';
 import { listarItens } from '../../api/inventario';
-import { listarLocacoes } from '../../api/locacoes';
+import { obterResumoLocacoes } from '../../api/locacoes';
 import AlertsPanel from '../Dashboard/AlertsPanel';
 import StockOverview from '../Dashboard/StockOverview';
 import CriticalItems from '../Dashboard/CriticalItems';
@@ -56,7 +56,7 @@ const HomePage = () => {
   
   const [loading, setLoading] = useState(true);
   const [inventory, setInventory] = useState([]);
-  const [rentals, setRentals] = useState([]);
+  const [rentalsSummary, setRentalsSummary] = useState({ ativas: 0, atrasadas: 0 });
   const [error, setError] = useState(null);
   const [darkMode, setDarkMode] = useState(false);
   const [refreshing, setRefreshing] = useState(false);
@@ -72,9 +72,9 @@ const HomePage = () => {
       const inventoryData = await listarItens();
       setInventory(inventoryData || []);
       
-      // Buscar dados de locações
-      const rentalsData = await listarLocacoes();
-      setRentals(rentalsData || []);
+      // Buscar contagem de locações ativas e atrasadas
+      const rentalsData = await obterResumoLocacoes();
+      setRentalsSummary(rentalsData || { ativas: 0, atrasadas: 0 });
       
       setLastUpdated(new Date());
       setRefreshing(false);
@@ -164,8 +164,8 @@ const HomePage = () => {
   const totalItems = Array.isArray(inventory) ? inventory.reduce((acc, item) => acc + (item.quantidade_total || item.quantidade || 0), 0) : 0;
   const availableItems = Array.isArray(inventory) ? inventory.reduce((acc, item) => acc + (item.quantidade_disponivel || 0), 0) : 0;
   const rentedItems = totalItems - availableItems;
-  const activeRentals = Array.isArray(rentals) ? rentals.filter(r => r.status === 'ativa' || r.status === 'em_andamento').length : 0;
-  const overdueRentals = Array.isArray(rentals) ? rentals.filter(r => r.status === 'atrasada').length : 0;
+  const activeRentals = rentalsSummary.ativas || 0;
+  const overdueRentals = rentalsSummary.atrasadas || 0;
 
   // Cards de estatísticas
   const statsCards = [
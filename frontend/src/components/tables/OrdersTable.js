@@ -18,12 +18,12 @@ import OrderTableRow from "./OrderTableRow";
 import OrderDetailsDialog from "./OrderDetailsDialog";
 import { Check } from "@mui/icons-material";
 import {
-  fetchOrders,
+  fetchOrdersPage,
   updateOrderStatus,
   reactivateOrder,
 } from "../../api/orders";
 
-const OrdersTable = ({ orders: initialOrders = [], onReactivateOrder: externalReactivateOrder, onExtendOrder, onCompleteOrder, onConfirmReturn }) => {
+const OrdersTable = ({ orders: initialOrders, onReactivateOrder: externalReactivateOrder, onExtendOrder, onCompleteOrder, onConfirmReturn }) => {
   const theme = useTheme();
   const [orders, setOrders] = useState([]);
   const [openDetails, setOpenDetails] = useState(false);
@@ -39,13 +39,15 @@ const OrdersTable = ({ orders: initialOrders = [], onReactivateOrder: externalRe
   const isMounted = useRef(true);
 
   // Carregar pedidos no carregamento inicial
+  // Quando a lista é fornecida pelo componente pai (mesmo vazia), ela é usada como está;
+  // sem lista, a tabela busca apenas a primeira página de pedidos no servidor.
   useEffect(() => {
-    if (initialOrders && initialOrders.length > 0) {
+    if (Array.isArray(initialOrders)) {
       setOrders(initialOrders);
     } else {
       const loadOrders = async () => {
         try {
-          const data = await fetchOrders();
+          const { data } = await fetchOrdersPage();
           if (isMounted.current) {
             setOrders(data);
             console.log("Pedidos carregados com sucesso:", data);